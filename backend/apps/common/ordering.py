@@ -0,0 +1,177 @@
+"""
+Manual ordering for admin lists (drag-and-drop reordering).
+
+``apply_order`` writes a whole reorder as one ``UPDATE ... SET order = CASE
+id WHEN ... END`` inside a transaction, so it is one round trip whatever the
+number of items and never leaves a half-applied order. ``move_to_position``
+moves a single item and renumbers its list without the client resending it.
+
+``ReorderMixin`` exposes both on an admin viewset:
+
+* ``PATCH <list>/bulk_update_order/`` with ``{<key>: [{"id": 1, "order": 0}, ...]}``
+* ``PATCH <list>/<id>/move/`` with ``{"position": 3}``
+"""
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def is_index(value):
+    """Return True for a non-negative int (bools excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def parse_orders(items):
+    """
+    Validate a reorder payload.
+
+    Args:
+        items (list): ``{"id": ..., "order": ...}`` dicts
+
+    Returns:
+        Dict of id to order
+
+    Raises:
+        ValueError: On a malformed item or a repeated id
+    """
+    if not isinstance(items, list):
+        raise ValueError('Expected a list of {"id", "order"} items')
+    orders = {}
+    for item in items:
+        if not isinstance(item, dict) or not is_index(item.get('id')) or not is_index(item.get('order')):
+            raise ValueError(f'Invalid item {item!r}: id and order must be non-negative integers')
+        if item['id'] in orders:
+            raise ValueError(f"Item {item['id']} appears more than once")
+        orders[item['id']] = item['order']
+    return orders
+
+
+def update_orders(queryset, orders, field='order'):
+    """Write ``orders`` (id to order) to ``queryset`` with a single UPDATE."""
+    if not orders:
+        return 0
+    values = {
+        field: Case(
+            *(When(pk=pk, then=Value(order)) for pk, order in orders.items()),
+            output_field=IntegerField(),
+        )
+    }
+    if any(f.name == 'updated_at' for f in queryset.model._meta.concrete_fields):
+        values['updated_at'] = timezone.now()  # update() skips auto_now
+    return queryset.filter(pk__in=list(orders)).update(**values)
+
+
+def apply_order(queryset, items, field='order'):
+    """
+    Apply a client-supplied order in one statement.
+
+    Every id is checked against ``queryset`` first, and nothing is written
+    unless all of them exist.
+
+    Returns:
+        Number of rows updated
+
+    Raises:
+        ValueError: On a malformed payload or unknown ids
+    """
+    orders = parse_orders(items)
+    with transaction.atomic(using=queryset.db):
+        found = set(queryset.select_for_update().filter(pk__in=list(orders)).values_list('pk', flat=True))
+        missing = sorted(set(orders) - found)
+        if missing:
+            raise ValueError(f"Unknown ids: {', '.join(map(str, missing))}")
+        return update_orders(queryset, orders, field)
+
+
+def move_to_position(queryset, pk, position, field='order'):
+    """
+    Move one item to ``position`` (0-based) in ``queryset``'s ordering.
+
+    The list is renumbered 0, 1, 2, ... in its new order; only the rows whose
+    number changes are written, in one statement. Positions past the end
+    move the item to the end.
+
+    Args:
+        queryset: The list the item is reordered within, e.g. its siblings
+        pk: Id of the item to move
+        position (int): New position
+
+    Returns:
+        List of ids in their new order
+
+    Raises:
+        ValueError: On an invalid position or an id missing from the list
+    """
+    if not is_index(position):
+        raise ValueError('position must be a non-negative integer')
+    with transaction.atomic(using=queryset.db):
+        rows = list(queryset.select_for_update(of=('self',)).values_list('pk', field))
+        ids = [row_pk for row_pk, _ in rows]
+        if pk not in ids:
+            raise ValueError(f'Unknown id: {pk}')
+        ids.remove(pk)
+        ids.insert(min(position, len(ids)), pk)
+
+        current = dict(rows)
+        update_orders(queryset, {
+            row_pk: index for index, row_pk in enumerate(ids) if current[row_pk] != index
+        }, field)
+    return ids
+
+
+class ReorderMixin:
+    """
+    Viewset mixin adding ``bulk_update_order`` and ``move`` actions.
+
+    Viewsets set ``reorder_payload_key`` (the list key of the bulk payload)
+    and optionally ``reorder_scope``, the field whose value groups the items
+    ``move`` positions among (e.g. siblings under the same parent).
+    ``reorder_callback``, if set, is called with no arguments after every
+    successful reorder, e.g. to invalidate caches.
+    """
+
+    reorder_payload_key = 'items'
+    reorder_scope = None
+    reorder_label = 'Item'
+    reorder_callback = None
+
+    def get_reorder_queryset(self):
+        return self.queryset.model._default_manager.all()
+
+    def reordered(self):
+        """Run ``reorder_callback`` after a reorder."""
+        if self.reorder_callback:
+            self.reorder_callback()
+
+    @action(detail=False, methods=['patch'])
+    def bulk_update_order(self, request):
+        """Set the order of many items at once."""
+        try:
+            updated = apply_order(self.get_reorder_queryset(), request.data.get(self.reorder_payload_key, []))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        self.reordered()
+
+        return Response({
+            'message': f'{self.reorder_label} orders updated successfully',
+            'updated_count': updated
+        })
+
+    @action(detail=True, methods=['patch'])
+    def move(self, request, pk=None):
+        """Move an item to a position among its siblings and renumber them."""
+        instance = self.get_object()
+        queryset = self.get_reorder_queryset()
+        if self.reorder_scope:
+            scope = instance._meta.get_field(self.reorder_scope).attname
+            queryset = queryset.filter(**{scope: getattr(instance, scope)})
+        try:
+            ids = move_to_position(queryset, instance.pk, request.data.get('position'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        self.reordered()
+
+        return Response({'id': instance.pk, 'position': ids.index(instance.pk), 'order': ids})
@@ -0,0 +1,188 @@
+"""
+Pagination classes shared by the admin API.
+
+``AdminPagination`` behaves like the default page-number pagination unless
+the client opts into one of two cheaper modes:
+
+* ``?count=false`` skips the ``COUNT(*)`` query. One extra row is fetched
+  to tell whether a next page exists, and the response has no ``count``.
+* ``?pagination=cursor`` (or any request carrying a ``cursor``) switches to
+  keyset pagination on ``(created_at, id)``. Each page is a range scan that
+  starts where the previous one ended, so deep pages cost the same as the
+  first one and no count is taken.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+class AdminPagination(PageNumberPagination):
+    """Page-number pagination with opt-in keyset and count-free modes."""
+
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    cursor_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'page'
+        if self.use_cursor(request):
+            self.mode = 'cursor'
+            return self.paginate_by_cursor(queryset, request)
+        if not self.include_count(request):
+            self.mode = 'no_count'
+            return self.paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.mode == 'page':
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.mode == 'cursor':
+            return self.next_link
+        if self.mode == 'no_count':
+            if not self.has_next:
+                return None
+            return replace_query_param(
+                self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1
+            )
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.mode == 'cursor':
+            return self.previous_link
+        if self.mode == 'no_count':
+            if self.page_number <= 1:
+                return None
+            url = self.request.build_absolute_uri()
+            if self.page_number == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.page_number - 1)
+        return super().get_previous_link()
+
+    def use_cursor(self, request):
+        """Return True when the client asked for keyset pagination."""
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def include_count(self, request):
+        """Return False when the client passed ``count=false``."""
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() not in FALSE_VALUES
+
+    def paginate_without_count(self, queryset, request):
+        """Slice out one page, fetching an extra row instead of counting."""
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_cursor_ordering(self, request):
+        """
+        Get the direction of the keyset ordering.
+
+        Cursor pages are always ordered by ``created_at`` with ``id`` as a
+        tie-breaker. The ``ordering`` parameter may flip the direction, but
+        any other field cannot be paginated by keyset.
+        """
+        ordering_param = api_settings.ORDERING_PARAM
+        requested = request.query_params.get(ordering_param)
+        if not requested or requested == f'-{self.cursor_field}':
+            return True
+        if requested == self.cursor_field:
+            return False
+        raise ValidationError({
+            ordering_param: f'Cursor pagination only supports ordering by {self.cursor_field}.'
+        })
+
+    def paginate_by_cursor(self, queryset, request):
+        """Fetch the page that starts after (or before) the requested cursor."""
+        page_size = self.get_page_size(request)
+        descending = self.get_cursor_ordering(request)
+        position = self.decode_cursor(request)
+        backwards = bool(position and position['reverse'])
+
+        # Walk the index in the opposite direction for a previous page,
+        # then put the rows back in display order.
+        if descending != backwards:
+            queryset = queryset.order_by(f'-{self.cursor_field}', '-id')
+            lookup = 'lt'
+        else:
+            queryset = queryset.order_by(self.cursor_field, 'id')
+            lookup = 'gt'
+        if position:
+            created_at, pk = position['created_at'], position['id']
+            queryset = queryset.filter(
+                Q(**{f'{self.cursor_field}__{lookup}': created_at})
+                | Q(**{self.cursor_field: created_at, f'id__{lookup}': pk})
+            )
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        self.next_link = self.previous_link = None
+        if rows:
+            if has_more or backwards:
+                self.next_link = self.encode_cursor(rows[-1], reverse=False)
+            if position and (has_more or not backwards):
+                self.previous_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def decode_cursor(self, request):
+        """Decode the ``cursor`` parameter into a position, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            created_at = parse_datetime(data['c'])
+            pk = int(data['i'])
+            reverse = bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return {'created_at': created_at, 'id': pk, 'reverse': reverse}
+
+    def encode_cursor(self, instance, reverse):
+        """Build the URL of the page that starts at ``instance``."""
+        data = {'c': getattr(instance, self.cursor_field).isoformat(), 'i': instance.pk}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('ascii')
+        ).decode('ascii').rstrip('=')
+        url = remove_query_param(self.request.build_absolute_uri(), self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
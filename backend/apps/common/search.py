@@ -0,0 +1,327 @@
+"""
+Full-text search for the admin API.
+
+Models register the text columns they want searchable with
+``register_search_index``. The index itself lives in the database and is
+kept in sync by the database on every insert, update and delete, including
+``queryset.update()`` and bulk writes:
+
+* PostgreSQL: a generated ``tsvector`` column (``search_vector``) with a GIN
+  index, weighted per column.
+* SQLite: an external-content FTS5 table (``<table>_fts``) maintained by
+  triggers.
+
+``FullTextSearchFilter`` is a drop-in replacement for DRF's ``SearchFilter``.
+It ranks matches and annotates each one with ``search_rank`` and a
+highlighted ``search_snippet``. Every search term is matched as a prefix, so
+results narrow as the user types. On a database without a backend, or with
+``SEARCH_BACKEND=none``, it falls back to the usual ``icontains`` search.
+
+The indexes are created by each app's migrations. Run
+``python manage.py rebuild_search_index`` after loading data with the
+triggers disabled, or after a migration that rebuilds a table on SQLite
+(which drops its triggers).
+"""
+import html
+import re
+
+from django.conf import settings
+from django.db import connections, migrations, transaction
+from django.db.models import BooleanField, FloatField, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+# Weight of each column, most important first
+WEIGHTS = ('A', 'B', 'C', 'D')
+
+# Highlight markers returned by the database; replaced with <mark> tags
+# after the snippet is HTML-escaped
+MARK_START, MARK_END = '\x02', '\x03'
+
+TERM_RE = re.compile(r'[\w@.+-]+')
+
+search_indexes = {}
+
+
+class SearchIndex:
+    """
+    The searchable text columns of a model.
+
+    Args:
+        model: Model class
+        fields (dict): Column name to weight (``'A'`` to ``'D'``)
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = dict(fields)
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def pk_column(self):
+        return self.model._meta.pk.column
+
+
+def register_search_index(model, fields):
+    """Make ``model`` searchable over ``fields`` (column name to weight)."""
+    search_indexes[model] = SearchIndex(model, fields)
+    return search_indexes[model]
+
+
+def get_search_index(model):
+    """Get the search index of a model, or None."""
+    return search_indexes.get(model)
+
+
+def parse_terms(query):
+    """
+    Split a search query into terms safe to embed in a tsquery or FTS5 query.
+
+    Terms keep inner ``@ . + -`` so emails stay one term; punctuation at the
+    edges is stripped and punctuation-only fragments are dropped.
+    """
+    terms = (term.strip('@.+-') for term in TERM_RE.findall(query))
+    return [term for term in terms if term]
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and turn its match markers into <mark> tags."""
+    return html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class PostgresSearchBackend:
+    """Generated tsvector column with a GIN index."""
+
+    vendor = 'postgresql'
+    config = 'simple'  # no stemming: the columns hold English and Arabic text
+    column = 'search_vector'
+
+    def index_name(self, table):
+        return f'{table}_search_idx'
+
+    def install(self, schema_editor, table, fields):
+        quote = schema_editor.quote_name
+        vector = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', coalesce({quote(name)}, '')), '{weight}')"
+            for name, weight in fields.items()
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {quote(table)} ADD COLUMN IF NOT EXISTS {self.column} tsvector '
+            f'GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(self.index_name(table))} '
+            f'ON {quote(table)} USING GIN ({self.column})'
+        )
+
+    def uninstall(self, schema_editor, table, fields):
+        quote = schema_editor.quote_name
+        schema_editor.execute(f'DROP INDEX IF EXISTS {quote(self.index_name(table))}')
+        schema_editor.execute(f'ALTER TABLE {quote(table)} DROP COLUMN IF EXISTS {self.column}')
+
+    def rebuild(self, schema_editor, table, fields):
+        # The generated column is always current; only the index can bloat
+        self.install(schema_editor, table, fields)
+        schema_editor.execute(f'REINDEX INDEX {schema_editor.quote_name(self.index_name(table))}')
+
+    def search(self, queryset, index, terms):
+        quote = connections[queryset.db].ops.quote_name
+        vector = f'{quote(index.table)}.{self.column}'
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        document = "concat_ws(' ', {})".format(
+            ', '.join(f'{quote(index.table)}.{quote(name)}' for name in index.fields)
+        )
+        options = f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=20, MinWords=8'
+        return queryset.filter(
+            RawSQL(f'{vector} @@ to_tsquery(%s, %s)', [self.config, tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'ts_rank({vector}, to_tsquery(%s, %s))', [self.config, tsquery], output_field=FloatField()
+            ),
+            search_snippet=RawSQL(
+                f'ts_headline(%s, {document}, to_tsquery(%s, %s), %s)',
+                [self.config, self.config, tsquery, options], output_field=TextField()
+            ),
+        )
+
+
+class SqliteSearchBackend:
+    """External-content FTS5 table kept in sync by triggers."""
+
+    vendor = 'sqlite'
+
+    def fts_table(self, table):
+        return f'{table}_fts'
+
+    def install(self, schema_editor, table, fields):
+        quote = schema_editor.quote_name
+        fts = self.fts_table(table)
+        columns = ', '.join(quote(name) for name in fields)
+        new = ', '.join(f'new.{quote(name)}' for name in fields)
+        old = ', '.join(f'old.{quote(name)}' for name in fields)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {quote(fts)} USING fts5({columns}, '
+            f"content={quote(table)}, content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {quote(fts + "_ai")} AFTER INSERT ON {quote(table)} BEGIN '
+            f'INSERT INTO {quote(fts)}(rowid, {columns}) VALUES (new.id, {new}); END'
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {quote(fts + "_ad")} AFTER DELETE ON {quote(table)} BEGIN '
+            f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {columns}) VALUES ('delete', old.id, {old}); END"
+        )
+        # Only changes to the indexed columns touch the index
+        schema_editor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {quote(fts + "_au")} AFTER UPDATE OF {columns} ON {quote(table)} BEGIN '
+            f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+            f'INSERT INTO {quote(fts)}(rowid, {columns}) VALUES (new.id, {new}); END'
+        )
+        # (Re)index the rows already in the table
+        schema_editor.execute(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')")
+
+    def uninstall(self, schema_editor, table, fields):
+        quote = schema_editor.quote_name
+        fts = self.fts_table(table)
+        for suffix in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {quote(fts + suffix)}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {quote(fts)}')
+
+    def rebuild(self, schema_editor, table, fields):
+        # Recreates missing triggers and refills the index
+        self.install(schema_editor, table, fields)
+
+    def search(self, queryset, index, terms):
+        quote = connections[queryset.db].ops.quote_name
+        fts = quote(self.fts_table(index.table))
+        match = ' '.join(f'"{term}"*' for term in terms)
+        row = f'{quote(index.table)}.{quote(index.pk_column)}'
+        # bm25() is lower for better matches; the column weights mirror the
+        # Postgres ones
+        weights = ', '.join(str(2 ** (len(WEIGHTS) - WEIGHTS.index(weight))) for weight in index.fields.values())
+        return queryset.filter(
+            RawSQL(f'{row} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)', [match], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'(SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {row})',
+                [match], output_field=FloatField()
+            ),
+            search_snippet=RawSQL(
+                f"(SELECT snippet({fts}, -1, %s, %s, '…', 16) FROM {fts} WHERE {fts} MATCH %s AND rowid = {row})",
+                [MARK_START, MARK_END, match], output_field=TextField()
+            ),
+        )
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+def get_search_backend(connection):
+    """
+    Get the search backend for a database connection.
+
+    ``SEARCH_BACKEND`` picks it: ``auto`` (by database vendor), ``none`` to
+    fall back to ``icontains`` search, or the dotted path of a backend class.
+
+    Returns:
+        Backend instance, or None
+    """
+    setting = getattr(settings, 'SEARCH_BACKEND', 'auto') or 'none'
+    if setting == 'none':
+        return None
+    if setting == 'auto':
+        backend_class = BACKENDS.get(connection.vendor)
+        return backend_class() if backend_class else None
+    return import_string(setting)()
+
+
+def search_index_operation(table, fields):
+    """
+    Build the migration operation that creates (and on reverse drops) a search index.
+
+    Usage in a migration::
+
+        operations = [search_index_operation('app_model', {'title': 'A', 'body': 'C'})]
+    """
+    def forwards(apps, schema_editor):
+        backend = get_search_backend(schema_editor.connection)
+        if backend is not None:
+            backend.install(schema_editor, table, fields)
+
+    def backwards(apps, schema_editor):
+        backend = get_search_backend(schema_editor.connection)
+        if backend is not None:
+            backend.uninstall(schema_editor, table, fields)
+
+    return migrations.RunPython(forwards, backwards)
+
+
+class SQLExecutor:
+    """Runs backend SQL on a connection outside of a migration, like a schema editor would."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.quote_name = connection.ops.quote_name
+
+    def execute(self, sql):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql)
+
+
+def rebuild_search_index(index, using='default'):
+    """Recreate any missing parts of an index and refill it from its table."""
+    connection = connections[using]
+    backend = get_search_backend(connection)
+    if backend is None:
+        return False
+    with transaction.atomic(using=using):
+        backend.rebuild(SQLExecutor(connection), index.table, index.fields)
+    return True
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` backed by the model's full-text index.
+
+    Falls back to ``SearchFilter`` for models without an index and on
+    databases without a search backend.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = get_search_index(queryset.model)
+        backend = get_search_backend(connections[queryset.db]) if index else None
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = parse_terms(' '.join(self.get_search_terms(request)))
+        if not terms:
+            return queryset
+        return backend.search(queryset, index, terms)
+
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    """``OrderingFilter`` that orders search results by rank unless the client asks otherwise."""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *self.get_default_ordering(view)]
+        return super().get_ordering(request, queryset, view)
+
+
+class SearchSnippetMixin:
+    """Serializer mixin adding ``search_rank`` and ``search_snippet`` to search results."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        snippet = getattr(instance, 'search_snippet', None)
+        if snippet is not None:
+            data['search_rank'] = instance.search_rank
+            data['search_snippet'] = highlight(snippet)
+        return data
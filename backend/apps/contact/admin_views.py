@@ -1,27 +1,47 @@
 """
 Admin API views for contact app.
 """
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
+from apps.common.export import ExportMixin
+from apps.common.pagination import AdminPagination
+from apps.common.search import FullTextSearchFilter, SearchRankOrderingFilter
 from .models import ContactInquiry
 from .serializers import ContactInquiryAdminSerializer
 
 
-class AdminContactInquiryViewSet(viewsets.ModelViewSet):
+class AdminContactInquiryViewSet(ExportMixin, viewsets.ModelViewSet):
     """Admin ViewSet for ContactInquiry model with full management capabilities."""
     queryset = ContactInquiry.objects.all()
     serializer_class = ContactInquiryAdminSerializer
     permission_classes = [permissions.IsAdminUser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = AdminPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, SearchRankOrderingFilter]
     filterset_fields = ['inquiry_type', 'is_read', 'is_responded']
     search_fields = ['name', 'email', 'subject', 'message']
     ordering_fields = ['created_at', 'name', 'subject']
     ordering = ['-created_at']
+    export_filename = 'contact-inquiries'
+    # Both translations of the translated fields, whatever the admin's language
+    export_fields = [
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('inquiry_type', 'inquiry_type'),
+        ('is_read', 'is_read'),
+        ('is_responded', 'is_responded'),
+        ('name', 'name'),
+        ('email', 'email'),
+        ('phone', 'phone'),
+        ('subject_en', 'subject_en'),
+        ('subject_ar', 'subject_ar'),
+        ('message_en', 'message_en'),
+        ('message_ar', 'message_ar'),
+    ]
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0002_contactinquiry_message_ar_contactinquiry_message_en_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(fields=['-created_at'], name='inquiry_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at'], name='inquiry_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinquiry',
+            index=models.Index(condition=models.Q(('is_responded', False)), fields=['-created_at'], name='inquiry_pending_idx'),
+        ),
+    ]
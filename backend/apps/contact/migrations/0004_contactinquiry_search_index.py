@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from apps.common.search import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0003_contactinquiry_indexes'),
+    ]
+
+    operations = [
+        search_index_operation('contact_contactinquiry', {
+            'name': 'A',
+            'email': 'A',
+            'subject_en': 'B',
+            'subject_ar': 'B',
+            'message_en': 'C',
+            'message_ar': 'C',
+        }),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q
+from apps.common.search import register_search_index
 
 
 class ContactInquiry(models.Model):
@@ -27,6 +29,25 @@ class ContactInquiry(models.Model):
         verbose_name = 'Contact Inquiry'
         verbose_name_plural = 'Contact Inquiries'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='inquiry_created_idx'),
+            # Unread and pending-response lists only ever touch a small
+            # subset of rows, newest first
+            models.Index(fields=['-created_at'], name='inquiry_unread_idx', condition=Q(is_read=False)),
+            models.Index(fields=['-created_at'], name='inquiry_pending_idx', condition=Q(is_responded=False)),
+        ]
 
     def __str__(self):
-        return f"{self.subject} - {self.name} ({self.get_inquiry_type_display()})"
\ No newline at end of file
+        return f"{self.subject} - {self.name} ({self.get_inquiry_type_display()})"
+
+
+# Full-text index for the admin inquiry search (see apps.common.search).
+# Both translations are indexed so a search finds either language.
+register_search_index(ContactInquiry, {
+    'name': 'A',
+    'email': 'A',
+    'subject_en': 'B',
+    'subject_ar': 'B',
+    'message_en': 'C',
+    'message_ar': 'C',
+})
@@ -2,6 +2,7 @@
 Serializers for contact app.
 """
 from rest_framework import serializers
+from apps.common.search import SearchSnippetMixin
 from .models import ContactInquiry
 import re
 
@@ -144,7 +145,7 @@ class ContactInquiryPublicSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class ContactInquiryAdminSerializer(ContactInquirySerializer):
+class ContactInquiryAdminSerializer(SearchSnippetMixin, ContactInquirySerializer):
     """Admin serializer for ContactInquiry with additional fields."""
     
     class Meta(ContactInquirySerializer.Meta):
@@ -1,3 +1,39 @@
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import ContactInquiry
+
+
+class InquirySearchTests(TestCase):
+    """Tests for the full-text admin inquiry search."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True))
+
+    def test_search_covers_both_translations(self):
+        english = ContactInquiry.objects.create(
+            name='Sam', email='sam@example.com', subject='Pricing', message_en='How much is a research paper?'
+        )
+        arabic = ContactInquiry.objects.create(
+            name='Laila', email='laila@example.com', subject='استفسار', message_ar='أريد مساعدة في البحث العلمي'
+        )
+        response = self.client.get('/api/contact/admin/inquiries/', {'search': 'research'})
+        self.assertEqual([result['id'] for result in response.data['results']], [english.id])
+        self.assertIn('<mark>research</mark>', response.data['results'][0]['search_snippet'])
+
+        response = self.client.get('/api/contact/admin/inquiries/', {'search': 'البحث'})
+        self.assertEqual([result['id'] for result in response.data['results']], [arabic.id])
 
-# Create your tests here.
\ No newline at end of file
+    def test_export_includes_both_translations(self):
+        ContactInquiry.objects.create(
+            name='Laila', email='laila@example.com', subject_en='Question', subject_ar='سؤال', message='Hi', is_read=True
+        )
+        ContactInquiry.objects.create(name='Sam', email='sam@example.com', subject='Other', message='Hello')
+        response = self.client.get('/api/contact/admin/inquiries/export/', {'output': 'jsonl', 'is_read': 'true'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['subject_en'], rows[0]['subject_ar'], rows[0]['is_read']), ('Question', 'سؤال', True))
@@ -0,0 +1,63 @@
+"""
+Management command to backfill the DailyMetrics rollup table.
+Usage: python manage.py backfill_daily_metrics [--days N]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.service_requests.models import ServiceRequest
+from apps.contact.models import ContactInquiry
+from apps.dashboard.rollups import refresh_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily metrics rollup from the raw request and inquiry tables'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Only rebuild the last N days (default: the full history)',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Number of days rebuilt per transaction',
+        )
+    
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = options.get('days')
+        chunk_days = max(1, options['chunk_days'])
+        
+        if days:
+            start_date = today - timedelta(days=days - 1)
+        else:
+            earliest = [
+                value for value in (
+                    ServiceRequest.objects.aggregate(first=Min('created_at'))['first'],
+                    ContactInquiry.objects.aggregate(first=Min('created_at'))['first'],
+                ) if value
+            ]
+            if not earliest:
+                self.stdout.write(self.style.WARNING('No requests or inquiries found, nothing to backfill'))
+                return
+            start_date = timezone.localdate(min(earliest))
+        
+        self.stdout.write(f'Rebuilding daily metrics from {start_date} to {today}...')
+        
+        written = 0
+        chunk_start = start_date
+        while chunk_start <= today:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), today)
+            written += refresh_daily_metrics(chunk_start, chunk_end)
+            self.stdout.write(f'  {chunk_start} - {chunk_end}')
+            chunk_start = chunk_end + timedelta(days=1)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Wrote {written} daily metrics rows')
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('source', models.CharField(choices=[('service_request', 'Service Request'), ('contact_inquiry', 'Contact Inquiry')], max_length=20)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('priority', models.CharField(blank=True, max_length=10)),
+                ('inquiry_type', models.CharField(blank=True, max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.servicecategory')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Daily Metrics',
+                'verbose_name_plural': 'Daily Metrics',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['source', 'date'], name='dailymetrics_source_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:34
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def delete_duplicate_rows(apps, schema_editor):
+    """Keep the oldest of any rows a concurrent rebuild inserted twice."""
+    DailyMetrics = apps.get_model('dashboard', 'DailyMetrics')
+    seen = set()
+    duplicates = []
+    rows = DailyMetrics.objects.order_by('id').values_list(
+        'id', 'date', 'source', 'service_id', 'category_id', 'status', 'priority', 'inquiry_type'
+    )
+    for row in rows.iterator():
+        if row[1:] in seen:
+            duplicates.append(row[0])
+        seen.add(row[1:])
+    DailyMetrics.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetricsLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Metrics Lock',
+                'verbose_name_plural': 'Daily Metrics Locks',
+            },
+        ),
+        migrations.RunPython(delete_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailymetrics',
+            constraint=models.UniqueConstraint(models.F('date'), models.F('source'), django.db.models.functions.comparison.Coalesce('service', models.Value(0)), django.db.models.functions.comparison.Coalesce('category', models.Value(0)), models.F('status'), models.F('priority'), models.F('inquiry_type'), name='dailymetrics_unique_row'),
+        ),
+    ]
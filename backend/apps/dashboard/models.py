@@ -0,0 +1,71 @@
+from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+
+class DailyMetrics(models.Model):
+    """
+    Materialized daily rollup of service request and contact inquiry counts.
+
+    Each row counts the records created on ``date`` that share the same
+    dimensions. Status and priority reflect the current state of the records,
+    so a day's rows are recomputed whenever one of its records changes.
+    """
+    SOURCE_CHOICES = [
+        ('service_request', 'Service Request'),
+        ('contact_inquiry', 'Contact Inquiry'),
+    ]
+
+    date = models.DateField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    service = models.ForeignKey(
+        'services.Service', on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    category = models.ForeignKey(
+        'services.ServiceCategory', on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    status = models.CharField(max_length=20, blank=True)
+    priority = models.CharField(max_length=10, blank=True)
+    inquiry_type = models.CharField(max_length=20, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Daily Metrics'
+        verbose_name_plural = 'Daily Metrics'
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['source', 'date'], name='dailymetrics_source_date_idx'),
+        ]
+        constraints = [
+            # One row per day and combination of dimensions. NULLs never
+            # collide in a unique index, so the foreign keys inquiry rows
+            # leave empty are compared as 0.
+            models.UniqueConstraint(
+                'date', 'source', Coalesce('service', Value(0)), Coalesce('category', Value(0)),
+                'status', 'priority', 'inquiry_type',
+                name='dailymetrics_unique_row',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()} on {self.date}: {self.count}"
+
+
+
+class DailyMetricsLock(models.Model):
+    """
+    One row per rollup day, locked while the day is rebuilt.
+
+    ``refresh_daily_metrics`` takes a ``SELECT ... FOR UPDATE`` on the rows of
+    the days it rebuilds, so concurrent rebuilds of the same day run one after
+    the other instead of both deleting and then both inserting.
+    """
+    date = models.DateField(unique=True)
+
+    class Meta:
+        verbose_name = 'Daily Metrics Lock'
+        verbose_name_plural = 'Daily Metrics Locks'
+
+    def __str__(self):
+        return str(self.date)
@@ -0,0 +1,167 @@
+"""
+Maintenance of the DailyMetrics rollup table.
+
+A day's rows are always rebuilt as a whole: one grouped query over the raw
+table, then a delete and a bulk insert inside a transaction. This keeps the
+rollup correct when a record's status or priority changes after creation.
+Rebuilds of the same day are serialized on the day's ``DailyMetricsLock``
+row, and a unique constraint guarantees one row per day and dimensions.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
+
+from apps.service_requests.models import ServiceRequest
+from apps.contact.models import ContactInquiry
+from .models import DailyMetrics, DailyMetricsLock
+from .stats import start_of_day
+
+
+def rollups_enabled():
+    """Return True when dashboards should read from the rollup table."""
+    return getattr(settings, 'DASHBOARD_USE_DAILY_METRICS', False)
+
+
+def _inquiry_status(is_read, is_responded):
+    """Collapse the inquiry flags into a single status dimension."""
+    if is_responded:
+        return 'responded'
+    return 'read' if is_read else 'unread'
+
+
+def _request_rows(start, end):
+    """Group service requests created between ``start`` and ``end`` by dimension."""
+    rows = ServiceRequest.objects.filter(
+        created_at__gte=start, created_at__lt=end
+    ).annotate(
+        day=TruncDate('created_at')
+    ).order_by().values(
+        'day', 'service_id', 'service__category_id', 'status', 'priority'
+    ).annotate(total=Count('id'))
+
+    for row in rows:
+        yield DailyMetrics(
+            date=row['day'],
+            source='service_request',
+            service_id=row['service_id'],
+            category_id=row['service__category_id'],
+            status=row['status'],
+            priority=row['priority'],
+            count=row['total'],
+        )
+
+
+def _inquiry_rows(start, end):
+    """Group contact inquiries created between ``start`` and ``end`` by dimension."""
+    rows = ContactInquiry.objects.filter(
+        created_at__gte=start, created_at__lt=end
+    ).annotate(
+        day=TruncDate('created_at')
+    ).order_by().values(
+        'day', 'inquiry_type', 'is_read', 'is_responded'
+    ).annotate(total=Count('id'))
+
+    for row in rows:
+        yield DailyMetrics(
+            date=row['day'],
+            source='contact_inquiry',
+            inquiry_type=row['inquiry_type'],
+            status=_inquiry_status(row['is_read'], row['is_responded']),
+            count=row['total'],
+        )
+
+
+ROW_BUILDERS = {
+    'service_request': _request_rows,
+    'contact_inquiry': _inquiry_rows,
+}
+
+
+def refresh_daily_metrics(start_date, end_date=None, sources=None):
+    """
+    Rebuild the rollup rows for every day from ``start_date`` to ``end_date``.
+
+    Args:
+        start_date (date): First day to rebuild
+        end_date (date): Last day to rebuild (defaults to ``start_date``)
+        sources (list): Optional subset of DailyMetrics sources to rebuild
+
+    Returns:
+        Number of rollup rows written
+    """
+    end_date = end_date or start_date
+    start = start_of_day(start_date)
+    end = start_of_day(end_date + timedelta(days=1))
+
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    written = 0
+    with transaction.atomic():
+        # Wait for any other rebuild of these days; locking in date order
+        # keeps overlapping ranges from deadlocking
+        DailyMetricsLock.objects.bulk_create(
+            [DailyMetricsLock(date=day) for day in days], ignore_conflicts=True
+        )
+        list(DailyMetricsLock.objects.select_for_update().filter(
+            date__gte=start_date, date__lte=end_date
+        ).order_by('date').values_list('id', flat=True))
+
+        for source in sources or ROW_BUILDERS:
+            DailyMetrics.objects.filter(
+                source=source, date__gte=start_date, date__lte=end_date
+            ).delete()
+            rows = list(ROW_BUILDERS[source](start, end))
+            DailyMetrics.objects.bulk_create(rows)
+            written += len(rows)
+    return written
+
+
+def get_changed_dates(since):
+    """Get the creation dates of records modified since ``since``, per source."""
+    return {
+        'service_request': set(
+            ServiceRequest.objects.filter(updated_at__gte=since).dates('created_at', 'day')
+        ),
+        'contact_inquiry': set(
+            ContactInquiry.objects.filter(updated_at__gte=since).dates('created_at', 'day')
+        ),
+    }
+
+
+ROLLUP_TRUNCS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def rollup_counter(source, **filters):
+    """
+    Build a bucket counter that reads from the rollup table.
+
+    The returned callable has the same contract as
+    ``timeseries.count_by_bucket`` and can be passed to ``build_time_series``
+    in place of a queryset.
+    """
+    def counter(start_date, granularity):
+        queryset = DailyMetrics.objects.filter(source=source, date__gte=start_date, **filters)
+        if granularity in ROLLUP_TRUNCS:
+            queryset = queryset.annotate(bucket=ROLLUP_TRUNCS[granularity]('date'))
+            bucket_field = 'bucket'
+        else:
+            bucket_field = 'date'
+        rows = queryset.order_by().values(bucket_field).annotate(
+            total=Sum('count')
+        ).values_list(bucket_field, 'total')
+        return dict(rows)
+    return counter
+
+
+def rollup_totals(source, dimension, **filters):
+    """Sum the rollup counts for ``source`` grouped by ``dimension``."""
+    rows = DailyMetrics.objects.filter(source=source, **filters).order_by().values(
+        dimension
+    ).annotate(total=Sum('count')).values_list(dimension, 'total')
+    return dict(rows)
@@ -0,0 +1,63 @@
+"""
+Signals that keep the DailyMetrics rollup in sync with the raw tables.
+
+They only run when the dashboards read from the rollup
+(``DASHBOARD_USE_DAILY_METRICS``), and the rebuild waits for the saving
+transaction to commit, so it never runs inside the caller's write.
+"""
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.service_requests.models import ServiceRequest, requests_bulk_updated
+from apps.contact.models import ContactInquiry
+from .rollups import refresh_daily_metrics, rollups_enabled
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_days(days, source):
+    """Rebuild rollup days, logging rather than raising since the write already committed."""
+    try:
+        for day in days:
+            refresh_daily_metrics(day, sources=[source])
+    except Exception as e:
+        logger.error(f"Failed to update {source} daily metrics for {', '.join(map(str, days))}: {e}")
+
+
+def schedule_refresh(instance, source):
+    """Rebuild the rollup day of ``instance`` once the current transaction commits."""
+    if not rollups_enabled() or not instance.created_at:
+        return
+    day = timezone.localdate(instance.created_at)
+    transaction.on_commit(partial(refresh_days, [day], source))
+
+
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_delete, sender=ServiceRequest)
+def update_request_metrics(sender, instance, **kwargs):
+    """Rebuild the rollup day of a created, updated or deleted service request."""
+    schedule_refresh(instance, 'service_request')
+
+
+@receiver(requests_bulk_updated, sender=ServiceRequest)
+def update_bulk_request_metrics(sender, changes, **kwargs):
+    """Rebuild the rollup days touched by a bulk status or priority change."""
+    request_ids = [
+        pk for pk, changed in changes.items() if 'status' in changed or 'priority' in changed
+    ]
+    if not request_ids or not rollups_enabled():
+        return
+    days = list(ServiceRequest.objects.filter(pk__in=request_ids).dates('created_at', 'day'))
+    transaction.on_commit(partial(refresh_days, days, 'service_request'))
+
+
+@receiver(post_save, sender=ContactInquiry)
+@receiver(post_delete, sender=ContactInquiry)
+def update_inquiry_metrics(sender, instance, **kwargs):
+    """Rebuild the rollup day of a created, updated or deleted contact inquiry."""
+    schedule_refresh(instance, 'contact_inquiry')
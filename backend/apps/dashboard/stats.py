@@ -0,0 +1,142 @@
+"""
+Shared statistics engine for the admin dashboards.
+
+Every counter is computed with conditional aggregation (``Count(filter=Q(...))``)
+so each model costs a single query no matter how many counters are requested.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.services.models import ServiceCategory, Service
+from apps.service_requests.models import ServiceRequest, overdue_q
+from apps.portfolio.models import PortfolioItem
+from apps.contact.models import ContactInquiry
+
+
+def start_of_day(date):
+    """Return the aware datetime for midnight of ``date`` in the current timezone."""
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def get_recent_windows(today=None):
+    """
+    Get the lower bounds used by the "recent" counters.
+
+    Bounds are datetimes rather than ``created_at__date`` lookups so the
+    database can use an index on ``created_at``.
+    """
+    today = today or timezone.localdate()
+    return {
+        'today': start_of_day(today),
+        'this_week': start_of_day(today - timedelta(days=7)),
+        'this_month': start_of_day(today - timedelta(days=30)),
+    }
+
+
+def _recent_aggregates(windows):
+    """Build conditional counters for the recent activity windows."""
+    return {
+        f'recent_{name}': Count('id', filter=Q(created_at__gte=start))
+        for name, start in windows.items()
+    }
+
+
+def get_service_stats():
+    """Get category and service counters."""
+    categories = ServiceCategory.objects.aggregate(
+        total_categories=Count('id'),
+        active_categories=Count('id', filter=Q(is_active=True)),
+    )
+    services = Service.objects.aggregate(
+        total_services=Count('id'),
+        active_services=Count('id', filter=Q(is_active=True)),
+    )
+    return {**categories, **services}
+
+
+def get_request_counts(queryset=None, today=None):
+    """
+    Get all service request counters in a single query.
+
+    Returns a flat dictionary with status, priority, overdue, unassigned and
+    recent activity counters. Callers reshape it into their own payloads.
+    """
+    if queryset is None:
+        queryset = ServiceRequest.objects.all()
+    today = today or timezone.localdate()
+
+    aggregates = {
+        'total': Count('id'),
+        'overdue': Count('id', filter=overdue_q(today)),
+        'unassigned': Count('id', filter=Q(assigned_to__isnull=True)),
+    }
+    for status_value, _ in ServiceRequest.STATUS_CHOICES:
+        aggregates[status_value] = Count('id', filter=Q(status=status_value))
+    for priority_value, _ in ServiceRequest.PRIORITY_CHOICES:
+        aggregates[f'priority_{priority_value}'] = Count('id', filter=Q(priority=priority_value))
+    aggregates.update(_recent_aggregates(get_recent_windows(today)))
+
+    # order_by() drops the default ordering, which is irrelevant to the aggregate
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def get_request_stats(queryset=None, today=None):
+    """Get service request statistics in the dashboard overview shape."""
+    counts = get_request_counts(queryset, today)
+    return {
+        'total': counts['total'],
+        'pending': counts['pending'],
+        'in_progress': counts['in_progress'],
+        'completed': counts['completed'],
+        'cancelled': counts['cancelled'],
+        'overdue': counts['overdue'],
+        'unassigned': counts['unassigned'],
+        'recent': {
+            'today': counts['recent_today'],
+            'this_week': counts['recent_this_week'],
+            'this_month': counts['recent_this_month'],
+        }
+    }
+
+
+def get_portfolio_stats():
+    """Get portfolio item counters."""
+    return PortfolioItem.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        featured=Count('id', filter=Q(is_featured=True)),
+    )
+
+
+def get_contact_counts(queryset=None, today=None):
+    """Get all contact inquiry counters in a single query."""
+    if queryset is None:
+        queryset = ContactInquiry.objects.all()
+    today = today or timezone.localdate()
+
+    aggregates = {
+        'total': Count('id'),
+        'unread': Count('id', filter=Q(is_read=False)),
+        'pending_response': Count('id', filter=Q(is_responded=False)),
+        'responded': Count('id', filter=Q(is_responded=True)),
+    }
+    aggregates.update(_recent_aggregates(get_recent_windows(today)))
+
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def get_contact_stats(queryset=None, today=None):
+    """Get contact inquiry statistics in the dashboard overview shape."""
+    counts = get_contact_counts(queryset, today)
+    return {
+        'total': counts['total'],
+        'unread': counts['unread'],
+        'pending_response': counts['pending_response'],
+        'recent': {
+            'today': counts['recent_today'],
+            'this_week': counts['recent_this_week'],
+            'this_month': counts['recent_this_month'],
+        }
+    }
@@ -0,0 +1,36 @@
+"""
+Celery tasks for dashboard maintenance.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.cache import cache
+from django.utils import timezone
+
+from .rollups import refresh_daily_metrics, get_changed_dates
+
+LAST_RUN_CACHE_KEY = 'dashboard:daily_metrics:last_run'
+
+
+@shared_task
+def update_daily_metrics():
+    """
+    Incrementally update the DailyMetrics rollup.
+    
+    Rebuilds yesterday and today, plus every day that owns a record modified
+    since the previous run. This catches changes made through
+    ``QuerySet.update()``, which bypasses the post_save hooks.
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    since = cache.get(LAST_RUN_CACHE_KEY) or now - timedelta(days=2)
+    
+    dates_by_source = get_changed_dates(since)
+    written = 0
+    for source, dates in dates_by_source.items():
+        dates.update({today - timedelta(days=1), today})
+        for day in sorted(dates):
+            written += refresh_daily_metrics(day, sources=[source])
+    
+    cache.set(LAST_RUN_CACHE_KEY, now, timeout=None)
+    return f"Wrote {written} daily metrics rows"
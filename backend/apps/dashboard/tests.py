@@ -0,0 +1,184 @@
+from io import StringIO
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.services.models import ServiceCategory, Service
+from apps.service_requests.models import ServiceRequest
+from apps.portfolio.models import PortfolioItem
+from apps.contact.models import ContactInquiry
+from .models import DailyMetrics, DailyMetricsLock
+from .rollups import refresh_daily_metrics
+
+
+class DashboardTestMixin:
+    """Shared fixtures for dashboard endpoint tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.category = ServiceCategory.objects.create(name='Writing', description='Writing services')
+        cls.service = Service.objects.create(
+            category=cls.category, title='Essay', description='Essay writing',
+            short_description='Essays', price_range='$50', delivery_time='3 days'
+        )
+        today = timezone.localdate()
+        cls.requests = [
+            cls.make_request('pending', today + timedelta(days=5)),
+            cls.make_request('pending', today - timedelta(days=2)),
+            cls.make_request('in_progress', today - timedelta(days=1), assigned_to=cls.admin),
+            cls.make_request('completed', today - timedelta(days=3)),
+            cls.make_request('cancelled', today - timedelta(days=3)),
+        ]
+        PortfolioItem.objects.create(
+            title='Thesis', description='A thesis project', service_category=cls.category,
+            client_type='Student', completion_date=today, is_featured=True
+        )
+        ContactInquiry.objects.create(name='Sam', email='sam@example.com', subject='Hi', message='Hello there')
+        ContactInquiry.objects.create(
+            name='Ali', email='ali@example.com', subject='Quote', message='Need a quote',
+            is_read=True, is_responded=True
+        )
+
+    @classmethod
+    def make_request(cls, status, deadline, **kwargs):
+        return ServiceRequest.objects.create(
+            service=cls.service, client_name='Client', client_email='client@example.com',
+            project_title='Project', project_description='Description', deadline=deadline,
+            budget='$100', status=status, **kwargs
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class DashboardOverviewTests(DashboardTestMixin, TestCase):
+    """Tests for the dashboard overview endpoint."""
+
+    def test_overview_counters(self):
+        response = self.client.get('/api/dashboard/overview/')
+        self.assertEqual(response.status_code, 200)
+        requests = response.data['requests']
+        self.assertEqual(requests['total'], 5)
+        self.assertEqual(requests['pending'], 2)
+        self.assertEqual(requests['overdue'], 2)
+        self.assertEqual(requests['unassigned'], 4)
+        self.assertEqual(requests['recent']['today'], 5)
+        self.assertEqual(response.data['services']['active_services'], 1)
+        self.assertEqual(response.data['portfolio']['featured'], 1)
+        self.assertEqual(response.data['contact']['unread'], 1)
+        self.assertEqual(response.data['top_services'][0]['request_count'], 5)
+
+    def test_overview_query_count(self):
+        # Categories, services, requests, portfolio, contact, recent requests,
+        # recent inquiries and top services: one query each.
+        with self.assertNumQueries(8):
+            self.client.get('/api/dashboard/overview/')
+
+        for _ in range(10):
+            self.make_request('pending', timezone.localdate() - timedelta(days=1))
+        with self.assertNumQueries(8):
+            self.client.get('/api/dashboard/overview/')
+
+
+class DashboardAnalyticsTests(DashboardTestMixin, TestCase):
+    """Tests for the dashboard analytics endpoint."""
+
+    def test_daily_activity_is_zero_filled(self):
+        response = self.client.get('/api/dashboard/analytics/', {'days': 90})
+        self.assertEqual(response.status_code, 200)
+        activity = response.data['daily_activity']
+        self.assertEqual(len(activity), 90)
+        self.assertEqual(activity[-1]['date'], timezone.localdate().isoformat())
+        self.assertEqual(activity[-1]['requests'], 5)
+        self.assertEqual(activity[-1]['inquiries'], 2)
+        self.assertEqual(sum(point['requests'] for point in activity[:-1]), 0)
+
+    def test_granularity(self):
+        response = self.client.get('/api/dashboard/analytics/', {'days': 365, 'granularity': 'month'})
+        activity = response.data['daily_activity']
+        self.assertIn(len(activity), (12, 13))
+        self.assertEqual(sum(point['requests'] for point in activity), 5)
+
+        response = self.client.get('/api/dashboard/analytics/', {'granularity': 'hour'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_depend_on_window(self):
+        with self.assertNumQueries(7):
+            self.client.get('/api/dashboard/analytics/', {'days': 30})
+        with self.assertNumQueries(7):
+            self.client.get('/api/dashboard/analytics/', {'days': 365})
+
+
+class DailyMetricsTests(DashboardTestMixin, TestCase):
+    """Tests for the DailyMetrics rollup table."""
+
+    @override_settings(DASHBOARD_USE_DAILY_METRICS=True)
+    def test_signals_keep_rollup_live(self):
+        call_command('backfill_daily_metrics', stdout=StringIO())
+        rows = DailyMetrics.objects.filter(source='service_request')
+        self.assertEqual(sum(row.count for row in rows), 5)
+
+        request = self.requests[0]
+        request.status = 'completed'
+        with self.captureOnCommitCallbacks(execute=True):
+            request.save()
+        completed = DailyMetrics.objects.get(
+            source='service_request', status='completed', priority='normal'
+        )
+        self.assertEqual(completed.count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            request.delete()
+        rows = DailyMetrics.objects.filter(source='service_request')
+        self.assertEqual(sum(row.count for row in rows), 4)
+
+    def test_signals_stay_off_the_write_path(self):
+        request = self.requests[0]
+        request.notes = 'Called the client'
+        # Disabled by default: nothing is scheduled at all
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            request.save()
+        self.assertEqual(callbacks, [])
+        self.assertFalse([q for q in queries if 'dashboard_dailymetrics' in q['sql']])
+
+        # Enabled: the rebuild waits for the commit
+        with override_settings(DASHBOARD_USE_DAILY_METRICS=True):
+            with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+                request.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse([q for q in queries if 'dashboard_dailymetrics' in q['sql']])
+
+    def test_one_row_per_day_and_dimensions(self):
+        today = timezone.localdate()
+        refresh_daily_metrics(today)
+        refresh_daily_metrics(today - timedelta(days=1), today)
+        self.assertEqual(DailyMetricsLock.objects.filter(date=today).count(), 1)
+        self.assertEqual(
+            sum(DailyMetrics.objects.filter(source='contact_inquiry').values_list('count', flat=True)), 2
+        )
+
+        # Inquiry rows leave the foreign keys NULL and are still unique
+        row = DailyMetrics.objects.filter(source='contact_inquiry').first()
+        row.pk = None
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            row.save()
+
+    def test_analytics_from_rollup_matches_live(self):
+        live = self.client.get('/api/dashboard/analytics/').data
+        DailyMetrics.objects.all().delete()
+        call_command('backfill_daily_metrics', stdout=StringIO())
+
+        with override_settings(DASHBOARD_USE_DAILY_METRICS=True):
+            rollup = self.client.get('/api/dashboard/analytics/').data
+
+        for key in ('daily_activity', 'request_status_distribution',
+                    'inquiry_type_distribution', 'category_performance'):
+            self.assertEqual(rollup[key], live[key])
@@ -12,6 +12,13 @@ from apps.services.models import ServiceCategory, Service
 from apps.service_requests.models import ServiceRequest
 from apps.portfolio.models import PortfolioItem
 from apps.contact.models import ContactInquiry
+from apps.service_requests.email_tracking import EmailNotification
+from .stats import (
+    get_service_stats, get_request_counts, get_request_stats,
+    get_portfolio_stats, get_contact_stats
+)
+from .timeseries import build_time_series, parse_window_params
+from .rollups import rollups_enabled, rollup_counter, rollup_totals
 
 
 @api_view(['GET'])
@@ -19,11 +26,12 @@ from apps.contact.models import ContactInquiry
 def dashboard_stats(request):
     """Get basic dashboard statistics for admin panel."""
     # Basic stats
+    request_counts = get_request_counts()
     stats = {
-        'totalServices': Service.objects.filter(is_active=True).count(),
-        'pendingRequests': ServiceRequest.objects.filter(status='pending').count(),
-        'activeRequests': ServiceRequest.objects.filter(status='in_progress').count(),
-        'portfolioItems': PortfolioItem.objects.filter(is_active=True).count(),
+        'totalServices': get_service_stats()['active_services'],
+        'pendingRequests': request_counts['pending'],
+        'activeRequests': request_counts['in_progress'],
+        'portfolioItems': get_portfolio_stats()['active'],
     }
     
     # Recent activity (simplified for frontend)
@@ -49,54 +57,13 @@ def dashboard_stats(request):
 def dashboard_overview(request):
     """Get comprehensive dashboard overview with data from all apps."""
     now = timezone.now()
-    today = now.date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
+    today = timezone.localdate()
     
-    # Service statistics
-    services_stats = {
-        'total_categories': ServiceCategory.objects.count(),
-        'active_categories': ServiceCategory.objects.filter(is_active=True).count(),
-        'total_services': Service.objects.count(),
-        'active_services': Service.objects.filter(is_active=True).count(),
-    }
-    
-    # Service request statistics
-    service_requests = ServiceRequest.objects.all()
-    requests_stats = {
-        'total': service_requests.count(),
-        'pending': service_requests.filter(status='pending').count(),
-        'in_progress': service_requests.filter(status='in_progress').count(),
-        'completed': service_requests.filter(status='completed').count(),
-        'cancelled': service_requests.filter(status='cancelled').count(),
-        'overdue': len([r for r in service_requests if r.is_overdue]),
-        'unassigned': service_requests.filter(assigned_to=None).count(),
-        'recent': {
-            'today': service_requests.filter(created_at__date=today).count(),
-            'this_week': service_requests.filter(created_at__date__gte=week_ago).count(),
-            'this_month': service_requests.filter(created_at__date__gte=month_ago).count(),
-        }
-    }
-    
-    # Portfolio statistics
-    portfolio_stats = {
-        'total': PortfolioItem.objects.count(),
-        'active': PortfolioItem.objects.filter(is_active=True).count(),
-        'featured': PortfolioItem.objects.filter(is_featured=True).count(),
-    }
-    
-    # Contact inquiry statistics
-    contact_inquiries = ContactInquiry.objects.all()
-    contact_stats = {
-        'total': contact_inquiries.count(),
-        'unread': contact_inquiries.filter(is_read=False).count(),
-        'pending_response': contact_inquiries.filter(is_responded=False).count(),
-        'recent': {
-            'today': contact_inquiries.filter(created_at__date=today).count(),
-            'this_week': contact_inquiries.filter(created_at__date__gte=week_ago).count(),
-            'this_month': contact_inquiries.filter(created_at__date__gte=month_ago).count(),
-        }
-    }
+    # Each group of counters is a single conditional-aggregation query
+    services_stats = get_service_stats()
+    requests_stats = get_request_stats(today=today)
+    portfolio_stats = get_portfolio_stats()
+    contact_stats = get_contact_stats(today=today)
     
     # Recent activity (last 10 items)
     recent_requests = ServiceRequest.objects.select_related('service').order_by('-created_at')[:5]
@@ -129,7 +96,7 @@ def dashboard_overview(request):
     recent_activity = recent_activity[:10]
     
     # Top services by request count
-    top_services = Service.objects.annotate(
+    top_services = Service.objects.select_related('category').annotate(
         request_count=Count('requests')
     ).filter(request_count__gt=0).order_by('-request_count')[:5]
     
@@ -193,61 +160,91 @@ def dashboard_overview(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def dashboard_analytics(request):
-    """Get analytics data for charts and graphs."""
+    """
+    Get analytics data for charts and graphs.
+    
+    Query parameters:
+        days: Size of the activity window in days (default 30, max 730)
+        granularity: Bucket size for the activity series ('day', 'week' or 'month')
+    """
     now = timezone.now()
-    today = now.date()
     
-    # Get data for the last 30 days
-    daily_data = []
-    for i in range(30):
-        date = today - timedelta(days=i)
-        daily_data.append({
-            'date': date.isoformat(),
-            'requests': ServiceRequest.objects.filter(created_at__date=date).count(),
-            'inquiries': ContactInquiry.objects.filter(created_at__date=date).count(),
-        })
+    try:
+        days, granularity = parse_window_params(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    use_rollups = rollups_enabled()
+    
+    # One grouped query per series instead of one COUNT per day
+    if use_rollups:
+        requests_series = rollup_counter('service_request')
+        inquiries_series = rollup_counter('contact_inquiry')
+    else:
+        requests_series = ServiceRequest.objects.all()
+        inquiries_series = ContactInquiry.objects.all()
     
-    daily_data.reverse()  # Show oldest to newest
+    daily_data = build_time_series({
+        'requests': requests_series,
+        'inquiries': inquiries_series,
+        'emails': EmailNotification.objects.all(),
+    }, days=days, granularity=granularity)
     
     # Request status distribution
+    if use_rollups:
+        status_counts = rollup_totals('service_request', 'status')
+    else:
+        status_counts = dict(
+            ServiceRequest.objects.order_by().values_list('status').annotate(count=Count('id'))
+        )
     request_status_data = []
     for status_value, status_label in ServiceRequest.STATUS_CHOICES:
-        count = ServiceRequest.objects.filter(status=status_value).count()
         request_status_data.append({
             'status': status_value,
             'label': status_label,
-            'count': count
+            'count': status_counts.get(status_value, 0)
         })
     
     # Inquiry type distribution
+    if use_rollups:
+        type_counts = rollup_totals('contact_inquiry', 'inquiry_type')
+    else:
+        type_counts = dict(
+            ContactInquiry.objects.order_by().values_list('inquiry_type').annotate(count=Count('id'))
+        )
     inquiry_type_data = []
     for type_value, type_label in ContactInquiry.INQUIRY_TYPES:
-        count = ContactInquiry.objects.filter(inquiry_type=type_value).count()
         inquiry_type_data.append({
             'type': type_value,
             'label': type_label,
-            'count': count
+            'count': type_counts.get(type_value, 0)
         })
     
     # Service category performance
     category_performance = []
     categories = ServiceCategory.objects.annotate(
-        service_count=Count('services'),
-        request_count=Count('services__requests'),
-        portfolio_count=Count('portfolio_items')
+        service_count=Count('services', distinct=True),
+        portfolio_count=Count('portfolio_items', distinct=True)
     ).filter(is_active=True)
+    if use_rollups:
+        category_requests = rollup_totals('service_request', 'category_id')
+    else:
+        category_requests = dict(
+            ServiceRequest.objects.order_by().values_list('service__category_id').annotate(count=Count('id'))
+        )
     
     for category in categories:
         category_performance.append({
             'id': category.id,
             'name': category.name,
             'services': category.service_count,
-            'requests': category.request_count,
+            'requests': category_requests.get(category.id, 0),
             'portfolio_items': category.portfolio_count
         })
     
     analytics_data = {
         'daily_activity': daily_data,
+        'window': {'days': days, 'granularity': granularity},
         'request_status_distribution': request_status_data,
         'inquiry_type_distribution': inquiry_type_data,
         'category_performance': category_performance,
@@ -0,0 +1,203 @@
+"""
+Per-request SQL and serializer instrumentation.
+
+A ``RequestProfile`` is attached to a sampled request by
+``RequestProfilingMiddleware``. While it is active, every query on every
+database connection goes through ``RequestProfile.execute`` and every
+top-level ``serializer.data`` call is timed. Finished profiles are folded into
+``route_stats``, an in-memory, per-process store of recent samples per route.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+def get_setting(name, default):
+    """Read a REQUEST_PROFILING_* setting."""
+    return getattr(settings, f'REQUEST_PROFILING_{name}', default)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+class RequestProfile:
+    """Query and timing counters for a single request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.response_size = 0
+        self._serializer_depth = 0
+        # SQL template -> [executions, set of parameter tuples]
+        self._statements = defaultdict(lambda: [0, set()])
+
+    def execute(self, execute, sql, params, many, context):
+        """Database execute wrapper that counts and times each query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.query_count += 1
+            statement = self._statements[sql]
+            statement[0] += 1
+            if not many and len(statement[1]) < 100:
+                try:
+                    statement[1].add(tuple(params or ()))
+                except TypeError:
+                    statement[1].add(repr(params))
+
+    def duplicate_queries(self, threshold=None):
+        """
+        Get the statements that look like an N+1 pattern.
+
+        A statement qualifies when the same SQL ran at least ``threshold``
+        times with at least two different sets of parameters.
+        """
+        threshold = threshold or get_setting('N_PLUS_ONE_THRESHOLD', 5)
+        return sorted(
+            (
+                {'sql': sql, 'count': count, 'distinct_params': len(param_sets)}
+                for sql, (count, param_sets) in self._statements.items()
+                if count >= threshold and len(param_sets) > 1
+            ),
+            key=lambda statement: -statement['count'],
+        )
+
+    def finish(self, response):
+        """Stop the clock and record the response size."""
+        self.duration = time.perf_counter() - self.start
+        if not getattr(response, 'streaming', False):
+            self.response_size = len(response.content)
+
+    def server_timing(self):
+        """Format the counters as a ``Server-Timing`` header value."""
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'serialize;dur={self.serializer_time * 1000:.1f}',
+            f'total;dur={self.duration * 1000:.1f}',
+        ])
+
+    def activate(self):
+        return _current_profile.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current_profile.reset(token)
+
+
+def get_current_profile():
+    """Return the profile of the request being handled, if it is sampled."""
+    return _current_profile.get()
+
+
+class RouteStats:
+    """Thread-safe store of recent request samples, grouped by route."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = defaultdict(lambda: {'requests': 0, 'n_plus_one': 0})
+        self._duplicates = {}
+
+    def record(self, route, profile, duplicates=()):
+        sample = (
+            profile.duration, profile.sql_time, profile.query_count,
+            profile.serializer_time, profile.response_size,
+        )
+        with self._lock:
+            if route not in self._samples:
+                self._samples[route] = deque(maxlen=self.window)
+            self._samples[route].append(sample)
+            self._totals[route]['requests'] += 1
+            if duplicates:
+                self._totals[route]['n_plus_one'] += 1
+                self._duplicates[route] = duplicates[:5]
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._duplicates.clear()
+
+    def snapshot(self):
+        """Get per-route percentiles for the recent samples."""
+        with self._lock:
+            samples = {route: list(values) for route, values in self._samples.items()}
+            totals = {route: dict(values) for route, values in self._totals.items()}
+            duplicates = dict(self._duplicates)
+
+        routes = []
+        for route, values in samples.items():
+            columns = list(zip(*values))
+            entry = {
+                'route': route,
+                'sampled_requests': totals[route]['requests'],
+                'n_plus_one_requests': totals[route]['n_plus_one'],
+                'window': len(values),
+            }
+            for name, column, scale in (
+                ('duration_ms', columns[0], 1000),
+                ('sql_ms', columns[1], 1000),
+                ('queries', columns[2], 1),
+                ('serializer_ms', columns[3], 1000),
+                ('response_bytes', columns[4], 1),
+            ):
+                ordered = sorted(column)
+                entry[name] = {
+                    f'p{pct}': round(percentile(ordered, pct) * scale, 2)
+                    for pct in (50, 95, 99)
+                }
+                entry[name]['max'] = round(ordered[-1] * scale, 2)
+            if route in duplicates:
+                entry['last_duplicates'] = duplicates[route]
+            routes.append(entry)
+
+        routes.sort(key=lambda entry: -entry['duration_ms']['p95'])
+        return routes
+
+
+route_stats = RouteStats(window=get_setting('WINDOW', 500))
+
+
+def _timed_data(original):
+    """Wrap ``BaseSerializer.data`` so the outermost call is timed."""
+    def data(serializer):
+        profile = get_current_profile()
+        if profile is None:
+            return original.fget(serializer)
+        profile._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original.fget(serializer)
+        finally:
+            profile._serializer_depth -= 1
+            if not profile._serializer_depth:
+                profile.serializer_time += time.perf_counter() - start
+    data.instrumented = True
+    return property(data)
+
+
+def install_serializer_timing():
+    """Patch DRF once so serializer time is attributed to the active profile."""
+    from rest_framework.serializers import BaseSerializer
+
+    if not getattr(BaseSerializer.data.fget, 'instrumented', False):
+        BaseSerializer.data = _timed_data(BaseSerializer.data)
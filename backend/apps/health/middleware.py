@@ -0,0 +1,71 @@
+"""
+Request profiling middleware.
+"""
+import logging
+import random
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .instrumentation import (
+    RequestProfile, get_setting, install_serializer_timing, route_stats
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """
+    Record SQL, serializer and response-size metrics for sampled requests.
+
+    Only a ``REQUEST_PROFILING_SAMPLE_RATE`` fraction of requests is profiled;
+    the rest pass straight through. Sampled requests get a ``Server-Timing``
+    header when ``REQUEST_PROFILING_SERVER_TIMING`` is on, and N+1 patterns
+    are logged as warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting('ENABLED', False)
+        self.sample_rate = get_setting('SAMPLE_RATE', 0.1)
+        self.server_timing = get_setting('SERVER_TIMING', False)
+        if self.enabled:
+            install_serializer_timing()
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = profile.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute))
+                response = self.get_response(request)
+        finally:
+            RequestProfile.deactivate(token)
+
+        profile.finish(response)
+        duplicates = profile.duplicate_queries()
+        route = self.get_route(request)
+        route_stats.record(route, profile, duplicates)
+
+        if duplicates:
+            logger.warning(
+                'Possible N+1 on %s: %d executions of %s',
+                route, duplicates[0]['count'], duplicates[0]['sql'][:200]
+            )
+        if self.server_timing:
+            response['Server-Timing'] = profile.server_timing()
+        return response
+
+    @staticmethod
+    def get_route(request):
+        """Group requests by URL pattern rather than by concrete path."""
+        match = getattr(request, 'resolver_match', None)
+        if not match or not match.route:
+            return f'{request.method} {request.path}'
+        # Router URLs are regex patterns; drop the anchors from the route
+        route = match.route.replace('^', '').replace('\\Z', '').replace('$', '')
+        return f'{request.method} /{route}'
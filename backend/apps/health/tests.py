@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.services.models import ServiceCategory, Service
+from .instrumentation import RequestProfile, route_stats
+
+
+@override_settings(
+    REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SAMPLE_RATE=1.0,
+    REQUEST_PROFILING_SERVER_TIMING=True, REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD=3,
+    CATALOG_CACHE_ENABLED=False,
+)
+class RequestProfilingTests(TestCase):
+    """Tests for the request profiling middleware and metrics endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.category = ServiceCategory.objects.create(name='Writing', description='Writing services')
+        for i in range(4):
+            Service.objects.create(
+                category=cls.category, title=f'Service {i}', description='Description',
+                short_description='Short', price_range='$50', delivery_time='3 days'
+            )
+
+    def setUp(self):
+        route_stats.reset()
+        self.client = APIClient()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/services/public/services/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/services/public/services/')
+        self.client.get('/api/services/public/services/')
+
+        response = self.client.get('/metrics/requests/')
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(self.admin)
+        routes = {entry['route']: entry for entry in self.client.get('/metrics/requests/').data['routes']}
+        entry = routes['GET /api/services/public/services/']
+        self.assertEqual(entry['sampled_requests'], 2)
+        self.assertGreater(entry['queries']['p50'], 0)
+        self.assertGreater(entry['response_bytes']['max'], 0)
+
+    def test_n_plus_one_detection(self):
+        profile = RequestProfile()
+        with connection.execute_wrapper(profile.execute):
+            for service in Service.objects.all():
+                ServiceCategory.objects.get(pk=service.category_id)
+
+        self.assertEqual(profile.query_count, 5)
+        # Same category id each time, so this is a repeat, not an N+1
+        self.assertEqual(profile.duplicate_queries(), [])
+
+        profile = RequestProfile()
+        with connection.execute_wrapper(profile.execute):
+            for service in Service.objects.all():
+                Service.objects.get(pk=service.pk)
+        duplicates = profile.duplicate_queries()
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['count'], 4)
+        self.assertEqual(duplicates[0]['distinct_params'], 4)
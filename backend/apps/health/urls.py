@@ -7,4 +7,5 @@ from . import views
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
     path('ready/', views.readiness_check, name='readiness_check'),
+    path('metrics/requests/', views.request_metrics, name='request_metrics'),
 ]
\ No newline at end of file
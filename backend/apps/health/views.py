@@ -4,6 +4,9 @@ Health check views for monitoring deployment status.
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 import sys
 import django
 
@@ -39,4 +42,21 @@ def readiness_check(request):
         return JsonResponse({
             'status': 'not_ready',
             'error': str(e)
-        }, status=503)
\ No newline at end of file
+        }, status=503)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def request_metrics(request):
+    """Per-route latency and query percentiles for profiled requests (admin only)."""
+    from .instrumentation import route_stats, get_setting
+
+    if request.method == 'DELETE':
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    return Response({
+        'enabled': get_setting('ENABLED', False),
+        'sample_rate': get_setting('SAMPLE_RATE', 0.1),
+        'routes': route_stats.snapshot(),
+    })
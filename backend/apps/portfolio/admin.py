@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from modeltranslation.admin import TranslationAdmin
+from apps.services.catalog_cache import bump_catalog_version
 from .models import PortfolioItem
 
 
@@ -60,6 +61,7 @@ class PortfolioItemAdmin(TranslationAdmin):
     def mark_as_featured(self, request, queryset):
         """Bulk action to mark items as featured."""
         updated = queryset.update(is_featured=True)
+        bump_catalog_version()
         self.message_user(
             request, 
             f'{updated} portfolio item(s) marked as featured.'
@@ -69,6 +71,7 @@ class PortfolioItemAdmin(TranslationAdmin):
     def unmark_as_featured(self, request, queryset):
         """Bulk action to unmark items as featured."""
         updated = queryset.update(is_featured=False)
+        bump_catalog_version()
         self.message_user(
             request, 
             f'{updated} portfolio item(s) unmarked as featured.'
@@ -6,20 +6,27 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count, Q
+from apps.common.ordering import ReorderMixin
+from apps.common.pagination import AdminPagination
 from .models import PortfolioItem
 from .serializers import PortfolioItemAdminSerializer
+from apps.services.catalog_cache import bump_catalog_version
 
 
-class AdminPortfolioItemViewSet(viewsets.ModelViewSet):
+class AdminPortfolioItemViewSet(ReorderMixin, viewsets.ModelViewSet):
     """Admin ViewSet for PortfolioItem model with full CRUD operations."""
     queryset = PortfolioItem.objects.all()
     serializer_class = PortfolioItemAdminSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = AdminPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'is_featured', 'service_category']
     search_fields = ['title', 'description', 'client_type', 'technologies_used']
     ordering_fields = ['title', 'completion_date', 'order', 'created_at']
     ordering = ['-is_featured', 'order', '-completion_date']
+    reorder_payload_key = 'items'
+    reorder_label = 'Portfolio item'
+    reorder_callback = staticmethod(bump_catalog_version)
     
     def get_queryset(self):
         """Get all portfolio items with related data."""
@@ -45,19 +52,6 @@ class AdminPortfolioItemViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(portfolio_item)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['patch'])
-    def bulk_update_order(self, request):
-        """Bulk update portfolio item order."""
-        item_orders = request.data.get('items', [])
-        
-        for item in item_orders:
-            item_id = item.get('id')
-            new_order = item.get('order')
-            if item_id and new_order is not None:
-                PortfolioItem.objects.filter(id=item_id).update(order=new_order)
-        
-        return Response({'message': 'Portfolio item orders updated successfully'})
-    
     @action(detail=False, methods=['patch'])
     def bulk_toggle_featured(self, request):
         """Bulk toggle featured status of portfolio items."""
@@ -65,6 +59,7 @@ class AdminPortfolioItemViewSet(viewsets.ModelViewSet):
         featured_status = request.data.get('featured', True)
         
         updated_count = PortfolioItem.objects.filter(id__in=item_ids).update(is_featured=featured_status)
+        bump_catalog_version()
         
         return Response({
             'message': f'{updated_count} portfolio items updated successfully',
@@ -78,6 +73,7 @@ class AdminPortfolioItemViewSet(viewsets.ModelViewSet):
         active_status = request.data.get('active', True)
         
         updated_count = PortfolioItem.objects.filter(id__in=item_ids).update(is_active=active_status)
+        bump_catalog_version()
         
         return Response({
             'message': f'{updated_count} portfolio items updated successfully',
@@ -6,4 +6,5 @@ class PortfolioConfig(AppConfig):
     name = 'apps.portfolio'
     
     def ready(self):
-        import apps.portfolio.translation  # noqa
\ No newline at end of file
+        import apps.portfolio.translation  # noqa
+        import apps.portfolio.signals  # noqa
\ No newline at end of file
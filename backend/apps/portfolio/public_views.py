@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import PortfolioItem
 from .serializers import PortfolioItemSerializer
+from apps.services.catalog_cache import cache_catalog_response
+from apps.services.catalog_search import CatalogSearchFilter
 
 
 class PublicPortfolioItemViewSet(viewsets.ReadOnlyModelViewSet):
@@ -14,9 +16,10 @@ class PublicPortfolioItemViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = PortfolioItem.objects.filter(is_active=True, service_category__is_active=True)
     serializer_class = PortfolioItemSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, CatalogSearchFilter, filters.OrderingFilter]
     filterset_fields = ['service_category', 'is_featured']
     search_fields = ['title', 'description', 'client_type']
+    catalog_search_kind = 'portfolio'
     ordering_fields = ['title', 'completion_date', 'order']
     ordering = ['-is_featured', 'order', '-completion_date']
     
@@ -28,6 +31,7 @@ class PublicPortfolioItemViewSet(viewsets.ReadOnlyModelViewSet):
         ).select_related('service_category')
     
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def featured(self, request):
         """Get featured portfolio items."""
         featured_items = self.get_queryset().filter(is_featured=True)
@@ -35,6 +39,7 @@ class PublicPortfolioItemViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def by_category(self, request):
         """Get portfolio items grouped by service category."""
         from apps.services.models import ServiceCategory
@@ -59,6 +64,7 @@ class PublicPortfolioItemViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(result)
     
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def recent(self, request):
         """Get recent portfolio items (last 8 items)."""
         recent_items = self.get_queryset().order_by('-completion_date')[:8]
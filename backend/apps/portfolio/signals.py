@@ -0,0 +1,30 @@
+"""
+Signals that invalidate the public catalog cache.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.services.catalog_cache import bump_catalog_version
+from .models import PortfolioItem
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=PortfolioItem)
+@receiver(post_delete, sender=PortfolioItem)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """Bump the catalog version after any portfolio item change once it commits."""
+    pk = instance.pk
+
+    def bump():
+        try:
+            bump_catalog_version()
+        except Exception as e:
+            # Log error but don't fail the save operation
+            logger.error(f"Failed to invalidate catalog cache for portfolio item {pk}: {e}")
+
+    # After commit, so a read racing the save can't cache the old rows under the new version
+    transaction.on_commit(bump)
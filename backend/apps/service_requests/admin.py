@@ -7,6 +7,7 @@ from django.http import HttpResponseRedirect
 from django.contrib import messages
 from django.db.models import Count, Q
 from .models import ServiceRequest
+from .outbox import get_job_status, new_job_id
 
 
 @admin.register(ServiceRequest)
@@ -82,7 +83,7 @@ class ServiceRequestAdmin(admin.ModelAdmin):
     
     def is_overdue_display(self, obj):
         """Display overdue status with color coding."""
-        if obj.is_overdue:
+        if obj.overdue:
             return format_html(
                 '<span style="color: red; font-weight: bold;">⚠ Overdue</span>'
             )
@@ -90,48 +91,46 @@ class ServiceRequestAdmin(admin.ModelAdmin):
             '<span style="color: green;">✓ On Time</span>'
         )
     is_overdue_display.short_description = 'Deadline Status'
+    is_overdue_display.admin_order_field = 'overdue'
     
     def get_queryset(self, request):
-        """Optimize queryset with select_related."""
+        """Optimize queryset with select_related and an SQL overdue flag."""
         return super().get_queryset(request).select_related(
             'service', 'service__category', 'assigned_to'
-        )
+        ).annotate_overdue()
     
     actions = [
         'mark_as_in_progress', 'mark_as_completed', 'mark_as_cancelled',
         'assign_to_me', 'set_high_priority', 'set_normal_priority'
     ]
     
+    def update_status(self, request, queryset, new_status):
+        """Change the status of the selected requests; the client emails go out in the background."""
+        job_id = new_job_id()
+        updated = queryset.update_tracked(job_id=job_id, status=new_status)
+        message = f'{updated} request(s) marked as {dict(ServiceRequest.STATUS_CHOICES)[new_status].lower()}.'
+        if get_job_status(job_id):
+            message += f' Status update emails are being sent (job {job_id}).'
+        self.message_user(request, message)
+    
     def mark_as_in_progress(self, request, queryset):
         """Bulk action to mark requests as in progress."""
-        updated = queryset.update(status='in_progress')
-        self.message_user(
-            request, 
-            f'{updated} request(s) marked as in progress.'
-        )
+        self.update_status(request, queryset, 'in_progress')
     mark_as_in_progress.short_description = 'Mark selected requests as in progress'
     
     def mark_as_completed(self, request, queryset):
         """Bulk action to mark requests as completed."""
-        updated = queryset.update(status='completed')
-        self.message_user(
-            request, 
-            f'{updated} request(s) marked as completed.'
-        )
+        self.update_status(request, queryset, 'completed')
     mark_as_completed.short_description = 'Mark selected requests as completed'
     
     def mark_as_cancelled(self, request, queryset):
         """Bulk action to mark requests as cancelled."""
-        updated = queryset.update(status='cancelled')
-        self.message_user(
-            request, 
-            f'{updated} request(s) marked as cancelled.'
-        )
+        self.update_status(request, queryset, 'cancelled')
     mark_as_cancelled.short_description = 'Mark selected requests as cancelled'
     
     def assign_to_me(self, request, queryset):
         """Bulk action to assign requests to current user."""
-        updated = queryset.update(assigned_to=request.user)
+        updated = queryset.update_tracked(assigned_to=request.user)
         self.message_user(
             request, 
             f'{updated} request(s) assigned to you.'
@@ -140,7 +139,7 @@ class ServiceRequestAdmin(admin.ModelAdmin):
     
     def set_high_priority(self, request, queryset):
         """Bulk action to set requests to high priority."""
-        updated = queryset.update(priority='high')
+        updated = queryset.update_tracked(priority='high')
         self.message_user(
             request, 
             f'{updated} request(s) set to high priority.'
@@ -149,7 +148,7 @@ class ServiceRequestAdmin(admin.ModelAdmin):
     
     def set_normal_priority(self, request, queryset):
         """Bulk action to set requests to normal priority."""
-        updated = queryset.update(priority='normal')
+        updated = queryset.update_tracked(priority='normal')
         self.message_user(
             request, 
             f'{updated} request(s) set to normal priority.'
@@ -171,10 +170,7 @@ class ServiceRequestAdmin(admin.ModelAdmin):
         pending_requests = ServiceRequest.objects.filter(status='pending').count()
         in_progress_requests = ServiceRequest.objects.filter(status='in_progress').count()
         completed_requests = ServiceRequest.objects.filter(status='completed').count()
-        overdue_requests = ServiceRequest.objects.filter(
-            deadline__lt=timezone.now().date(),
-            status__in=['pending', 'in_progress']
-        ).count()
+        overdue_requests = ServiceRequest.objects.overdue().count()
         
         # Get requests by priority
         priority_stats = ServiceRequest.objects.values('priority').annotate(
@@ -187,10 +183,7 @@ class ServiceRequestAdmin(admin.ModelAdmin):
         ).order_by('-created_at')[:10]
         
         # Get overdue requests
-        overdue_requests_list = ServiceRequest.objects.filter(
-            deadline__lt=timezone.now().date(),
-            status__in=['pending', 'in_progress']
-        ).select_related('service', 'assigned_to').order_by('deadline')[:10]
+        overdue_requests_list = ServiceRequest.objects.overdue().select_related('service', 'assigned_to').order_by('deadline')[:10]
         
         context = {
             'title': 'Service Requests Dashboard',
@@ -6,26 +6,50 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import ServiceRequest
-from .serializers import ServiceRequestAdminSerializer, UserSerializer
-from django.conf import settings
-from .tasks import send_status_update_email
-from .email_fallback import send_status_update_email_sync
+from apps.dashboard.stats import get_request_counts
+from apps.common.export import ExportMixin
+from apps.common.pagination import AdminPagination
+from apps.common.search import FullTextSearchFilter, SearchRankOrderingFilter
+from .models import ServiceRequest, StaffNotificationPreference, overdue_q
+from .outbox import get_job_status, job_has_emails, new_job_id
+from .serializers import (
+    ServiceRequestAdminSerializer, UserSerializer, StaffNotificationPreferenceSerializer
+)
 
 
-class AdminServiceRequestViewSet(viewsets.ModelViewSet):
+class AdminServiceRequestViewSet(ExportMixin, viewsets.ModelViewSet):
     """Admin ViewSet for ServiceRequest model with full management capabilities."""
     queryset = ServiceRequest.objects.all()
     serializer_class = ServiceRequestAdminSerializer
     permission_classes = [permissions.IsAdminUser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = AdminPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, SearchRankOrderingFilter]
     filterset_fields = ['status', 'priority', 'service', 'assigned_to']
     search_fields = ['project_title', 'client_name', 'client_email', 'project_description']
     ordering_fields = ['created_at', 'deadline', 'priority', 'status']
     ordering = ['-created_at']
+    export_filename = 'service-requests'
+    export_fields = [
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('deadline', 'deadline'),
+        ('service', 'service__title'),
+        ('category', 'service__category__name'),
+        ('assigned_to', 'assigned_to__username'),
+        ('client_name', 'client_name'),
+        ('client_email', 'client_email'),
+        ('client_phone', 'client_phone'),
+        ('project_title', 'project_title'),
+        ('project_description', 'project_description'),
+        ('budget', 'budget'),
+        ('updated_at', 'updated_at'),
+    ]
     
     def get_queryset(self):
         """Get all service requests with related data."""
@@ -35,35 +59,30 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
     def dashboard_stats(self, request):
         """Get comprehensive dashboard statistics."""
         queryset = self.get_queryset()
-        now = timezone.now()
-        today = now.date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
         
-        # Basic counts
+        # All counters come from a single conditional-aggregation query
+        counts = get_request_counts(queryset)
         stats = {
-            'total': queryset.count(),
-            'pending': queryset.filter(status='pending').count(),
-            'in_progress': queryset.filter(status='in_progress').count(),
-            'completed': queryset.filter(status='completed').count(),
-            'cancelled': queryset.filter(status='cancelled').count(),
-            'overdue': len([r for r in queryset if r.is_overdue]),
-            'unassigned': queryset.filter(assigned_to=None).count(),
+            'total': counts['total'],
+            'pending': counts['pending'],
+            'in_progress': counts['in_progress'],
+            'completed': counts['completed'],
+            'cancelled': counts['cancelled'],
+            'overdue': counts['overdue'],
+            'unassigned': counts['unassigned'],
         }
         
         # Priority breakdown
         stats['by_priority'] = {
-            'low': queryset.filter(priority='low').count(),
-            'normal': queryset.filter(priority='normal').count(),
-            'high': queryset.filter(priority='high').count(),
-            'urgent': queryset.filter(priority='urgent').count(),
+            priority: counts[f'priority_{priority}']
+            for priority, _ in ServiceRequest.PRIORITY_CHOICES
         }
         
         # Time-based stats
         stats['recent'] = {
-            'today': queryset.filter(created_at__date=today).count(),
-            'this_week': queryset.filter(created_at__date__gte=week_ago).count(),
-            'this_month': queryset.filter(created_at__date__gte=month_ago).count(),
+            'today': counts['recent_today'],
+            'this_week': counts['recent_this_week'],
+            'this_month': counts['recent_this_month'],
         }
         
         # Service breakdown
@@ -104,20 +123,10 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
             else:
                 service_request.notes = f"[{timezone.now().strftime('%Y-%m-%d %H:%M')}] Status changed from {old_status} to {new_status}: {notes}"
         
-        service_request.save()
-        
-        # Send email notification to client about status change
-        if old_status != new_status:
-            try:
-                if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
-                    # Send email synchronously (for free tier deployment)
-                    send_status_update_email_sync(service_request.id, old_status, new_status, 'en')
-                else:
-                    # Send email asynchronously (when Redis/Celery available)
-                    send_status_update_email.delay(service_request.id, old_status, new_status, 'en')
-            except Exception as e:
-                # Log error but don't fail the status update
-                print(f"Failed to send status update email for request {service_request.id}: {e}")
+        # The post_save signal queues the client's status update email in
+        # the same transaction
+        with transaction.atomic():
+            service_request.save()
         
         serializer = self.get_serializer(service_request)
         return Response(serializer.data)
@@ -159,20 +168,41 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['patch'])
     def bulk_update_status(self, request):
-        """Bulk update status of multiple requests."""
+        """
+        Bulk update status of multiple requests.
+        
+        The clients' status update emails are sent in the background; follow
+        them with ``bulk_jobs/<job_id>/``. ``job_id`` is null when no email
+        was queued: nothing changed status, or the outbox is disabled and
+        the emails were sent directly.
+        """
         request_ids = request.data.get('request_ids', [])
         new_status = request.data.get('status')
         
         if new_status not in dict(ServiceRequest.STATUS_CHOICES):
             return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         
-        updated_count = ServiceRequest.objects.filter(id__in=request_ids).update(status=new_status)
+        job_id = new_job_id()
+        updated_count = ServiceRequest.objects.filter(id__in=request_ids).update_tracked(
+            job_id=job_id, status=new_status
+        )
+        if not job_has_emails(job_id):
+            job_id = None
         
         return Response({
             'message': f'{updated_count} requests updated successfully',
-            'updated_count': updated_count
+            'updated_count': updated_count,
+            'job_id': job_id
         })
     
+    @action(detail=False, methods=['get'], url_path=r'bulk_jobs/(?P<job_id>[0-9a-f]{32})')
+    def bulk_job(self, request, job_id=None):
+        """Get the progress of the emails sent for a bulk status update."""
+        job_status = get_job_status(job_id)
+        if job_status is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(dict(job_status, job_id=job_id))
+    
     @action(detail=False, methods=['patch'])
     def bulk_assign(self, request):
         """Bulk assign multiple requests to a user."""
@@ -182,11 +212,11 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
         if user_id:
             try:
                 user = User.objects.get(id=user_id, is_active=True)
-                updated_count = ServiceRequest.objects.filter(id__in=request_ids).update(assigned_to=user)
+                updated_count = ServiceRequest.objects.filter(id__in=request_ids).update_tracked(assigned_to=user)
             except User.DoesNotExist:
                 return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
         else:
-            updated_count = ServiceRequest.objects.filter(id__in=request_ids).update(assigned_to=None)
+            updated_count = ServiceRequest.objects.filter(id__in=request_ids).update_tracked(assigned_to=None)
         
         return Response({
             'message': f'{updated_count} requests updated successfully',
@@ -195,10 +225,15 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def overdue(self, request):
-        """Get overdue requests."""
-        queryset = self.get_queryset()
-        overdue_requests = [r for r in queryset if r.is_overdue]
-        serializer = self.get_serializer(overdue_requests, many=True)
+        """Get overdue requests (paginated, honours the list filters)."""
+        queryset = self.filter_queryset(self.get_queryset().overdue())
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
@@ -220,27 +255,31 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
         
         queryset = ServiceRequest.objects.filter(id__in=request_ids)
         updated_count = 0
+        job_id = None
         
         if action_type == 'status':
             new_status = action_data.get('status')
             if new_status in dict(ServiceRequest.STATUS_CHOICES):
-                updated_count = queryset.update(status=new_status)
+                job_id = new_job_id()
+                updated_count = queryset.update_tracked(job_id=job_id, status=new_status)
+                if not job_has_emails(job_id):
+                    job_id = None
         
         elif action_type == 'priority':
             new_priority = action_data.get('priority')
             if new_priority in dict(ServiceRequest.PRIORITY_CHOICES):
-                updated_count = queryset.update(priority=new_priority)
+                updated_count = queryset.update_tracked(priority=new_priority)
         
         elif action_type == 'assign':
             user_id = action_data.get('assigned_to')
             if user_id:
                 try:
                     user = User.objects.get(id=user_id, is_active=True)
-                    updated_count = queryset.update(assigned_to=user)
+                    updated_count = queryset.update_tracked(assigned_to=user)
                 except User.DoesNotExist:
                     return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
             else:
-                updated_count = queryset.update(assigned_to=None)
+                updated_count = queryset.update_tracked(assigned_to=None)
         
         elif action_type == 'delete':
             updated_count = queryset.count()
@@ -249,10 +288,13 @@ class AdminServiceRequestViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': 'Invalid action type'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
+        data = {
             'message': f'{updated_count} requests updated successfully',
             'updated_count': updated_count
-        })
+        }
+        if job_id:
+            data['job_id'] = job_id
+        return Response(data)
 
 
 class AdminUserViewSet(viewsets.ReadOnlyModelViewSet):
@@ -271,19 +313,36 @@ class AdminUserViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(staff_users, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get', 'patch'])
+    def notification_preference(self, request):
+        """Get or set how the current user receives admin notifications."""
+        preference = StaffNotificationPreference.objects.filter(user=request.user).first()
+        if preference is None:
+            preference = StaffNotificationPreference(user=request.user)
+        
+        if request.method == 'GET':
+            return Response(StaffNotificationPreferenceSerializer(preference).data)
+        
+        serializer = StaffNotificationPreferenceSerializer(preference, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+    
     @action(detail=True, methods=['get'])
     def workload(self, request, pk=None):
         """Get workload statistics for a user."""
         user = self.get_object()
-        requests = ServiceRequest.objects.filter(assigned_to=user)
+        counts = ServiceRequest.objects.filter(assigned_to=user).aggregate(
+            total_assigned=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            in_progress=Count('id', filter=Q(status='in_progress')),
+            completed=Count('id', filter=Q(status='completed')),
+            overdue=Count('id', filter=overdue_q()),
+        )
         
         workload = {
             'user': self.get_serializer(user).data,
-            'total_assigned': requests.count(),
-            'pending': requests.filter(status='pending').count(),
-            'in_progress': requests.filter(status='in_progress').count(),
-            'completed': requests.filter(status='completed').count(),
-            'overdue': len([r for r in requests if r.is_overdue]),
+            **counts,
         }
         
         return Response(workload)
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Asyncio SMTP email backend.
+
+A drop-in ``EMAIL_BACKEND`` that sends a batch of messages concurrently over
+up to ``EMAIL_ASYNC_CONCURRENCY`` SMTP connections instead of one message
+after another. It needs the optional ``aiosmtplib`` package:
+
+    EMAIL_BACKEND=apps.service_requests.async_email.AsyncSMTPEmailBackend
+
+``send_many`` returns the outcome of every message. ``email_service`` uses it
+when the configured backend provides it, so the outcomes are recorded on the
+EmailNotification tracking rows like any other send.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import sanitize_address
+
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSMTPEmailBackend(BaseEmailBackend):
+    """Email backend that sends messages concurrently with aiosmtplib."""
+
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=None,
+                 use_ssl=None, timeout=None, concurrency=None, fail_silently=False, **kwargs):
+        if aiosmtplib is None:
+            raise ImproperlyConfigured('AsyncSMTPEmailBackend requires aiosmtplib: pip install aiosmtplib')
+        super().__init__(fail_silently=fail_silently)
+        self.host = host or settings.EMAIL_HOST
+        self.port = port or settings.EMAIL_PORT
+        self.username = settings.EMAIL_HOST_USER if username is None else username
+        self.password = settings.EMAIL_HOST_PASSWORD if password is None else password
+        self.use_tls = settings.EMAIL_USE_TLS if use_tls is None else use_tls
+        self.use_ssl = getattr(settings, 'EMAIL_USE_SSL', False) if use_ssl is None else use_ssl
+        self.timeout = getattr(settings, 'EMAIL_TIMEOUT', None) if timeout is None else timeout
+        self.concurrency = max(1, concurrency or getattr(settings, 'EMAIL_ASYNC_CONCURRENCY', 5))
+        if self.use_ssl and self.use_tls:
+            raise ValueError('EMAIL_USE_TLS/EMAIL_USE_SSL are mutually exclusive, so only set one of those settings to True.')
+
+    def send_messages(self, email_messages):
+        """Send messages concurrently; return the number sent."""
+        results = self.send_many(email_messages)
+        errors = [error for sent, error in results if error is not None]
+        if errors and not self.fail_silently:
+            raise errors[0]
+        return sum(1 for sent, error in results if sent)
+
+    def send_many(self, email_messages):
+        """
+        Send messages concurrently.
+
+        Returns:
+            List of (sent, error) tuples in the same order as ``email_messages``
+        """
+        email_messages = list(email_messages)
+        if not email_messages:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.asend_many(email_messages))
+        # Called from async code: the running loop can't be blocked on, so
+        # drive a separate loop in a helper thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.asend_many(email_messages)).result()
+
+    async def asend_many(self, email_messages):
+        """Async version of ``send_many`` for callers already in an event loop."""
+        results = [(False, None)] * len(email_messages)
+        queue = asyncio.Queue()
+        for index, message in enumerate(email_messages):
+            queue.put_nowait(index)
+
+        async def worker():
+            client = None
+            try:
+                while not queue.empty():
+                    index = queue.get_nowait()
+                    message = email_messages[index]
+                    for attempt in (1, 2):
+                        try:
+                            if client is None or not client.is_connected:
+                                client = await self.connect()
+                            results[index] = (await self.send(client, message), None)
+                            break
+                        except aiosmtplib.SMTPServerDisconnected as e:
+                            client = None
+                            if attempt == 2:
+                                results[index] = (False, e)
+                        except Exception as e:
+                            logger.error(f"Failed to send email '{message.subject}' to {message.to}: {e}")
+                            results[index] = (False, e)
+                            break
+            finally:
+                if client is not None and client.is_connected:
+                    try:
+                        await client.quit()
+                    except aiosmtplib.SMTPException:
+                        client.close()
+
+        workers = min(self.concurrency, len(email_messages))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def connect(self):
+        """Open and authenticate an SMTP connection."""
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_ssl,
+            start_tls=self.use_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        if self.username and self.password:
+            await client.login(self.username, self.password)
+        return client
+
+    async def send(self, client, message):
+        """Send one message over ``client``; return True if it was sent."""
+        if not message.recipients():
+            return False
+        encoding = message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(message.from_email, encoding)
+        recipients = [sanitize_address(address, encoding) for address in message.recipients()]
+        await client.sendmail(from_email, recipients, message.message().as_bytes(linesep='\r\n'))
+        return True
@@ -0,0 +1,120 @@
+"""
+Idempotency ledger for admin notifications.
+
+An alert about a request is sent at most once per cooldown. The sender first
+claims the key ``(request_id, notification_type)`` by writing a
+``NotificationClaim`` row, unique per key, that expires after the cooldown.
+The claim is part of the caller's transaction: concurrent saves wait on the
+unique index for one claim, and a save that rolls back takes its claim (and
+its outbox row) with it, so the key is free again. Repeats within the cooldown
+find the key taken and are dropped before any outbox row, task or SMTP
+connection is created.
+
+Overdue alerts have their own, longer cooldown (``OVERDUE_NOTIFICATION_COOLDOWN_HOURS``)
+shared by the save-triggered alert and the daily overdue summary, so a
+request isn't reported on every edit or every morning. Every other type uses
+``NOTIFICATION_COOLDOWN_MINUTES``. A cooldown of 0 disables deduplication.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import NotificationClaim
+
+
+def get_cooldown(notification_type):
+    """Return the cooldown for a notification type in seconds."""
+    if notification_type == 'overdue_request':
+        return getattr(settings, 'OVERDUE_NOTIFICATION_COOLDOWN_HOURS', 72) * 60 * 60
+    return getattr(settings, 'NOTIFICATION_COOLDOWN_MINUTES', 60) * 60
+
+
+def claim_notification(request_id, notification_type):
+    """
+    Claim a notification before sending it.
+
+    Call this in the transaction that queues the notification; the claim only
+    holds once that transaction commits.
+
+    Returns:
+        bool: True if the caller should send it, False if it was already
+        sent within the cooldown
+    """
+    cooldown = get_cooldown(notification_type)
+    if cooldown <= 0:
+        return True
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=cooldown)
+    key = dict(service_request_id=request_id, notification_type=notification_type)
+
+    # Reuse an expired claim; the UPDATE locks it against a concurrent claim
+    if NotificationClaim.objects.filter(expires_at__lte=now, **key).update(expires_at=expires_at):
+        return True
+    try:
+        with transaction.atomic():
+            NotificationClaim.objects.create(expires_at=expires_at, **key)
+    except IntegrityError:
+        return False
+    return True
+
+
+def claim_notifications(notifications):
+    """
+    Claim a batch of notifications with one read and a few writes.
+
+    Meant for scheduled jobs that run one at a time; unlike
+    ``claim_notification`` the check and the claim are not atomic.
+
+    Args:
+        notifications (list): ``(request_id, notification_type)`` pairs
+
+    Returns:
+        List of the pairs the caller should send
+    """
+    notifications = list(dict.fromkeys(notifications))
+    keyed = {pair for pair in notifications if get_cooldown(pair[1]) > 0}
+    now = timezone.now()
+
+    existing = {}
+    if keyed:
+        claims = NotificationClaim.objects.filter(
+            service_request_id__in={request_id for request_id, _ in keyed},
+            notification_type__in={notification_type for _, notification_type in keyed},
+        ).values_list('service_request_id', 'notification_type', 'id', 'expires_at')
+        existing = {(request_id, notification_type): (pk, expires_at)
+                    for request_id, notification_type, pk, expires_at in claims}
+
+    # Pairs without a live claim; expired claims are renewed, missing ones inserted
+    claimed = [
+        pair for pair in notifications
+        if pair not in keyed or pair not in existing or existing[pair][1] <= now
+    ]
+
+    by_cooldown = {}
+    for pair in claimed:
+        if pair in keyed:
+            by_cooldown.setdefault(get_cooldown(pair[1]), []).append(pair)
+    for cooldown, pairs in by_cooldown.items():
+        expires_at = now + timedelta(seconds=cooldown)
+        NotificationClaim.objects.filter(id__in=[existing[pair][0] for pair in pairs if pair in existing]).update(
+            expires_at=expires_at
+        )
+        NotificationClaim.objects.bulk_create([
+            NotificationClaim(service_request_id=request_id, notification_type=notification_type, expires_at=expires_at)
+            for request_id, notification_type in pairs if (request_id, notification_type) not in existing
+        ], ignore_conflicts=True)
+    return claimed
+
+
+def release_notifications(notifications):
+    """Forget claims whose send failed so the next attempt isn't suppressed."""
+    notifications = list(notifications)
+    if not notifications:
+        return
+    query = Q()
+    for request_id, notification_type in notifications:
+        query |= Q(service_request_id=request_id, notification_type=notification_type)
+    NotificationClaim.objects.filter(query).delete()
@@ -0,0 +1,207 @@
+"""
+Digest delivery for admin notifications.
+
+Each staff member chooses immediate or digest delivery
+(``StaffNotificationPreference``, immediate by default). Immediate staff are
+emailed as notifications happen; for digest staff the notification is stored
+as an ``AdminDigestItem`` and ``send_admin_digests`` sends one email per
+person, grouped by notification type, every ``ADMIN_DIGEST_WINDOW_MINUTES``.
+
+The daily overdue run sends every staff member a single summary of their
+overdue requests instead of one email per request. A request is only listed
+again once its overdue cooldown has passed (see ``dedup``).
+"""
+import logging
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .dedup import claim_notifications, release_notifications
+from .email_service import email_service
+from .models import AdminDigestItem, ServiceRequest
+from .recipients import get_staff_recipients, split_by_delivery
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_TYPE_LABELS = {
+    'en': {
+        'urgent_request': 'Urgent requests',
+        'overdue_request': 'Overdue requests',
+        'new_request': 'New requests',
+    },
+    'ar': {
+        'urgent_request': 'طلبات عاجلة',
+        'overdue_request': 'طلبات متأخرة',
+        'new_request': 'طلبات جديدة',
+    },
+}
+
+PRIORITY_LABELS_AR = {
+    'low': 'منخفضة',
+    'normal': 'عادية',
+    'high': 'عالية',
+    'urgent': 'عاجلة',
+}
+
+
+def queue_digest_items(notifications):
+    """
+    Hold admin notifications back for the next digest.
+
+    Args:
+        notifications (list): ``(service_request, notification_type)`` pairs
+    """
+    AdminDigestItem.objects.bulk_create([
+        AdminDigestItem(service_request=service_request, notification_type=notification_type)
+        for service_request, notification_type in notifications
+    ])
+
+
+def format_request_line(service_request, language='en'):
+    """Format one request as a line of a digest or summary."""
+    deadline = service_request.deadline.strftime('%Y-%m-%d')
+    if language == 'ar':
+        priority = PRIORITY_LABELS_AR.get(service_request.priority, service_request.priority)
+        return (
+            f"• #{service_request.id} {service_request.project_title} - "
+            f"{service_request.client_name}، الأولوية: {priority}، الموعد النهائي {deadline}"
+        )
+    return (
+        f"• #{service_request.id} {service_request.project_title} - "
+        f"{service_request.client_name}, {service_request.get_priority_display()} priority, "
+        f"due {deadline}"
+    )
+
+
+def format_grouped_items(items, language='en'):
+    """Format digest items grouped by notification type."""
+    grouped = defaultdict(list)
+    for item in items:
+        grouped[item.notification_type].append(item.service_request)
+
+    # Most pressing types first
+    labels = NOTIFICATION_TYPE_LABELS.get(language, NOTIFICATION_TYPE_LABELS['en'])
+    order = {key: position for position, key in enumerate(labels)}
+    sections = []
+    for notification_type in sorted(grouped, key=lambda key: order.get(key, len(order))):
+        requests = grouped[notification_type]
+        label = labels.get(notification_type, notification_type.replace('_', ' ').capitalize())
+        sections.append('\n'.join(
+            [f"{label} ({len(requests)})"] + [format_request_line(request, language) for request in requests]
+        ))
+    return '\n\n'.join(sections)
+
+
+def send_admin_digests():
+    """
+    Send the pending digest items to every digest staff member.
+
+    Delivery is tracked per recipient: an item is only marked sent once every
+    digest staff member who receives its type has had it, so a failed send is
+    retried next window without repeating the items others already got.
+
+    Returns:
+        int: Number of digest emails sent
+    """
+    items = list(
+        AdminDigestItem.objects.filter(sent_at__isnull=True).select_related('service_request')
+    )
+    if not items:
+        return 0
+
+    _, recipients = split_by_delivery(get_staff_recipients())
+    Delivery = AdminDigestItem.delivered_to.through
+    delivered = set(
+        Delivery.objects.filter(admindigestitem__in=items).values_list('admindigestitem_id', 'user_id')
+    )
+
+    def wants(recipient, item):
+        if recipient.notification_types and item.notification_type not in recipient.notification_types:
+            return False
+        return (item.id, recipient.user_id) not in delivered
+
+    emails, batches = [], []
+    for recipient in recipients:
+        wanted = [item for item in items if wants(recipient, item)]
+        if not wanted:
+            continue
+        emails.append({
+            'template_type': 'admin_digest',
+            'language': recipient.language,
+            'context': {
+                'staff_name': recipient.name,
+                'count': len(wanted),
+                'items': format_grouped_items(wanted, recipient.language),
+                'dashboard_url': f"{email_service.frontend_url}/admin/requests",
+            },
+            'recipient_list': [recipient.email],
+        })
+        batches.append((recipient, wanted))
+
+    results = email_service.send_many(emails)
+    new_deliveries = []
+    for ok, (recipient, wanted) in zip(results, batches):
+        if not ok:
+            logger.error(f"Failed to send admin digest to {recipient.email}, will retry")
+            continue
+        delivered.update((item.id, recipient.user_id) for item in wanted)
+        new_deliveries.extend(
+            Delivery(admindigestitem_id=item.id, user_id=recipient.user_id) for item in wanted
+        )
+    Delivery.objects.bulk_create(new_deliveries)
+
+    # Done once no current digest recipient is still waiting for it (staff who
+    # switched back to immediate delivery or left are not waited for)
+    done = [item.id for item in items if not any(wants(recipient, item) for recipient in recipients)]
+    AdminDigestItem.objects.filter(id__in=done).update(sent_at=timezone.now())
+    return sum(results)
+
+
+def send_overdue_summaries(today=None):
+    """
+    Send each staff member one summary of their overdue requests.
+
+    A staff member's list holds the requests assigned to them plus every
+    request that has no staff owner. Requests reported within the overdue
+    cooldown are left out.
+
+    Returns:
+        int: Number of summary emails sent
+    """
+    recipients = get_staff_recipients('overdue_request')
+    if not recipients:
+        logger.warning("No admin emails found")
+        return 0
+
+    overdue = list(ServiceRequest.objects.overdue(today).order_by('deadline', 'id'))
+    claimed = claim_notifications([(service_request.id, 'overdue_request') for service_request in overdue])
+    claimed_ids = {request_id for request_id, _ in claimed}
+
+    staff_ids = {recipient.user_id for recipient in recipients}
+    by_assignee = defaultdict(list)
+    for service_request in overdue:
+        if service_request.id not in claimed_ids:
+            continue
+        assignee = service_request.assigned_to_id if service_request.assigned_to_id in staff_ids else None
+        by_assignee[assignee].append(service_request)
+
+    emails = []
+    for recipient in recipients:
+        requests = by_assignee[recipient.user_id] + by_assignee[None]
+        if not requests:
+            continue
+        emails.append({
+            'template_type': 'overdue_summary',
+            'language': recipient.language,
+            'context': {
+                'staff_name': recipient.name,
+                'count': len(requests),
+                'items': '\n'.join(format_request_line(request, recipient.language) for request in requests),
+                'dashboard_url': f"{email_service.frontend_url}/admin/requests",
+            },
+            'recipient_list': [recipient.email],
+        })
+    sent = sum(email_service.send_many(emails)) if emails else 0
+    if emails and not sent:
+        release_notifications(claimed)
+    return sent
@@ -0,0 +1,161 @@
+"""
+Pooled email delivery.
+
+Every call to ``EmailMessage.send()`` opens a new connection to the mail
+server (TCP connect, STARTTLS, login), sends one message and closes it.
+``send_many`` keeps one connection per thread open across messages and
+across calls, so a batch of emails - or a worker draining the outbox - pays
+for the handshake once.
+
+A connection is reopened, and therefore re-authenticated, when the server
+drops it, when it has been idle longer than ``EMAIL_CONNECTION_MAX_IDLE``
+seconds, or after ``EMAIL_CONNECTION_MAX_MESSAGES`` messages.
+"""
+import logging
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(error):
+    """
+    Return True when ``error`` means the connection is unusable.
+
+    ``smtplib.SMTPException`` subclasses ``OSError``, so a refused recipient
+    has to be told apart from a dropped socket or a 421 "closing channel".
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class PooledConnection:
+    """A lazily opened, reusable connection to the configured email backend."""
+
+    def __init__(self):
+        self.connection = None
+        self.backend = None
+        self.opened_at = None
+        self.last_used = None
+        self.sent = 0
+
+    @property
+    def max_idle(self):
+        return getattr(settings, 'EMAIL_CONNECTION_MAX_IDLE', 60)
+
+    @property
+    def max_messages(self):
+        return getattr(settings, 'EMAIL_CONNECTION_MAX_MESSAGES', 100)
+
+    def is_stale(self):
+        if self.connection is None or self.backend != settings.EMAIL_BACKEND:
+            return True
+        if time.monotonic() - self.last_used > self.max_idle:
+            return True
+        return self.sent >= self.max_messages
+
+    def open(self):
+        """Open (or reopen) the connection."""
+        self.close()
+        self.backend = settings.EMAIL_BACKEND
+        self.connection = get_connection(self.backend, fail_silently=False)
+        self.connection.open()
+        self.opened_at = self.last_used = time.monotonic()
+        self.sent = 0
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.close()
+        except Exception:
+            # The server may already have gone away
+            pass
+        self.connection = None
+
+    def send(self, message):
+        """Send one message, reconnecting once if the connection was lost."""
+        for attempt in (1, 2):
+            if self.is_stale():
+                self.open()
+            try:
+                sent = self.connection.send_messages([message])
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                self.close()
+                if attempt == 2:
+                    raise
+                logger.info(f"Email connection lost ({e}), reconnecting")
+                continue
+            self.last_used = time.monotonic()
+            self.sent += 1
+            return bool(sent)
+
+    def supports_batches(self):
+        """Return True when the backend sends whole batches itself (see ``async_email``)."""
+        if self.is_stale():
+            self.open()
+        return callable(getattr(type(self.connection), 'send_many', None))
+
+    def send_batch(self, messages):
+        """Hand a whole batch to the backend; return its per-message outcomes."""
+        results = self.connection.send_many(messages)
+        self.last_used = time.monotonic()
+        self.sent += len(messages)
+        return results
+
+
+_local = threading.local()
+
+
+def get_pooled_connection():
+    """Get this thread's pooled connection."""
+    if not hasattr(_local, 'connection'):
+        _local.connection = PooledConnection()
+    return _local.connection
+
+
+def close_pooled_connection():
+    """Close this thread's pooled connection, e.g. when a worker shuts down."""
+    if hasattr(_local, 'connection'):
+        _local.connection.close()
+
+
+def send_many(messages):
+    """
+    Send several email messages over the pooled connection.
+
+    A failure only affects its own message: the rest of the batch is still
+    sent. Backends that send batches themselves, like the asyncio backend,
+    get the whole batch at once.
+
+    Args:
+        messages (list): ``EmailMessage`` instances
+
+    Returns:
+        List of (sent, error) tuples in the same order as ``messages``
+    """
+    pool = get_pooled_connection()
+    if pool.supports_batches():
+        try:
+            return pool.send_batch(messages)
+        except Exception as e:
+            logger.error(f"Failed to send a batch of {len(messages)} emails: {e}")
+            return [(False, e)] * len(messages)
+
+    results = []
+    for message in messages:
+        try:
+            results.append((pool.send(message), None))
+        except Exception as e:
+            logger.error(f"Failed to send email '{message.subject}' to {message.to}: {e}")
+            results.append((False, e))
+    return results
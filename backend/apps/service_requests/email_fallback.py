@@ -4,12 +4,15 @@ This sends emails synchronously when background tasks aren't available.
 """
 from django.conf import settings
 from .email_service import email_service
+from .email_tracking import get_email_type
+from .recipients import get_staff_recipients, group_emails_by_language, split_by_delivery
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def send_email_sync(template_type, language, context, recipient_list, notification_type=None):
+def send_email_sync(template_type, language, context, recipient_list, notification_type=None,
+                    tracking=None):
     """
     Send email synchronously (fallback when Celery is not available).
     
@@ -19,6 +22,7 @@ def send_email_sync(template_type, language, context, recipient_list, notificati
         context (dict): Context variables for template
         recipient_list (list): List of recipient email addresses
         notification_type (str): Optional notification type for admin emails
+        tracking (dict): Optional EmailNotification tracking, see ``email_service.send_many``
     
     Returns:
         bool: True if email was sent successfully, False otherwise
@@ -29,7 +33,8 @@ def send_email_sync(template_type, language, context, recipient_list, notificati
             language=language,
             context=context,
             recipient_list=recipient_list,
-            notification_type=notification_type
+            notification_type=notification_type,
+            tracking=tracking
         )
         logger.info(f"Email sent successfully: {template_type} to {recipient_list}")
         return True
@@ -60,7 +65,8 @@ def send_request_confirmation_email_sync(request_id, language='en'):
             template_type='request_confirmation',
             language=language,
             context=context,
-            recipient_list=[service_request.client_email]
+            recipient_list=[service_request.client_email],
+            tracking={'service_request': service_request, 'email_type': 'confirmation'}
         )
         
     except ServiceRequest.DoesNotExist:
@@ -78,23 +84,12 @@ def send_status_update_email_sync(request_id, old_status, new_status, language='
     try:
         service_request = ServiceRequest.objects.select_related('service').get(id=request_id)
         
-        # Get status display names
-        status_display = dict(ServiceRequest.STATUS_CHOICES)
-        
-        context = {
-            'client_name': service_request.client_name,
-            'service_name': service_request.service.title,
-            'project_title': service_request.project_title,
-            'request_id': service_request.id,
-            'old_status': status_display.get(old_status, old_status),
-            'new_status': status_display.get(new_status, new_status),
-        }
-        
         return send_email_sync(
             template_type='status_update',
             language=language,
-            context=context,
-            recipient_list=[service_request.client_email]
+            context=get_status_update_context(service_request, old_status, new_status),
+            recipient_list=[service_request.client_email],
+            tracking={'service_request': service_request, 'email_type': 'status_update'}
         )
         
     except ServiceRequest.DoesNotExist:
@@ -105,47 +100,184 @@ def send_status_update_email_sync(request_id, old_status, new_status, language='
         return False
 
 
+def get_status_update_context(service_request, old_status, new_status):
+    """Build the status update context for a request (needs ``service`` loaded)."""
+    from .models import ServiceRequest
+    
+    status_display = dict(ServiceRequest.STATUS_CHOICES)
+    return {
+        'client_name': service_request.client_name,
+        'service_name': service_request.service.title,
+        'project_title': service_request.project_title,
+        'request_id': service_request.id,
+        'old_status': status_display.get(old_status, old_status),
+        'new_status': status_display.get(new_status, new_status),
+    }
+
+
+def send_status_update_emails_sync(updates):
+    """
+    Send a batch of status update emails over one SMTP connection.
+    
+    The requests are loaded with one query, every email is rendered from the
+    compiled template of its language (see ``email_service``) and the
+    EmailNotification records are written in bulk.
+    
+    Args:
+        updates (list): ``(request_id, payload)`` pairs, where payload holds
+            ``old_status``, ``new_status`` and optionally ``language``
+    
+    Returns:
+        List of (sent, error) tuples, one per update
+    """
+    from .models import ServiceRequest
+    
+    updates = list(updates)
+    requests = ServiceRequest.objects.select_related('service').in_bulk(
+        {request_id for request_id, _ in updates}
+    )
+    
+    results = [(False, None)] * len(updates)
+    emails, owners = [], []
+    for index, (request_id, payload) in enumerate(updates):
+        service_request = requests.get(request_id)
+        if service_request is None:
+            results[index] = (False, f"ServiceRequest with id {request_id} does not exist")
+            continue
+        try:
+            context = get_status_update_context(service_request, payload['old_status'], payload['new_status'])
+        except KeyError as e:
+            results[index] = (False, e)
+            continue
+        emails.append({
+            'template_type': 'status_update',
+            'language': payload.get('language', 'en'),
+            'context': context,
+            'recipient_list': [service_request.client_email],
+            'tracking': {'service_request': service_request, 'email_type': 'status_update'},
+        })
+        owners.append(index)
+    
+    for index, sent in zip(owners, email_service.send_many(emails) if emails else []):
+        results[index] = (sent, None)
+    logger.info(f"Sent {sum(sent for sent, _ in results)} of {len(updates)} status update emails")
+    return results
+
+
+def get_admin_notification_context(service_request):
+    """Build the admin notification context for a request (needs ``service`` loaded)."""
+    return {
+        'client_name': service_request.client_name,
+        'client_email': service_request.client_email,
+        'client_phone': service_request.client_phone or 'Not provided',
+        'service_name': service_request.service.title,
+        'project_title': service_request.project_title,
+        'project_description': service_request.project_description,
+        'priority': service_request.get_priority_display(),
+        'deadline': service_request.deadline.strftime('%Y-%m-%d'),
+        'budget': service_request.budget,
+        'request_id': service_request.id,
+        'created_at': service_request.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
 def send_admin_notification_email_sync(request_id, notification_type='new_request'):
     """Send admin notification email synchronously."""
     from .models import ServiceRequest
-    from django.contrib.auth.models import User
     
     try:
         service_request = ServiceRequest.objects.select_related('service').get(id=request_id)
-        
-        # Get admin users (staff users)
-        admin_emails = list(User.objects.filter(is_staff=True, is_active=True).values_list('email', flat=True))
-        admin_emails = [email for email in admin_emails if email]  # Filter out empty emails
-        
-        if not admin_emails:
-            logger.warning("No admin emails found")
-            return False
-        
-        context = {
-            'client_name': service_request.client_name,
-            'client_email': service_request.client_email,
-            'client_phone': service_request.client_phone or 'Not provided',
-            'service_name': service_request.service.title,
-            'project_title': service_request.project_title,
-            'project_description': service_request.project_description,
-            'priority': service_request.get_priority_display(),
-            'deadline': service_request.deadline.strftime('%Y-%m-%d'),
-            'budget': service_request.budget,
-            'request_id': service_request.id,
-            'created_at': service_request.created_at.strftime('%Y-%m-%d %H:%M'),
-        }
-        
-        return send_email_sync(
-            template_type='admin_notification',
-            language='en',  # Admin emails always in English
-            context=context,
-            recipient_list=admin_emails,
-            notification_type=notification_type
-        )
+        return send_admin_notifications_sync([(service_request, notification_type)]) > 0
         
     except ServiceRequest.DoesNotExist:
         logger.error(f"ServiceRequest with id {request_id} does not exist")
         return False
     except Exception as e:
         logger.error(f"Error sending admin notification for request {request_id}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def build_admin_notification_emails(notifications, celery_task_id=''):
+    """
+    Build the immediate admin notification emails for a batch.
+    
+    Recipients come from the cached staff registry, filtered by each
+    person's notification types and grouped by their language, so this
+    runs no user queries.
+    
+    Args:
+        notifications (list): ``(service_request, notification_type)`` pairs
+        celery_task_id (str): Optional Celery task ID for tracking
+    
+    Returns:
+        Tuple of (emails, digest): ``email_service.send_many`` keyword dicts
+        with the index of their notification under ``notification``, and the
+        notifications that digest staff are waiting for
+    """
+    emails, digest = [], []
+    for index, (service_request, notification_type) in enumerate(notifications):
+        immediate, digest_recipients = split_by_delivery(get_staff_recipients(notification_type))
+        if digest_recipients:
+            digest.append((service_request, notification_type))
+        for language, recipient_list in group_emails_by_language(immediate).items():
+            emails.append({
+                'notification': index,
+                'template_type': 'admin_notification',
+                'language': language,
+                'context': get_admin_notification_context(service_request),
+                'recipient_list': recipient_list,
+                'notification_type': notification_type,
+                'tracking': {
+                    'service_request': service_request,
+                    'email_type': get_email_type('admin_notification', notification_type),
+                    'celery_task_id': celery_task_id,
+                },
+            })
+    return emails, digest
+
+
+def send_admin_notifications_sync(notifications):
+    """
+    Send a batch of admin notifications over one SMTP connection.
+    
+    Staff who chose digest delivery get the notifications in their next
+    digest instead (see ``digests``), and staff only receive the
+    notification types they subscribed to.
+    
+    Args:
+        notifications (list): ``(service_request, notification_type)`` pairs,
+            with ``service`` already loaded on each request
+    
+    Returns:
+        int: Number of notifications delivered: sent, queued for the digest,
+        or not wanted by anyone
+    """
+    from .digests import queue_digest_items
+    
+    notifications = list(notifications)
+    if not notifications:
+        return 0
+    
+    if not get_staff_recipients():
+        logger.warning("No admin emails found")
+        return 0
+    
+    emails, digest = build_admin_notification_emails(notifications)
+    if digest:
+        queue_digest_items(digest)
+    
+    owners = [email.pop('notification') for email in emails]
+    results = email_service.send_many(emails) if emails else []
+    
+    # A notification fails only if it had emails and none of them went out.
+    # Queued notifications count as delivered: retrying them would duplicate digest items.
+    attempted = set(owners)
+    delivered = {owner for owner, sent in zip(owners, results) if sent}
+    digest_keys = {(service_request.pk, notification_type) for service_request, notification_type in digest}
+    queued = {
+        index for index, (service_request, notification_type) in enumerate(notifications)
+        if (service_request.pk, notification_type) in digest_keys
+    }
+    failed = attempted - delivered - queued
+    logger.info(f"Sent {sum(results)} admin notification emails for {len(notifications)} notifications")
+    return len(notifications) - len(failed)
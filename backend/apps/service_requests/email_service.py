@@ -1,12 +1,186 @@
 """
 Email service for service requests with multilingual support.
 This module provides a centralized way to manage email templates and notifications.
+
+Templates are compiled once per (template type, language) into a
+``CompiledEmailTemplate``: the HTML shell and its CSS are baked into a single
+format string, and the plain-text part has its own format string, so a render
+is two ``format_map`` calls. Identical renders (e.g. the same admin
+notification going to several batches) are memoized.
 """
-from django.core.mail import send_mail, EmailMultiAlternatives
+from functools import lru_cache
+from html import unescape
+import logging
+import re
+
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
-import json
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+
+from .email_delivery import send_many
+
+logger = logging.getLogger(__name__)
+
+EMAIL_STYLES = '''
+    body {
+        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+        line-height: 1.6;
+        color: #333;
+        max-width: 600px;
+        margin: 0 auto;
+        padding: 20px;
+        background-color: #f9f9f9;
+    }
+    .email-container {
+        background-color: white;
+        padding: 30px;
+        border-radius: 8px;
+        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+    }
+    .header {
+        border-bottom: 3px solid #3b82f6;
+        padding-bottom: 20px;
+        margin-bottom: 30px;
+    }
+    .logo {
+        font-size: 24px;
+        font-weight: bold;
+        color: #3b82f6;
+    }
+    .content {
+        margin-bottom: 30px;
+    }
+    .content div {
+        white-space: pre-line;
+    }
+    .footer {
+        border-top: 1px solid #e5e7eb;
+        padding-top: 20px;
+        margin-top: 30px;
+        color: #6b7280;
+        font-size: 14px;
+    }
+    .button {
+        display: inline-block;
+        background-color: #3b82f6;
+        color: white;
+        padding: 12px 24px;
+        text-decoration: none;
+        border-radius: 6px;
+        margin: 15px 0;
+    }
+    .status-badge {
+        display: inline-block;
+        padding: 4px 12px;
+        border-radius: 20px;
+        font-size: 12px;
+        font-weight: bold;
+        text-transform: uppercase;
+    }
+    .status-pending { background-color: #fef3c7; color: #92400e; }
+    .status-in_progress { background-color: #dbeafe; color: #1e40af; }
+    .status-completed { background-color: #d1fae5; color: #065f46; }
+    .status-cancelled { background-color: #fee2e2; color: #991b1b; }
+    .priority-high { color: #dc2626; font-weight: bold; }
+    .priority-urgent { color: #dc2626; font-weight: bold; background-color: #fee2e2; padding: 2px 8px; border-radius: 4px; }
+'''
+
+HTML_SHELL = '''<!DOCTYPE html>
+<html dir="{direction}" lang="{language}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{subject}</title>
+    <style>{styles}    </style>
+</head>
+<body>
+    <div class="email-container">
+        <div class="header">
+            <div class="logo">Student Services</div>
+        </div>
+        <div class="content">
+            <p>{greeting}</p>
+            <div>{body}</div>
+        </div>
+        <div class="footer">
+            {footer}
+        </div>
+    </div>
+</body>
+</html>
+'''
+
+LINE_BREAK_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+
+
+def escape_braces(text):
+    """Escape literal braces so ``text`` survives ``str.format``."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def html_to_text(fragment):
+    """Convert a template fragment (not rendered output) to plain text."""
+    return unescape(strip_tags(LINE_BREAK_RE.sub('\n', fragment)))
+
+
+class RenderContext(dict):
+    """Format context that renders unknown placeholders as empty strings."""
+    
+    def __missing__(self, key):
+        return ''
+
+
+class CompiledEmailTemplate:
+    """An email template for one language, ready to render."""
+    
+    def __init__(self, template, language, status_messages):
+        self.template = template
+        self.subject = template['subject']
+        self.html = HTML_SHELL.format(
+            direction='rtl' if language == 'ar' else 'ltr',
+            language=language,
+            styles=escape_braces(EMAIL_STYLES),
+            subject=template['subject'],
+            greeting=template['greeting'],
+            body=template['body'],
+            footer=template['footer'],
+        )
+        self.text = '\n\n'.join(
+            html_to_text(template[key]) for key in ('greeting', 'body', 'footer')
+        )
+        # Fragments inserted into the body: (html, text) format strings
+        self.status_messages = {
+            status: (message, html_to_text(message))
+            for status, message in status_messages.items()
+        }
+        self.urgency_notes = {
+            key: (note, html_to_text(note))
+            for key, note in template.items() if key.startswith('urgency_')
+        }
+    
+    def render(self, context, status=None, urgency_key=None):
+        """
+        Render the template.
+        
+        Context values are plain text; they are HTML-escaped for the HTML part.
+        
+        Returns:
+            Tuple of (subject, plain text, html)
+        """
+        text_context = RenderContext((key, str(value)) for key, value in context.items())
+        html_context = RenderContext((key, escape(value)) for key, value in text_context.items())
+        
+        for name, fragments in (
+            ('status_message', self.status_messages.get(status)),
+            ('urgency_note', self.urgency_notes.get(urgency_key)),
+        ):
+            html_fragment, text_fragment = fragments or ('', '')
+            html_context[name] = html_fragment.format_map(html_context)
+            text_context[name] = text_fragment.format_map(text_context)
+        
+        subject = self.subject.format_map(text_context)
+        return subject, self.text.format_map(text_context), self.html.format_map(html_context)
 
 
 class EmailTemplateService:
@@ -15,6 +189,8 @@ class EmailTemplateService:
     def __init__(self):
         self.from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@studentservices.com')
         self.frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
+        self._compiled = {}
+        self._render_cached = lru_cache(maxsize=256)(self._render)
     
     def get_email_templates(self):
         """
@@ -143,6 +319,77 @@ Please review this request in the admin dashboard: {admin_url}
                     'urgency_high': '<strong>⚠️ HIGH PRIORITY REQUEST</strong> - This request has been marked as high priority and requires immediate attention.',
                     'urgency_urgent': '<strong>🚨 URGENT REQUEST</strong> - This request is marked as URGENT and needs immediate action.',
                     'urgency_overdue': '<strong>⏰ OVERDUE ALERT</strong> - This request is past its deadline and requires immediate attention.'
+                },
+                'ar': {
+                    'subject': 'طلب خدمة جديد: {project_title}',
+                    'greeting': 'مرحباً،',
+                    'body': '''تم تقديم طلب خدمة جديد ويحتاج إلى المتابعة.
+
+<strong>تفاصيل الطلب:</strong>
+• العميل: {client_name} ({client_email})
+• الهاتف: {client_phone}
+• الخدمة: {service_name}
+• المشروع: {project_title}
+• الأولوية: <strong>{priority}</strong>
+• الموعد النهائي: {deadline}
+• الميزانية: {budget}
+• رقم الطلب: #{request_id}
+• تاريخ التقديم: {created_at}
+
+<strong>وصف المشروع:</strong>
+{project_description}
+
+يرجى مراجعة هذا الطلب في لوحة التحكم: {admin_url}
+
+{urgency_note}''',
+                    'footer': 'نظام إدارة خدمات الطلاب',
+                    'urgency_high': '<strong>⚠️ طلب عالي الأولوية</strong> - تم تحديد هذا الطلب بأولوية عالية ويحتاج إلى اهتمام فوري.',
+                    'urgency_urgent': '<strong>🚨 طلب عاجل</strong> - تم تحديد هذا الطلب كطلب عاجل ويحتاج إلى إجراء فوري.',
+                    'urgency_overdue': '<strong>⏰ تنبيه تأخير</strong> - تجاوز هذا الطلب موعده النهائي ويحتاج إلى اهتمام فوري.'
+                }
+            },
+            'admin_digest': {
+                'en': {
+                    'subject': 'Admin Digest: {count} new notifications',
+                    'greeting': 'Hello {staff_name},',
+                    'body': '''Here is a summary of the admin notifications since the last digest.
+
+{items}
+
+Please review these requests in the admin dashboard: {dashboard_url}''',
+                    'footer': 'Student Services Admin System<br><br><small>You receive digests because your notification delivery is set to digest.</small>'
+                },
+                'ar': {
+                    'subject': 'ملخص الإشعارات: {count} إشعارات جديدة',
+                    'greeting': 'مرحباً {staff_name}،',
+                    'body': '''إليك ملخص إشعارات الإدارة منذ آخر ملخص.
+
+{items}
+
+يرجى مراجعة هذه الطلبات في لوحة التحكم: {dashboard_url}''',
+                    'footer': 'نظام إدارة خدمات الطلاب<br><br><small>تصلك هذه الملخصات لأن طريقة استلام إشعاراتك مضبوطة على الملخص.</small>'
+                }
+            },
+            'overdue_summary': {
+                'en': {
+                    'subject': 'Overdue Requests: {count} need attention',
+                    'greeting': 'Hello {staff_name},',
+                    'body': '''The following requests are past their deadline.
+
+{items}
+
+Please review these requests in the admin dashboard: {dashboard_url}''',
+                    'footer': 'Student Services Admin System'
+                },
+                'ar': {
+                    'subject': 'طلبات متأخرة: {count} تحتاج إلى متابعة',
+                    'greeting': 'مرحباً {staff_name}،',
+                    'body': '''تجاوزت الطلبات التالية موعدها النهائي.
+
+{items}
+
+يرجى مراجعة هذه الطلبات في لوحة التحكم: {dashboard_url}''',
+                    'footer': 'نظام إدارة خدمات الطلاب'
                 }
             }
         }
@@ -192,166 +439,166 @@ We apologize for any inconvenience and would be happy to discuss alternative sol
             }
         }
     
-    def create_html_email(self, template_content, context):
-        """Create HTML email content from template."""
-        html_template = f'''
-<!DOCTYPE html>
-<html dir="{context.get('direction', 'ltr')}" lang="{context.get('language', 'en')}">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{template_content['subject']}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f9f9f9;
-        }}
-        .email-container {{
-            background-color: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            border-bottom: 3px solid #3b82f6;
-            padding-bottom: 20px;
-            margin-bottom: 30px;
-        }}
-        .logo {{
-            font-size: 24px;
-            font-weight: bold;
-            color: #3b82f6;
-        }}
-        .content {{
-            margin-bottom: 30px;
-        }}
-        .footer {{
-            border-top: 1px solid #e5e7eb;
-            padding-top: 20px;
-            margin-top: 30px;
-            color: #6b7280;
-            font-size: 14px;
-        }}
-        .button {{
-            display: inline-block;
-            background-color: #3b82f6;
-            color: white;
-            padding: 12px 24px;
-            text-decoration: none;
-            border-radius: 6px;
-            margin: 15px 0;
-        }}
-        .status-badge {{
-            display: inline-block;
-            padding: 4px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: bold;
-            text-transform: uppercase;
-        }}
-        .status-pending {{ background-color: #fef3c7; color: #92400e; }}
-        .status-in_progress {{ background-color: #dbeafe; color: #1e40af; }}
-        .status-completed {{ background-color: #d1fae5; color: #065f46; }}
-        .status-cancelled {{ background-color: #fee2e2; color: #991b1b; }}
-        .priority-high {{ color: #dc2626; font-weight: bold; }}
-        .priority-urgent {{ color: #dc2626; font-weight: bold; background-color: #fee2e2; padding: 2px 8px; border-radius: 4px; }}
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        <div class="header">
-            <div class="logo">Student Services</div>
-        </div>
-        <div class="content">
-            <p>{template_content['greeting']}</p>
-            <div>{template_content['body']}</div>
-        </div>
-        <div class="footer">
-            {template_content['footer']}
-        </div>
-    </div>
-</body>
-</html>
-        '''
-        
-        # Format the HTML template with context
-        try:
-            return html_template.format(**context)
-        except KeyError as e:
-            # If formatting fails, return a simple version
-            return f"<html><body><p>{template_content['greeting']}</p><div>{template_content['body']}</div><p>{template_content['footer']}</p></body></html>"
+    def get_compiled_template(self, template_type, language):
+        """Get the compiled template, falling back to English."""
+        key = (template_type, language)
+        if key not in self._compiled:
+            templates = self.get_email_templates().get(template_type, {})
+            if language not in templates:
+                language = 'en'
+            if language not in templates:
+                raise ValueError(f"Template not found: {template_type}")
+            status_messages = self.get_status_messages()
+            self._compiled[key] = CompiledEmailTemplate(
+                templates[language], language, status_messages.get(language, status_messages['en'])
+            )
+        return self._compiled[key]
     
-    def send_email(self, template_type, language, context, recipient_list, notification_type=None):
+    def render_email(self, template_type, language, context, notification_type=None):
         """
-        Send email using the specified template and context.
+        Render an email template.
         
         Args:
             template_type (str): Type of email template
             language (str): Language code ('en' or 'ar')
             context (dict): Context variables for template
-            recipient_list (list): List of recipient email addresses
             notification_type (str): Optional notification type for admin emails
-        """
-        templates = self.get_email_templates()
-        status_messages = self.get_status_messages()
         
-        # Get the template
-        template = templates.get(template_type, {}).get(language)
-        if not template:
-            template = templates.get(template_type, {}).get('en', {})
+        Returns:
+            Tuple of (subject, plain text, html)
+        """
+        items = tuple(sorted((key, str(value)) for key, value in context.items()))
+        return self._render_cached(template_type, language, notification_type, items)
+    
+    def _render(self, template_type, language, notification_type, items):
+        from .models import ServiceRequest
         
-        if not template:
-            raise ValueError(f"Template not found: {template_type}")
+        compiled = self.get_compiled_template(template_type, language)
+        context = dict(items)
         
         # Add default context values
+        request_id = context.get('request_id', '')
         context.update({
             'language': language,
             'direction': 'rtl' if language == 'ar' else 'ltr',
-            'tracking_url': f"{self.frontend_url}/track/{context.get('request_id', '')}",
-            'admin_url': f"{self.frontend_url}/admin/requests/{context.get('request_id', '')}",
-            'contact_email': template.get('contact_email', 'support@studentservices.com'),
-            'contact_phone': template.get('contact_phone', '+1 (555) 123-4567'),
+            'tracking_url': f"{self.frontend_url}/track/{request_id}",
+            'admin_url': f"{self.frontend_url}/admin/requests/{request_id}",
+            'contact_email': compiled.template.get('contact_email', 'support@studentservices.com'),
+            'contact_phone': compiled.template.get('contact_phone', '+1 (555) 123-4567'),
         })
         
-        # Add status-specific messages
+        # Status messages are keyed by status code; senders pass display names
+        status = None
         if template_type == 'status_update' and 'new_status' in context:
-            status_msg = status_messages.get(language, status_messages['en']).get(context['new_status'], '')
-            context['status_message'] = status_msg.format(**context)
+            status_codes = {display: code for code, display in ServiceRequest.STATUS_CHOICES}
+            status = status_codes.get(context['new_status'], context['new_status'])
         
-        # Add urgency notes for admin notifications
+        urgency_key = None
         if template_type == 'admin_notification' and notification_type:
             urgency_key = f'urgency_{notification_type.replace("_request", "").replace("_", "")}'
-            context['urgency_note'] = template.get(urgency_key, '')
-        else:
-            context['urgency_note'] = ''
         
-        # Format template content
-        formatted_template = {}
-        for key, value in template.items():
-            try:
-                formatted_template[key] = value.format(**context)
-            except (KeyError, ValueError):
-                formatted_template[key] = value
+        return compiled.render(context, status=status, urgency_key=urgency_key)
+    
+    def build_email(self, template_type, language, context, recipient_list, notification_type=None):
+        """
+        Build the email message for the specified template and context.
+        
+        Args:
+            template_type (str): Type of email template
+            language (str): Language code ('en' or 'ar')
+            context (dict): Context variables for template
+            recipient_list (list): List of recipient email addresses
+            notification_type (str): Optional notification type for admin emails
         
-        # Create HTML and plain text versions
-        html_content = self.create_html_email(formatted_template, context)
-        plain_content = strip_tags(html_content).replace('<br>', '\n')
+        Returns:
+            EmailMultiAlternatives ready to be sent
+        """
+        subject, plain_content, html_content = self.render_email(
+            template_type, language, context, notification_type
+        )
         
-        # Send email
         email = EmailMultiAlternatives(
-            subject=formatted_template['subject'],
+            subject=subject,
             body=plain_content,
             from_email=self.from_email,
             to=recipient_list
         )
         email.attach_alternative(html_content, "text/html")
+        return email
+    
+    def send_email(self, template_type, language, context, recipient_list, notification_type=None,
+                   tracking=None):
+        """
+        Send email using the specified template and context.
+        
+        The email goes out over the pooled connection (see ``email_delivery``),
+        so consecutive sends from the same worker reuse one SMTP session.
+        Takes the same arguments as ``build_email``, plus the optional
+        ``tracking`` described in ``send_many``; raises on failure.
+        """
+        email = self.build_email(template_type, language, context, recipient_list, notification_type)
+        [(sent, error)] = self._send([email], [(tracking, language)])
+        if error is not None:
+            raise error
+        return int(sent)
+    
+    def send_many(self, emails):
+        """
+        Send several emails over one pooled connection.
+        
+        Args:
+            emails (list): Dicts of ``build_email`` keyword arguments. A dict
+                may also hold ``tracking``: ``service_request``, ``email_type``
+                and optionally ``celery_task_id`` for the EmailNotification
+                records of that email.
+        
+        Returns:
+            List of booleans, one per email, True if it was sent
+        """
+        messages, tracking = [], []
+        for kwargs in emails:
+            kwargs = dict(kwargs)
+            email_tracking = kwargs.pop('tracking', None)
+            try:
+                messages.append(self.build_email(**kwargs))
+                tracking.append((email_tracking, kwargs['language']))
+            except Exception as e:
+                logger.error(f"Failed to build email {kwargs.get('template_type')}: {e}")
+                messages.append(None)
+        
+        results = iter(self._send([message for message in messages if message is not None], tracking))
+        return [message is not None and next(results)[0] for message in messages]
+    
+    def _send(self, messages, tracking):
+        """
+        Send built messages and record them as EmailNotifications.
+        
+        Tracking rows for the whole batch are inserted with one query before
+        sending, and their outcomes written with one ``bulk_update`` after.
+        """
+        from .email_tracking import EmailStatusBuffer, track_messages
+        
+        tracked = [
+            (message, message_tracking, language)
+            for message, (message_tracking, language) in zip(messages, tracking)
+            if message_tracking
+        ]
+        notifications = iter(track_messages(tracked) if tracked else [])
+        
+        results = send_many(messages)
         
-        return email.send()
+        sent_at = timezone.now()
+        with EmailStatusBuffer() as buffer:
+            for (sent, error), (message_tracking, language) in zip(results, tracking):
+                if not message_tracking:
+                    continue
+                buffer.update(
+                    next(notifications),
+                    'sent' if sent else 'failed',
+                    error_message='' if sent else str(error or 'Not sent'),
+                    sent_at=sent_at if sent else None,
+                )
+        return results
 
 
 # Global instance
@@ -1,118 +1,226 @@
 """
 Email tracking system for monitoring sent notifications.
 """
-from django.db import models
-from django.contrib.auth.models import User
-from .models import ServiceRequest
-
-
-class EmailNotification(models.Model):
-    """Track sent email notifications."""
-    
-    EMAIL_TYPES = [
-        ('confirmation', 'Request Confirmation'),
-        ('status_update', 'Status Update'),
-        ('admin_notification', 'Admin Notification'),
-        ('overdue_alert', 'Overdue Alert'),
-        ('urgent_alert', 'Urgent Alert'),
-    ]
-    
-    STATUS_CHOICES = [
-        ('queued', 'Queued'),
-        ('sent', 'Sent'),
-        ('failed', 'Failed'),
-        ('bounced', 'Bounced'),
-    ]
-    
-    service_request = models.ForeignKey(
-        ServiceRequest, 
-        on_delete=models.CASCADE, 
-        related_name='email_notifications'
-    )
-    email_type = models.CharField(max_length=20, choices=EMAIL_TYPES)
-    recipient_email = models.EmailField()
-    language = models.CharField(max_length=2, choices=[('en', 'English'), ('ar', 'Arabic')], default='en')
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
-    subject = models.CharField(max_length=200)
-    sent_at = models.DateTimeField(null=True, blank=True)
-    error_message = models.TextField(blank=True)
-    celery_task_id = models.CharField(max_length=255, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
-    class Meta:
-        verbose_name = 'Email Notification'
-        verbose_name_plural = 'Email Notifications'
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"{self.get_email_type_display()} to {self.recipient_email} - {self.get_status_display()}"
+from datetime import timedelta
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 
-def track_email_notification(service_request, email_type, recipient_email, language='en', 
-                           subject='', celery_task_id='', status='queued'):
+from .models import ServiceRequest, EmailNotification
+
+
+def get_email_type(template_type, notification_type=None):
+    """Map an email template (and admin notification type) to an ``EMAIL_TYPES`` value."""
+    if template_type == 'request_confirmation':
+        return 'confirmation'
+    if template_type == 'admin_notification':
+        return {
+            'urgent_request': 'urgent_alert',
+            'overdue_request': 'overdue_alert',
+        }.get(notification_type, 'admin_notification')
+    return template_type
+
+
+def track_email_notifications(service_request, email_type, recipients, language='en',
+                              subject='', celery_task_id='', status='queued'):
     """
-    Create an email tracking record.
+    Create tracking records for every recipient of one email in one query.
     
     Args:
         service_request: ServiceRequest instance
         email_type: Type of email being sent
-        recipient_email: Email address of recipient
+        recipients: Email addresses of the recipients
         language: Language of the email
         subject: Email subject line
         celery_task_id: Celery task ID for tracking
         status: Initial status of the email
     
+    Returns:
+        List of EmailNotification instances
+    """
+    return EmailNotification.objects.bulk_create([
+        EmailNotification(
+            service_request=service_request,
+            email_type=email_type,
+            recipient_email=recipient_email,
+            language=language,
+            subject=subject[:200],
+            celery_task_id=celery_task_id or '',
+            status=status,
+        )
+        for recipient_email in recipients
+    ])
+
+
+def track_email_notification(service_request, email_type, recipient_email, language='en', 
+                           subject='', celery_task_id='', status='queued'):
+    """
+    Create an email tracking record.
+    
+    Takes the same arguments as ``track_email_notifications`` with a single
+    recipient.
+    
     Returns:
         EmailNotification instance
     """
-    return EmailNotification.objects.create(
-        service_request=service_request,
-        email_type=email_type,
-        recipient_email=recipient_email,
-        language=language,
-        subject=subject,
-        celery_task_id=celery_task_id,
-        status=status
-    )
+    return track_email_notifications(
+        service_request, email_type, [recipient_email], language=language,
+        subject=subject, celery_task_id=celery_task_id, status=status
+    )[0]
+
+
+def track_messages(tracked):
+    """
+    Create tracking records for a batch of messages in one query.
+    
+    Args:
+        tracked (list): ``(message, tracking, language)`` tuples, where
+            ``tracking`` holds ``service_request``, ``email_type`` and
+            optionally ``celery_task_id``
+    
+    Returns:
+        List with the EmailNotification instances of each message
+    """
+    notifications = []
+    for message, tracking, language in tracked:
+        notifications.append([
+            EmailNotification(
+                service_request=tracking['service_request'],
+                email_type=tracking['email_type'],
+                recipient_email=recipient_email,
+                language=language,
+                subject=message.subject[:200],
+                celery_task_id=tracking.get('celery_task_id') or '',
+            )
+            for recipient_email in message.recipients()
+        ])
+    EmailNotification.objects.bulk_create([
+        notification for message_notifications in notifications for notification in message_notifications
+    ])
+    return notifications
+
+
+class EmailStatusBuffer:
+    """
+    Collect email status changes and write them with one ``bulk_update``.
+    
+    Use as a context manager; pending changes are flushed on exit and
+    whenever ``max_size`` changes have been buffered.
+    """
+    
+    FIELDS = ['status', 'error_message', 'sent_at', 'updated_at']
+    
+    def __init__(self, max_size=500):
+        self.max_size = max_size
+        self.pending = {}
+        self.pending_tasks = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.flush()
+    
+    def __len__(self):
+        return len(self.pending) + len(self.pending_tasks)
+    
+    def update(self, notifications, status, error_message='', sent_at=None):
+        """Buffer a status change for EmailNotification instances."""
+        for notification in notifications:
+            self.pending[notification.pk] = (notification, status, error_message, sent_at)
+        if len(self) >= self.max_size:
+            self.flush()
+    
+    def update_task(self, celery_task_id, status, error_message='', sent_at=None):
+        """Buffer a status change for every notification sent by a Celery task."""
+        self.pending_tasks[celery_task_id] = (status, error_message, sent_at)
+        if len(self) >= self.max_size:
+            self.flush()
+    
+    def flush(self):
+        """
+        Write the buffered changes.
+        
+        Returns:
+            Number of notifications updated
+        """
+        changes = list(self.pending.values())
+        if self.pending_tasks:
+            for notification in EmailNotification.objects.filter(celery_task_id__in=list(self.pending_tasks)):
+                if notification.pk not in self.pending:
+                    changes.append((notification, *self.pending_tasks[notification.celery_task_id]))
+        self.pending, self.pending_tasks = {}, {}
+        if not changes:
+            return 0
+        
+        now = timezone.now()
+        notifications = []
+        for notification, status, error_message, sent_at in changes:
+            notification.status = status
+            if error_message:
+                notification.error_message = error_message
+            if sent_at:
+                notification.sent_at = sent_at
+            notification.updated_at = now
+            notifications.append(notification)
+        EmailNotification.objects.bulk_update(notifications, self.FIELDS)
+        return len(notifications)
 
 
 def update_email_status(celery_task_id, status, error_message='', sent_at=None):
     """
-    Update the status of an email notification.
+    Update the status of the email notifications sent by a Celery task.
+    
+    A single UPDATE on the indexed ``celery_task_id``; use ``EmailStatusBuffer``
+    to batch many changes.
     
     Args:
         celery_task_id: Celery task ID
         status: New status
         error_message: Error message if failed
         sent_at: Timestamp when email was sent
+    
+    Returns:
+        Number of notifications updated
     """
-    try:
-        notification = EmailNotification.objects.get(celery_task_id=celery_task_id)
-        notification.status = status
-        if error_message:
-            notification.error_message = error_message
-        if sent_at:
-            notification.sent_at = sent_at
-        notification.save()
-        return notification
-    except EmailNotification.DoesNotExist:
-        return None
-
-
-def get_email_stats(service_request=None, days=30):
+    changes = {'status': status, 'updated_at': timezone.now()}
+    if error_message:
+        changes['error_message'] = error_message
+    if sent_at:
+        changes['sent_at'] = sent_at
+    return EmailNotification.objects.filter(celery_task_id=celery_task_id).update(**changes)
+
+
+STATS_CACHE_PREFIX = 'email_stats'
+
+
+def get_email_stats(service_request=None, days=30, daily=False, use_cache=False):
     """
     Get email statistics.
     
+    All counts come from one conditional-aggregation query; the optional
+    daily breakdown is one more grouped query.
+    
     Args:
         service_request: Optional ServiceRequest to filter by
         days: Number of days to look back
+        daily: Include per-day counts by email type over the ``days`` window
+        use_cache: Serve from the cache for ``EMAIL_STATS_CACHE_TIMEOUT`` seconds
     
     Returns:
         Dictionary with email statistics
     """
-    from django.utils import timezone
-    from datetime import timedelta
+    timeout = getattr(settings, 'EMAIL_STATS_CACHE_TIMEOUT', 60)
+    cache_key = None
+    if use_cache and timeout:
+        request_id = getattr(service_request, 'pk', service_request)
+        cache_key = f'{STATS_CACHE_PREFIX}:{request_id}:{days}:{int(bool(daily))}'
+        stats = cache.get(cache_key)
+        if stats is not None:
+            return stats
     
     queryset = EmailNotification.objects.all()
     
@@ -121,25 +229,49 @@ def get_email_stats(service_request=None, days=30):
     
     if days:
         cutoff_date = timezone.now() - timedelta(days=days)
+        start_date = timezone.localtime(cutoff_date).date()
         queryset = queryset.filter(created_at__gte=cutoff_date)
     
-    stats = {
-        'total': queryset.count(),
-        'sent': queryset.filter(status='sent').count(),
-        'failed': queryset.filter(status='failed').count(),
-        'queued': queryset.filter(status='queued').count(),
-        'bounced': queryset.filter(status='bounced').count(),
-    }
+    statuses = ['sent', 'failed', 'queued', 'bounced']
+    email_types = [email_type for email_type, display_name in EmailNotification.EMAIL_TYPES]
+    languages = ['en', 'ar']
+    
+    aggregates = {'total': Count('id')}
+    aggregates.update({status: Count('id', filter=Q(status=status)) for status in statuses})
+    aggregates.update({f'type_{email_type}': Count('id', filter=Q(email_type=email_type)) for email_type in email_types})
+    aggregates.update({f'language_{language}': Count('id', filter=Q(language=language)) for language in languages})
+    counts = queryset.aggregate(**aggregates)
+    
+    stats = {key: counts[key] for key in ['total'] + statuses}
     
     # Email type breakdown
-    stats['by_type'] = {}
-    for email_type, display_name in EmailNotification.EMAIL_TYPES:
-        stats['by_type'][email_type] = queryset.filter(email_type=email_type).count()
+    stats['by_type'] = {email_type: counts[f'type_{email_type}'] for email_type in email_types}
     
     # Language breakdown
-    stats['by_language'] = {
-        'en': queryset.filter(language='en').count(),
-        'ar': queryset.filter(language='ar').count(),
-    }
+    stats['by_language'] = {language: counts[f'language_{language}'] for language in languages}
+    
+    if daily and days:
+        stats['daily'] = get_daily_breakdown(queryset, start_date, email_types)
+    
+    if cache_key:
+        cache.set(cache_key, stats, timeout)
+    return stats
+
+
+def get_daily_breakdown(queryset, start_date, email_types):
+    """Count ``queryset`` per day and email type, zero-filled from ``start_date`` to today."""
+    from apps.dashboard.timeseries import get_bucket_dates
+    
+    rows = queryset.annotate(
+        day=TruncDate('created_at')
+    ).order_by().values_list('day', 'email_type').annotate(count=Count('id'))
+    
+    counts = {}
+    for day, email_type, count in rows:
+        counts[(day, email_type)] = count
     
-    return stats
\ No newline at end of file
+    daily = []
+    for day in get_bucket_dates(start_date, timezone.localdate(), 'day'):
+        by_type = {email_type: counts.get((day, email_type), 0) for email_type in email_types}
+        daily.append({'date': day.isoformat(), 'total': sum(by_type.values()), 'by_type': by_type})
+    return daily
@@ -1,12 +1,16 @@
 """
 API views for email notification management.
 """
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
+from apps.common.pagination import AdminPagination
+from apps.dashboard.timeseries import MAX_DAYS
 from .models import ServiceRequest
 from .email_tracking import get_email_stats, EmailNotification
+from .serializers import EmailNotificationSerializer
 from .tasks import (
     send_request_confirmation_email,
     send_status_update_email,
@@ -17,21 +21,29 @@ from .tasks import (
 class EmailNotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for email notification tracking (admin only)."""
     
+    serializer_class = EmailNotificationSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = AdminPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = ['status', 'email_type', 'language', 'service_request']
+    search_fields = ['recipient_email', 'subject']
+    ordering_fields = ['created_at', 'sent_at', 'status']
+    ordering = ['-created_at']
     
     def get_queryset(self):
-        return EmailNotification.objects.all()
+        return EmailNotification.objects.select_related('service_request')
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get email notification statistics."""
+        """Get email notification statistics with a daily breakdown by type."""
         days = request.query_params.get('days', 30)
         try:
             days = int(days)
         except (ValueError, TypeError):
             days = 30
+        days = min(max(days, 0), MAX_DAYS)
         
-        stats = get_email_stats(days=days)
+        stats = get_email_stats(days=days, daily=True, use_cache=True)
         return Response(stats)
     
     @action(detail=False, methods=['get'])
@@ -39,7 +51,7 @@ class EmailNotificationViewSet(viewsets.ReadOnlyModelViewSet):
         """Get recent failed email notifications."""
         failed_notifications = EmailNotification.objects.filter(
             status='failed'
-        ).order_by('-created_at')[:20]
+        ).select_related('service_request').order_by('-created_at')[:20]
         
         failures = []
         for notification in failed_notifications:
@@ -0,0 +1,135 @@
+"""
+Management command to measure email throughput with and without the pooled
+SMTP connection, against a local aiosmtpd server that discards the messages.
+When aiosmtplib is installed the asyncio backend is measured too.
+Usage: python manage.py benchmark_email_delivery [--messages N]
+
+Requires aiosmtpd (``pip install aiosmtpd``); it is not needed in production.
+"""
+import asyncio
+import socket
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.service_requests.email_delivery import close_pooled_connection, send_many
+
+
+class SlowSink:
+    """aiosmtpd handler that discards messages after a simulated delay."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return '250 Message accepted for delivery'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-message SMTP connections against the pooled connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=200,
+            help='Number of messages sent in each run',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0,
+            help='Milliseconds the stand-in server waits before accepting each message',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=5,
+            help='Connections used by the asyncio backend',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError('aiosmtpd is required: pip install aiosmtpd')
+
+        count = max(1, options['messages'])
+        port = self.get_free_port()
+        controller = Controller(SlowSink(options['latency'] / 1000), hostname='127.0.0.1', port=port)
+        controller.start()
+        try:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST='127.0.0.1',
+                EMAIL_PORT=port,
+                EMAIL_USE_TLS=False,
+                EMAIL_HOST_USER='',
+                EMAIL_HOST_PASSWORD='',
+            ):
+                before = self.run_per_message(count)
+                after = self.run_pooled(count)
+                concurrent = self.run_async(count, options['concurrency'])
+        finally:
+            close_pooled_connection()
+            controller.stop()
+
+        self.stdout.write(f'Per-message connections: {before:,.0f} msgs/sec')
+        self.stdout.write(f'Pooled connection:       {after:,.0f} msgs/sec')
+        if concurrent:
+            self.stdout.write(f'Asyncio backend:         {concurrent:,.0f} msgs/sec')
+        self.stdout.write(self.style.SUCCESS(f'✓ {after / before:.1f}x faster with the pooled connection'))
+
+    def get_free_port(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def build_messages(self, count):
+        return [
+            EmailMessage(
+                subject=f'Benchmark {i}',
+                body='Benchmark message body',
+                from_email='noreply@studentservices.com',
+                to=['staff@example.com'],
+            )
+            for i in range(count)
+        ]
+
+    def run_per_message(self, count):
+        """Send like ``EmailMessage.send()``: one connection per message."""
+        messages = self.build_messages(count)
+        start = time.perf_counter()
+        for message in messages:
+            get_connection(fail_silently=False).send_messages([message])
+        return count / (time.perf_counter() - start)
+
+    def run_pooled(self, count):
+        messages = self.build_messages(count)
+        start = time.perf_counter()
+        results = send_many(messages)
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for sent, error in results if not sent)
+        if failed:
+            raise CommandError(f'{failed} messages failed over the pooled connection')
+        return count / elapsed
+
+    def run_async(self, count, concurrency):
+        from apps.service_requests import async_email
+
+        if async_email.aiosmtplib is None:
+            self.stdout.write('aiosmtplib is not installed, skipping the asyncio backend')
+            return None
+        backend = async_email.AsyncSMTPEmailBackend(concurrency=concurrency)
+        messages = self.build_messages(count)
+        start = time.perf_counter()
+        results = backend.send_many(messages)
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for sent, error in results if not sent)
+        if failed:
+            raise CommandError(f'{failed} messages failed over the asyncio backend')
+        return count / elapsed
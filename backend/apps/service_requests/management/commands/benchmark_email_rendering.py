@@ -0,0 +1,64 @@
+"""
+Management command to measure email template rendering speed.
+Usage: python manage.py benchmark_email_rendering [--renders N]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.service_requests.email_service import email_service
+
+SAMPLE_CONTEXT = {
+    'client_name': 'Sample Client',
+    'client_email': 'client@example.com',
+    'client_phone': '+1 (555) 000-0000',
+    'service_name': 'Essay Writing',
+    'project_title': 'Sample Project',
+    'project_description': 'A sample project description for the benchmark.',
+    'priority': 'High',
+    'deadline': '2025-01-31',
+    'budget': '$100',
+    'request_id': 42,
+    'created_at': '2025-01-01 10:00',
+    'old_status': 'Pending',
+    'new_status': 'In Progress',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark renders per second for each email template in English and Arabic'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--renders',
+            type=int,
+            default=5000,
+            help='Number of renders per template and language',
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options['renders'])
+        self.stdout.write(f'{"Template":<22}{"Lang":<6}{"Compiled":>14}{"Memoized":>14}')
+
+        for template_type in email_service.get_email_templates():
+            for language in ('en', 'ar'):
+                notification_type = 'urgent_request' if template_type == 'admin_notification' else None
+                items = tuple(sorted((key, str(value)) for key, value in SAMPLE_CONTEXT.items()))
+
+                # Every render sees a new context, like a batch of different requests
+                start = time.perf_counter()
+                for i in range(count):
+                    email_service._render(template_type, language, notification_type, items + (('n', i),))
+                compiled = count / (time.perf_counter() - start)
+
+                # The same context every time, like an admin notification fan-out
+                start = time.perf_counter()
+                for _ in range(count):
+                    email_service.render_email(template_type, language, SAMPLE_CONTEXT, notification_type)
+                memoized = count / (time.perf_counter() - start)
+
+                self.stdout.write(
+                    f'{template_type:<22}{language:<6}{compiled:>10,.0f}/sec{memoized:>10,.0f}/sec'
+                )
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark completed'))
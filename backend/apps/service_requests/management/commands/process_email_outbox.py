@@ -0,0 +1,62 @@
+"""
+Management command to send the emails waiting in the outbox.
+Usage: python manage.py process_email_outbox [--loop] [--interval SECONDS]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.service_requests.email_delivery import close_pooled_connection
+from apps.service_requests.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued notification emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the outbox (standalone worker mode)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the outbox is empty',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of emails claimed per batch',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        if not options['loop']:
+            sent, failed = process_outbox(batch_size=batch_size)
+            close_pooled_connection()
+            self.report(sent, failed)
+            return
+
+        self.stdout.write(self.style.SUCCESS('Outbox worker started, press Ctrl+C to stop'))
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = process_outbox(batch_size=batch_size)
+                if sent or failed:
+                    self.report(sent, failed)
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Outbox worker stopped')
+        finally:
+            close_pooled_connection()
+
+    def report(self, sent, failed):
+        self.stdout.write(self.style.SUCCESS(f'✓ Sent {sent} emails'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} emails failed and will be retried or marked failed'))
@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the admin full-text search indexes.
+Usage: python manage.py rebuild_search_index [--model app_label.Model]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.common.search import get_search_backend, rebuild_search_index, search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes used by the admin search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            help='Only rebuild the index of this model (app_label.Model)',
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database to rebuild the indexes in',
+        )
+
+    def handle(self, *args, **options):
+        indexes = list(search_indexes.values())
+        if options['model']:
+            indexes = [index for index in indexes if index.model._meta.label_lower == options['model'].lower()]
+            if not indexes:
+                raise CommandError(f"No search index registered for {options['model']}")
+
+        if get_search_backend(connections[options['database']]) is None:
+            self.stdout.write(self.style.WARNING('No search backend for this database, nothing to rebuild'))
+            return
+
+        for index in indexes:
+            rebuild_search_index(index, using=options['database'])
+            self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt search index for {index.model._meta.label}'))
@@ -0,0 +1,49 @@
+"""
+Management command to send the pending admin notification digests.
+Run it from cron every ADMIN_DIGEST_WINDOW_MINUTES, or with --loop as a
+standalone worker, when Celery Beat is not running.
+Usage: python manage.py send_admin_digests [--loop]
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.service_requests.digests import send_admin_digests
+from apps.service_requests.email_delivery import close_pooled_connection
+
+
+class Command(BaseCommand):
+    help = 'Send pending admin notification digests to staff with digest delivery'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and send digests once per ADMIN_DIGEST_WINDOW_MINUTES',
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.send()
+            return
+
+        interval = 60 * settings.ADMIN_DIGEST_WINDOW_MINUTES
+        self.stdout.write(self.style.SUCCESS(
+            f'Digest worker started, sending every {settings.ADMIN_DIGEST_WINDOW_MINUTES} minutes, press Ctrl+C to stop'
+        ))
+        try:
+            while True:
+                close_old_connections()
+                self.send()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write('Digest worker stopped')
+
+    def send(self):
+        try:
+            sent = send_admin_digests()
+        finally:
+            close_pooled_connection()
+        self.stdout.write(self.style.SUCCESS(f'✓ Sent {sent} admin digests'))
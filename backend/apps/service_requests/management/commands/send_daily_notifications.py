@@ -7,10 +7,11 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from apps.service_requests.models import ServiceRequest
+from apps.service_requests.dedup import claim_notifications, release_notifications
+from apps.service_requests.email_fallback import send_admin_notifications_sync
 from apps.service_requests.tasks import (
     send_daily_overdue_notifications,
     cleanup_old_attachments,
-    send_admin_notification_email
 )
 
 
@@ -52,10 +53,7 @@ class Command(BaseCommand):
         if not skip_overdue:
             self.stdout.write('Checking for overdue requests...')
             
-            overdue_requests = ServiceRequest.objects.filter(
-                deadline__lt=timezone.now().date(),
-                status__in=['pending', 'in_progress']
-            ).select_related('service')
+            overdue_requests = ServiceRequest.objects.overdue().select_related('service')
             
             overdue_count = overdue_requests.count()
             self.stdout.write(f'Found {overdue_count} overdue requests')
@@ -89,17 +87,30 @@ class Command(BaseCommand):
         self.stdout.write(f'Found {unassigned_count} high priority unassigned requests')
         
         if unassigned_count > 0 and not dry_run:
-            for request in high_priority_unassigned:
-                try:
-                    notification_type = 'urgent_request' if request.priority == 'urgent' else 'new_request'
-                    send_admin_notification_email.delay(request.id, notification_type)
-                    self.stdout.write(
-                        f'✓ Queued notification for unassigned {request.priority} request: {request.project_title}'
-                    )
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'✗ Failed to queue notification for request {request.id}: {e}')
-                    )
+            notifications = [
+                (request, 'urgent_request' if request.priority == 'urgent' else 'new_request')
+                for request in high_priority_unassigned
+            ]
+            # Skip requests already alerted about within the cooldown
+            claimed = set(claim_notifications(
+                [(request.id, notification_type) for request, notification_type in notifications]
+            ))
+            notifications = [
+                (request, notification_type) for request, notification_type in notifications
+                if (request.id, notification_type) in claimed
+            ]
+            try:
+                sent = send_admin_notifications_sync(notifications)
+                self.stdout.write(
+                    self.style.SUCCESS(f'✓ Sent {sent} of {unassigned_count} unassigned request notifications')
+                )
+                if notifications and not sent:
+                    release_notifications(claimed)
+            except Exception as e:
+                release_notifications(claimed)
+                self.stdout.write(
+                    self.style.ERROR(f'✗ Failed to send unassigned request notifications: {e}')
+                )
         elif dry_run and unassigned_count > 0:
             for request in high_priority_unassigned:
                 self.stdout.write(
@@ -143,7 +154,7 @@ class Command(BaseCommand):
                 status='completed',
                 updated_at__date=today
             ).count(),
-            'overdue': len([r for r in ServiceRequest.objects.all() if r.is_overdue]),
+            'overdue': ServiceRequest.objects.overdue().count(),
             'unassigned': ServiceRequest.objects.filter(assigned_to=None, status='pending').count(),
         }
         
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0002_emailnotification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailnotification',
+            index=models.Index(fields=['-created_at'], name='email_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailnotification',
+            index=models.Index(fields=['status', '-created_at'], name='email_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['-created_at'], name='sr_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status', '-created_at'], name='sr_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['priority', '-created_at'], name='sr_priority_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['assigned_to', 'status'], name='sr_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress'])), fields=['status', 'deadline'], name='sr_active_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0005_staff_notification_digests'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailnotification',
+            index=models.Index(fields=['celery_task_id'], name='email_task_idx'),
+        ),
+    ]
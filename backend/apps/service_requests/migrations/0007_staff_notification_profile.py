@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0006_emailnotification_task_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staffnotificationpreference',
+            name='language',
+            field=models.CharField(choices=[('en', 'English'), ('ar', 'Arabic')], default='en', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='staffnotificationpreference',
+            name='notification_types',
+            field=models.JSONField(blank=True, default=list, help_text='Notification types to receive; empty means all'),
+        ),
+    ]
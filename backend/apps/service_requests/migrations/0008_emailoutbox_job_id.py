@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0007_staff_notification_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='job_id',
+            field=models.CharField(blank=True, help_text='Bulk update this email belongs to', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='emailoutbox',
+            index=models.Index(condition=models.Q(('job_id', ''), _negated=True), fields=['job_id'], name='outbox_job_idx'),
+        ),
+    ]
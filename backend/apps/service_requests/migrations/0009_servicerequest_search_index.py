@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from apps.common.search import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0008_emailoutbox_job_id'),
+    ]
+
+    operations = [
+        search_index_operation('service_requests_servicerequest', {
+            'project_title': 'A',
+            'client_name': 'B',
+            'client_email': 'B',
+            'project_description': 'C',
+        }),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('service_requests', '0009_servicerequest_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='admindigestitem',
+            name='delivered_to',
+            field=models.ManyToManyField(blank=True, help_text='Digest staff whose digest included this item', related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='admindigestitem',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, help_text='When every digest recipient had it', null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0010_admindigestitem_delivered_to'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(max_length=30)),
+                ('expires_at', models.DateTimeField(help_text='The alert may be sent again after this time')),
+                ('service_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_claims', to='service_requests.servicerequest')),
+            ],
+            options={
+                'verbose_name': 'Notification Claim',
+                'verbose_name_plural': 'Notification Claims',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationclaim',
+            constraint=models.UniqueConstraint(fields=('service_request', 'notification_type'), name='notification_claim_unique_key'),
+        ),
+    ]
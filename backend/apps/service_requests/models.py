@@ -1,7 +1,98 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.dispatch import Signal
 from django.contrib.auth.models import User
+from django.utils import timezone
+from apps.common.search import register_search_index
 from apps.services.models import Service
 
+# Statuses of requests that are still being worked on
+ACTIVE_STATUSES = ['pending', 'in_progress']
+
+# Fields whose original values are kept for change detection
+TRACKED_FIELDS = ('status', 'priority', 'assigned_to_id', 'deadline')
+
+# Sent by ServiceRequestQuerySet.update_tracked() with
+# changes={pk: {field: (old_value, new_value)}} for the rows that changed
+# and the job_id grouping the emails queued for the update ('' for none)
+requests_bulk_updated = Signal()
+
+
+def overdue_q(today=None):
+    """
+    Build the Q object matching overdue requests.
+    
+    Args:
+        today (date): Optional reference date (defaults to the current local date)
+    """
+    today = today or timezone.localdate()
+    return Q(deadline__lt=today, status__in=ACTIVE_STATUSES)
+
+
+class ServiceRequestQuerySet(models.QuerySet):
+    """QuerySet with SQL-level filters for request state."""
+    
+    def active(self):
+        """Requests that are pending or in progress."""
+        return self.filter(status__in=ACTIVE_STATUSES)
+    
+    def overdue(self, today=None):
+        """Active requests whose deadline has passed."""
+        return self.filter(overdue_q(today))
+    
+    def annotate_overdue(self, today=None):
+        """Annotate each request with an ``overdue`` boolean computed in SQL."""
+        return self.annotate(
+            overdue=ExpressionWrapper(overdue_q(today), output_field=BooleanField())
+        )
+    
+    def update_tracked(self, job_id='', **kwargs):
+        """
+        Update the matching requests and report the changes to tracked fields.
+        
+        The original values of every row are read with one SELECT and the
+        rows are changed with one UPDATE, then ``requests_bulk_updated`` is
+        sent once with the per-row changes.
+        
+        Args:
+            job_id (str): Optional ID to tag the emails queued for this
+                update with, so their progress can be followed (see ``outbox.get_job_status``)
+            **kwargs: Field values to set
+        
+        Returns:
+            Number of rows updated
+        """
+        new_values = {}
+        for name, value in kwargs.items():
+            attname = self.model._meta.get_field(name).attname
+            if attname in TRACKED_FIELDS:
+                new_values[attname] = value.pk if isinstance(value, models.Model) else value
+        kwargs.setdefault('updated_at', timezone.now())
+        
+        with transaction.atomic():
+            rows = list(self.select_for_update().order_by().values_list('pk', *TRACKED_FIELDS))
+            if not rows:
+                return 0
+            updated = self.model._default_manager.filter(
+                pk__in=[row[0] for row in rows]
+            ).update(**kwargs)
+            
+            changes = {}
+            for pk, *values in rows:
+                original = dict(zip(TRACKED_FIELDS, values))
+                changed = {
+                    field: (original[field], value)
+                    for field, value in new_values.items()
+                    if original[field] != value
+                }
+                if changed:
+                    changes[pk] = changed
+            # Receivers run inside the transaction, so anything they write
+            # (e.g. outbox emails) commits together with the update
+            if changes:
+                requests_bulk_updated.send(sender=self.model, changes=changes, job_id=job_id)
+        return updated
+
 
 class ServiceRequest(models.Model):
     """Model for service requests with status tracking."""
@@ -35,16 +126,270 @@ class ServiceRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ServiceRequestQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Service Request'
         verbose_name_plural = 'Service Requests'
         ordering = ['-created_at']
+        indexes = [
+            # Default list ordering and created_at range filters
+            models.Index(fields=['-created_at'], name='sr_created_idx'),
+            # Admin list filtered by status or priority, newest first
+            models.Index(fields=['status', '-created_at'], name='sr_status_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='sr_priority_created_idx'),
+            # Workload and per-assignee breakdowns
+            models.Index(fields=['assigned_to', 'status'], name='sr_assignee_status_idx'),
+            # Overdue checks only ever look at active requests
+            models.Index(
+                fields=['status', 'deadline'],
+                name='sr_active_deadline_idx',
+                condition=Q(status__in=ACTIVE_STATUSES),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.project_title} - {self.client_name} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the changes; start tracking afresh
+        self._snapshot_tracked_fields()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_tracked_fields()
+
+    def _snapshot_tracked_fields(self):
+        """Remember the current values of the loaded tracked fields."""
+        deferred = self.get_deferred_fields()
+        self._original_values = {
+            field: getattr(self, field) for field in TRACKED_FIELDS if field not in deferred
+        }
+
+    def get_original(self, field):
+        """Get the value ``field`` had when the request was loaded or last saved."""
+        return getattr(self, '_original_values', {}).get(field)
+
+    def get_dirty_fields(self):
+        """
+        Get the tracked fields changed since the request was loaded or last saved.
+        
+        Returns a dictionary mapping field names to their original values.
+        Requests built in memory and never saved have no original values.
+        """
+        original = getattr(self, '_original_values', {})
+        return {
+            field: value for field, value in original.items()
+            if getattr(self, field) != value
+        }
+
     @property
     def is_overdue(self):
         """Check if the request is overdue based on deadline."""
-        from django.utils import timezone
-        return self.deadline < timezone.now().date() and self.status not in ['completed', 'cancelled']
\ No newline at end of file
+        return self.deadline < timezone.localdate() and self.status in ACTIVE_STATUSES
+
+
+class EmailNotification(models.Model):
+    """Track sent email notifications."""
+    
+    EMAIL_TYPES = [
+        ('confirmation', 'Request Confirmation'),
+        ('status_update', 'Status Update'),
+        ('admin_notification', 'Admin Notification'),
+        ('overdue_alert', 'Overdue Alert'),
+        ('urgent_alert', 'Urgent Alert'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('bounced', 'Bounced'),
+    ]
+    
+    service_request = models.ForeignKey(
+        ServiceRequest, 
+        on_delete=models.CASCADE, 
+        related_name='email_notifications'
+    )
+    email_type = models.CharField(max_length=20, choices=EMAIL_TYPES)
+    recipient_email = models.EmailField()
+    language = models.CharField(max_length=2, choices=[('en', 'English'), ('ar', 'Arabic')], default='en')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    subject = models.CharField(max_length=200)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+    celery_task_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Email Notification'
+        verbose_name_plural = 'Email Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='email_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='email_status_created_idx'),
+            models.Index(fields=['celery_task_id'], name='email_task_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_email_type_display()} to {self.recipient_email} - {self.get_status_display()}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Email waiting to be sent, written in the same transaction as the change
+    that caused it and drained by the outbox worker.
+    """
+    
+    KIND_CHOICES = [
+        ('request_confirmation', 'Request Confirmation'),
+        ('status_update', 'Status Update'),
+        ('admin_notification', 'Admin Notification'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    service_request = models.ForeignKey(
+        ServiceRequest,
+        on_delete=models.CASCADE,
+        related_name='outbox_emails'
+    )
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments for the sender")
+    job_id = models.CharField(max_length=32, blank=True, help_text="Bulk update this email belongs to")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not sent before this time")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Email Outbox Entry'
+        verbose_name_plural = 'Email Outbox'
+        ordering = ['id']
+        indexes = [
+            # The worker only ever scans rows that still need sending
+            models.Index(
+                fields=['available_at'],
+                name='outbox_due_idx',
+                condition=Q(status__in=['pending', 'sending']),
+            ),
+            models.Index(fields=['job_id'], name='outbox_job_idx', condition=~Q(job_id='')),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} for request {self.service_request_id} - {self.get_status_display()}"
+
+
+class StaffNotificationPreference(models.Model):
+    """How a staff member wants to receive admin notifications."""
+    
+    DELIVERY_CHOICES = [
+        ('immediate', 'Immediate'),
+        ('digest', 'Digest'),
+    ]
+    
+    NOTIFICATION_TYPES = [
+        ('new_request', 'New Request'),
+        ('urgent_request', 'Urgent Request'),
+        ('overdue_request', 'Overdue Request'),
+    ]
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_preference')
+    delivery = models.CharField(max_length=10, choices=DELIVERY_CHOICES, default='immediate')
+    notification_types = models.JSONField(
+        default=list, blank=True, help_text="Notification types to receive; empty means all"
+    )
+    language = models.CharField(max_length=2, choices=[('en', 'English'), ('ar', 'Arabic')], default='en')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Staff Notification Preference'
+        verbose_name_plural = 'Staff Notification Preferences'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.get_delivery_display()}"
+
+
+class AdminDigestItem(models.Model):
+    """Admin notification held back for the next digest email."""
+    
+    service_request = models.ForeignKey(
+        ServiceRequest,
+        on_delete=models.CASCADE,
+        related_name='digest_items'
+    )
+    notification_type = models.CharField(max_length=30)
+    delivered_to = models.ManyToManyField(
+        User,
+        blank=True,
+        related_name='+',
+        help_text="Digest staff whose digest included this item"
+    )
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="When every digest recipient had it")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Admin Digest Item'
+        verbose_name_plural = 'Admin Digest Items'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['created_at'], name='digest_pending_idx', condition=Q(sent_at__isnull=True)),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_type} for request {self.service_request_id}"
+
+
+class NotificationClaim(models.Model):
+    """
+    Idempotency ledger row for an admin alert about a request (see ``dedup``).
+    
+    The row is written in the transaction that sends or queues the alert, so
+    a rollback frees the key. An expired row is reused by the next claim.
+    """
+    
+    service_request = models.ForeignKey(
+        ServiceRequest,
+        on_delete=models.CASCADE,
+        related_name='notification_claims'
+    )
+    notification_type = models.CharField(max_length=30)
+    expires_at = models.DateTimeField(help_text="The alert may be sent again after this time")
+    
+    class Meta:
+        verbose_name = 'Notification Claim'
+        verbose_name_plural = 'Notification Claims'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['service_request', 'notification_type'], name='notification_claim_unique_key'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_type} for request {self.service_request_id} until {self.expires_at}"
+
+
+# Full-text index for the admin request search (see apps.common.search)
+register_search_index(ServiceRequest, {
+    'project_title': 'A',
+    'client_name': 'B',
+    'client_email': 'B',
+    'project_description': 'C',
+})
@@ -0,0 +1,278 @@
+"""
+Transactional email outbox.
+
+Views and signals call ``enqueue_email`` instead of sending. The outbox row
+commits (or rolls back) together with the change that caused it, and
+``process_outbox`` sends it later from a separate process: the
+``process_email_outbox`` management command, or the Celery task of the same
+name when a broker is available.
+
+Rows are claimed with a lease, so an email whose worker dies mid-send is
+picked up again once the lease expires (at-least-once delivery). Failed sends
+are retried with exponential backoff up to ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+An admin alert that is given up on releases its ``dedup`` claim, so the next
+occurrence is not suppressed for the rest of the cooldown.
+
+Bulk updates queue their emails with ``enqueue_emails`` under a job ID, and
+kinds with a batch sender (status updates) are sent a batch at a time over
+one connection. ``get_job_status`` reports how far a job has got.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+
+# Fields written after a send attempt
+OUTCOME_FIELDS = ['status', 'attempts', 'sent_at', 'available_at', 'locked_until', 'last_error']
+
+
+def outbox_enabled():
+    """Return True when emails should go through the outbox."""
+    return getattr(settings, 'EMAIL_OUTBOX_ENABLED', True)
+
+
+def get_sender(kind):
+    """Get the synchronous sender for an outbox ``kind``."""
+    from .email_fallback import (
+        send_request_confirmation_email_sync,
+        send_status_update_email_sync,
+        send_admin_notification_email_sync,
+    )
+    return {
+        'request_confirmation': send_request_confirmation_email_sync,
+        'status_update': send_status_update_email_sync,
+        'admin_notification': send_admin_notification_email_sync,
+    }[kind]
+
+
+def get_task(kind):
+    """Get the Celery task that sends an outbox ``kind``."""
+    from .tasks import (
+        send_request_confirmation_email,
+        send_status_update_email,
+        send_admin_notification_email,
+    )
+    return {
+        'request_confirmation': send_request_confirmation_email,
+        'status_update': send_status_update_email,
+        'admin_notification': send_admin_notification_email,
+    }[kind]
+
+
+def get_batch_sender(kind):
+    """
+    Get the synchronous sender for a batch of ``kind`` emails, or None.
+
+    A batch sender takes ``(request_id, payload)`` pairs and returns a
+    ``(sent, error)`` tuple for each.
+    """
+    from .email_fallback import send_status_update_emails_sync
+    return {
+        'status_update': send_status_update_emails_sync,
+    }.get(kind)
+
+
+def new_job_id():
+    """Generate an ID grouping the emails of one bulk update."""
+    return uuid.uuid4().hex
+
+
+def enqueue_email(kind, request_id, **payload):
+    """
+    Queue an email for a service request.
+
+    Call this inside the transaction that changes the request. When Celery is
+    running, the worker is woken up as soon as the transaction commits.
+    With the outbox disabled, the email is handed to Celery or sent inline
+    as before.
+
+    Args:
+        kind (str): One of ``EmailOutbox.KIND_CHOICES``
+        request_id (int): ID of the ServiceRequest
+        **payload: Keyword arguments for the sender, e.g. ``language``
+    """
+    eager = getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True)
+    if not outbox_enabled():
+        if eager:
+            get_sender(kind)(request_id, **payload)
+        else:
+            get_task(kind).delay(request_id, **payload)
+        return None
+
+    with transaction.atomic():
+        entry = EmailOutbox.objects.create(kind=kind, service_request_id=request_id, payload=payload)
+    if not eager:
+        from .tasks import process_email_outbox
+        transaction.on_commit(process_email_outbox.delay)
+    return entry
+
+
+def enqueue_emails(kind, emails, job_id=''):
+    """
+    Queue emails of one kind for many requests with a single INSERT.
+
+    Args:
+        kind (str): One of ``EmailOutbox.KIND_CHOICES``
+        emails (list): ``(request_id, payload)`` pairs
+        job_id (str): Optional bulk job the emails belong to
+    """
+    emails = list(emails)
+    if not emails:
+        return []
+    eager = getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True)
+    if not outbox_enabled():
+        batch_sender = get_batch_sender(kind)
+        if eager and batch_sender:
+            batch_sender(emails)
+        else:
+            for request_id, payload in emails:
+                enqueue_email(kind, request_id, **payload)
+        return []
+
+    with transaction.atomic():
+        entries = EmailOutbox.objects.bulk_create([
+            EmailOutbox(kind=kind, service_request_id=request_id, payload=payload, job_id=job_id)
+            for request_id, payload in emails
+        ])
+    if not eager:
+        from .tasks import process_email_outbox
+        transaction.on_commit(process_email_outbox.delay)
+    return entries
+
+
+def claim_batch(batch_size=50):
+    """Lease up to ``batch_size`` due entries to the calling worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        entries = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                Q(status='pending', available_at__lte=now)
+                | Q(status='sending', locked_until__lt=now)
+            ).order_by('available_at', 'id')[:batch_size]
+        )
+        if entries:
+            EmailOutbox.objects.filter(id__in=[entry.id for entry in entries]).update(
+                status='sending', locked_until=now + LEASE
+            )
+    return entries
+
+
+def record_outcome(entry, sent, error):
+    """Set the status of an entry after a send attempt (without saving it)."""
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    entry.attempts += 1
+    if sent:
+        entry.status = 'sent'
+        entry.sent_at = timezone.now()
+    elif entry.attempts >= max_attempts:
+        entry.status = 'failed'
+        logger.error(f"Giving up on outbox email {entry.id} after {entry.attempts} attempts: {error}")
+    else:
+        entry.status = 'pending'
+        entry.available_at = timezone.now() + timedelta(minutes=2 ** entry.attempts)
+    entry.last_error = error
+    entry.locked_until = None
+
+
+def deliver(entry):
+    """Send one entry and record the outcome."""
+    try:
+        sent = get_sender(entry.kind)(entry.service_request_id, **entry.payload)
+        error = '' if sent else 'Sender reported failure'
+    except Exception as e:
+        sent, error = False, str(e)
+    record_outcome(entry, sent, error)
+    entry.save(update_fields=OUTCOME_FIELDS)
+    return sent
+
+
+def deliver_many(entries, batch_sender):
+    """
+    Send entries of one kind with its batch sender and record the outcomes
+    with one ``bulk_update``.
+
+    Returns:
+        Number of entries sent
+    """
+    try:
+        results = batch_sender([(entry.service_request_id, entry.payload) for entry in entries])
+    except Exception as e:
+        results = [(False, e)] * len(entries)
+    for entry, (sent, error) in zip(entries, results):
+        record_outcome(entry, sent, '' if sent else str(error or 'Sender reported failure'))
+    EmailOutbox.objects.bulk_update(entries, OUTCOME_FIELDS)
+    return sum(1 for sent, _ in results if sent)
+
+
+def release_given_up_alerts(entries):
+    """Release the dedup claims of admin alerts that will not be retried."""
+    from .dedup import release_notifications
+    release_notifications([
+        (entry.service_request_id, entry.payload.get('notification_type', 'new_request'))
+        for entry in entries
+        if entry.kind == 'admin_notification' and entry.status == 'failed'
+    ])
+
+
+def process_outbox(batch_size=50, max_batches=None):
+    """
+    Send due outbox entries until none are left.
+
+    Returns:
+        Tuple of (sent, failed) counts
+    """
+    sent = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        entries = claim_batch(batch_size)
+        if not entries:
+            break
+        by_kind = {}
+        for entry in entries:
+            by_kind.setdefault(entry.kind, []).append(entry)
+        for kind, kind_entries in by_kind.items():
+            batch_sender = get_batch_sender(kind)
+            if batch_sender:
+                delivered = deliver_many(kind_entries, batch_sender)
+            else:
+                delivered = sum(1 for entry in kind_entries if deliver(entry))
+            sent += delivered
+            failed += len(kind_entries) - delivered
+        release_given_up_alerts(entries)
+        batches += 1
+    return sent, failed
+
+
+def job_has_emails(job_id):
+    """Return True if a bulk job queued any outbox emails to follow."""
+    return EmailOutbox.objects.filter(job_id=job_id).exists()
+
+
+def get_job_status(job_id):
+    """
+    Count the emails of a bulk job by status.
+
+    Returns:
+        Dict of counts with ``done`` set once nothing is left to send, or
+        None when the job queued no emails
+    """
+    counts = EmailOutbox.objects.filter(job_id=job_id).aggregate(
+        total=Count('id'),
+        **{
+            status: Count('id', filter=Q(status=status))
+            for status, _ in EmailOutbox.STATUS_CHOICES
+        }
+    )
+    if not counts['total']:
+        return None
+    counts['done'] = counts['pending'] + counts['sending'] == 0
+    return counts
@@ -3,14 +3,10 @@ Public API views for service_requests app.
 """
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
+from django.db import transaction
 from .models import ServiceRequest
 from .serializers import ServiceRequestPublicSerializer
-from django.conf import settings
-from .tasks import send_request_confirmation_email, send_admin_notification_email
-from .email_fallback import (
-    send_request_confirmation_email_sync, 
-    send_admin_notification_email_sync
-)
+from .outbox import enqueue_email
 
 
 class PublicServiceRequestViewSet(viewsets.ModelViewSet):
@@ -25,12 +21,6 @@ class PublicServiceRequestViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Set default values for admin fields
-        service_request = serializer.save(
-            status='pending',
-            priority='normal'
-        )
-        
         # Get language from request headers or default to 'en'
         language = request.headers.get('Accept-Language', 'en')
         if language.startswith('ar'):
@@ -38,23 +28,23 @@ class PublicServiceRequestViewSet(viewsets.ModelViewSet):
         else:
             language = 'en'
         
-        # Send email notifications (async if Celery available, sync otherwise)
-        try:
-            if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
-                # Send emails synchronously (for free tier deployment)
-                send_request_confirmation_email_sync(service_request.id, language)
-                
-                notification_type = 'urgent_request' if service_request.priority in ['high', 'urgent'] else 'new_request'
-                send_admin_notification_email_sync(service_request.id, notification_type)
-            else:
-                # Send emails asynchronously (when Redis/Celery available)
-                send_request_confirmation_email.delay(service_request.id, language)
+        # The request and its emails are committed together; the outbox
+        # worker sends the emails outside this request
+        with transaction.atomic():
+            # Set default values for admin fields
+            service_request = serializer.save(
+                status='pending',
+                priority='normal'
+            )
+            
+            try:
+                enqueue_email('request_confirmation', service_request.id, language=language)
                 
                 notification_type = 'urgent_request' if service_request.priority in ['high', 'urgent'] else 'new_request'
-                send_admin_notification_email.delay(service_request.id, notification_type)
-        except Exception as e:
-            # Log error but don't fail the request creation
-            print(f"Failed to send email notifications for request {service_request.id}: {e}")
+                enqueue_email('admin_notification', service_request.id, notification_type=notification_type)
+            except Exception as e:
+                # Log error but don't fail the request creation
+                print(f"Failed to queue email notifications for request {service_request.id}: {e}")
         
         # Return success response without sensitive data
         return Response({
@@ -0,0 +1,86 @@
+"""
+Cached registry of staff notification recipients.
+
+Admin notifications fan out to every active staff member with an email
+address. The list, joined with each person's ``StaffNotificationPreference``,
+is cached and only rebuilt after a User or preference is saved or deleted
+(see ``signals``), so sending a notification needs no user queries.
+"""
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+CACHE_KEY = 'staff_recipients'
+# Safety net for changes that bypass signals, e.g. queryset.update()
+CACHE_TIMEOUT = 60 * 60
+
+StaffRecipient = namedtuple('StaffRecipient', 'user_id email name delivery notification_types language')
+
+
+def load_staff_recipients():
+    """Query active staff with an email address and their preferences."""
+    staff = User.objects.filter(is_staff=True, is_active=True).exclude(email='').order_by('id').values_list(
+        'id', 'email', 'first_name', 'username',
+        'notification_preference__delivery',
+        'notification_preference__notification_types',
+        'notification_preference__language',
+    )
+    return [
+        StaffRecipient(
+            user_id=user_id,
+            email=email,
+            name=first_name or username,
+            delivery=delivery or 'immediate',
+            notification_types=tuple(notification_types or ()),
+            language=language or 'en',
+        )
+        for user_id, email, first_name, username, delivery, notification_types, language in staff
+    ]
+
+
+def get_staff_recipients(notification_type=None):
+    """
+    Get the staff notification recipients.
+
+    Args:
+        notification_type (str): Only return staff who receive this type
+
+    Returns:
+        List of ``StaffRecipient``
+    """
+    recipients = cache.get(CACHE_KEY)
+    if recipients is None:
+        recipients = load_staff_recipients()
+        cache.set(CACHE_KEY, recipients, CACHE_TIMEOUT)
+    if notification_type is None:
+        return recipients
+    return [
+        recipient for recipient in recipients
+        if not recipient.notification_types or notification_type in recipient.notification_types
+    ]
+
+
+def split_by_delivery(recipients):
+    """
+    Split recipients by delivery preference.
+
+    Returns:
+        Tuple of (immediate, digest) lists
+    """
+    immediate = [recipient for recipient in recipients if recipient.delivery != 'digest']
+    digest = [recipient for recipient in recipients if recipient.delivery == 'digest']
+    return immediate, digest
+
+
+def group_emails_by_language(recipients):
+    """Map each language to the email addresses of the recipients reading it."""
+    emails = {}
+    for recipient in recipients:
+        emails.setdefault(recipient.language, []).append(recipient.email)
+    return emails
+
+
+def invalidate_staff_recipients():
+    """Drop the cached registry; the next lookup reloads it."""
+    cache.delete(CACHE_KEY)
@@ -3,7 +3,8 @@ Serializers for service_requests app.
 """
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import ServiceRequest
+from .models import ServiceRequest, EmailNotification, StaffNotificationPreference
+from apps.common.search import SearchSnippetMixin
 from apps.services.serializers import ServiceSerializer
 
 
@@ -169,10 +170,44 @@ class ServiceRequestPublicSerializer(serializers.ModelSerializer):
         return value
 
 
-class ServiceRequestAdminSerializer(ServiceRequestSerializer):
+class ServiceRequestAdminSerializer(SearchSnippetMixin, ServiceRequestSerializer):
     """Admin serializer for ServiceRequest with additional fields."""
     service = ServiceSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
     
     class Meta(ServiceRequestSerializer.Meta):
-        fields = ServiceRequestSerializer.Meta.fields
\ No newline at end of file
+        fields = ServiceRequestSerializer.Meta.fields
+
+
+class EmailNotificationSerializer(serializers.ModelSerializer):
+    """Serializer for tracked email notifications."""
+    project_title = serializers.ReadOnlyField(source='service_request.project_title')
+    email_type_display = serializers.ReadOnlyField(source='get_email_type_display')
+    status_display = serializers.ReadOnlyField(source='get_status_display')
+    
+    class Meta:
+        model = EmailNotification
+        fields = [
+            'id', 'service_request', 'project_title', 'email_type', 'email_type_display',
+            'recipient_email', 'language', 'status', 'status_display', 'subject',
+            'sent_at', 'error_message', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class StaffNotificationPreferenceSerializer(serializers.ModelSerializer):
+    """Serializer for a staff member's admin notification preferences."""
+    notification_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=StaffNotificationPreference.NOTIFICATION_TYPES),
+        required=False,
+        help_text="Notification types to receive; empty means all"
+    )
+    
+    class Meta:
+        model = StaffNotificationPreference
+        fields = ['delivery', 'notification_types', 'language', 'updated_at']
+        read_only_fields = ['updated_at']
+    
+    def validate_notification_types(self, value):
+        # Keep the stored list compact and in a stable order
+        return [key for key, label in StaffNotificationPreference.NOTIFICATION_TYPES if key in value]
@@ -1,26 +1,43 @@
 """
 Django signals for automatic email notifications.
+
+Old field values come from the snapshot ServiceRequest takes when it is
+loaded (see ``ServiceRequest.get_dirty_fields``), so no handler needs to
+re-read the row before the save. Emails are queued in the outbox and sent
+by the outbox worker. Admin alerts are deduplicated (see ``dedup``), so
+repeated saves of an overdue or urgent request send one alert per cooldown.
 """
-from django.db.models.signals import post_save, pre_save
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from .models import ServiceRequest
-from django.conf import settings
-from .tasks import send_status_update_email, send_admin_notification_email
-from .email_fallback import send_status_update_email_sync, send_admin_notification_email_sync
-
-
-@receiver(pre_save, sender=ServiceRequest)
-def capture_old_status(sender, instance, **kwargs):
-    """Capture the old status before saving to compare with new status."""
-    if instance.pk:
-        try:
-            old_instance = ServiceRequest.objects.get(pk=instance.pk)
-            instance._old_status = old_instance.status
-        except ServiceRequest.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+from .dedup import claim_notification
+from .models import ServiceRequest, StaffNotificationPreference, requests_bulk_updated
+from .outbox import enqueue_email, enqueue_emails
+from .recipients import invalidate_staff_recipients
+
+
+def notify_status_change(request_id, old_status, new_status):
+    """Queue a status update email for the client."""
+    try:
+        enqueue_email(
+            'status_update', request_id,
+            old_status=old_status, new_status=new_status, language='en'
+        )
+    except Exception as e:
+        # Log error but don't fail the save operation
+        print(f"Failed to send status update email for request {request_id}: {e}")
+
+
+def notify_admins(request_id, notification_type):
+    """Queue an admin notification about a request, unless it was sent within the cooldown."""
+    try:
+        # The claim commits or rolls back together with the outbox row
+        with transaction.atomic():
+            if claim_notification(request_id, notification_type):
+                enqueue_email('admin_notification', request_id, notification_type=notification_type)
+    except Exception as e:
+        print(f"Failed to send {notification_type} notification for request {request_id}: {e}")
 
 
 @receiver(post_save, sender=ServiceRequest)
@@ -31,22 +48,12 @@ def send_automatic_notifications(sender, instance, created, **kwargs):
     if created:
         # New request created - admin notification is handled in the view
         # to include language preference from the request
-        pass
-    else:
-        # Request updated - check if status changed
-        old_status = getattr(instance, '_old_status', None)
-        if old_status and old_status != instance.status:
-            # Status changed - send notification to client
-            try:
-                if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
-                    # Send email synchronously (for free tier deployment)
-                    send_status_update_email_sync(instance.id, old_status, instance.status, 'en')
-                else:
-                    # Send email asynchronously (when Redis/Celery available)
-                    send_status_update_email.delay(instance.id, old_status, instance.status, 'en')
-            except Exception as e:
-                # Log error but don't fail the save operation
-                print(f"Failed to send status update email for request {instance.id}: {e}")
+        return
+
+    # Request updated - check if status changed
+    old_status = instance.get_dirty_fields().get('status')
+    if old_status:
+        notify_status_change(instance.id, old_status, instance.status)
 
 
 @receiver(post_save, sender=ServiceRequest)
@@ -54,39 +61,50 @@ def check_urgent_notifications(sender, instance, created, **kwargs):
     """
     Check for urgent notifications that need to be sent.
     """
-    if not created:
-        # Check if request became overdue
-        if instance.is_overdue and instance.status in ['pending', 'in_progress']:
-            # Send overdue notification to admin
-            try:
-                if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
-                    send_admin_notification_email_sync(instance.id, 'overdue_request')
-                else:
-                    send_admin_notification_email.delay(instance.id, 'overdue_request')
-            except Exception as e:
-                print(f"Failed to send overdue notification for request {instance.id}: {e}")
-        
-        # Check if priority was changed to urgent
-        old_priority = getattr(instance, '_old_priority', None)
-        if old_priority and old_priority != 'urgent' and instance.priority == 'urgent':
-            # Send urgent notification to admin
-            try:
-                if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', True):
-                    send_admin_notification_email_sync(instance.id, 'urgent_request')
-                else:
-                    send_admin_notification_email.delay(instance.id, 'urgent_request')
-            except Exception as e:
-                print(f"Failed to send urgent notification for request {instance.id}: {e}")
-
-
-@receiver(pre_save, sender=ServiceRequest)
-def capture_old_priority(sender, instance, **kwargs):
-    """Capture the old priority before saving to compare with new priority."""
-    if instance.pk:
-        try:
-            old_instance = ServiceRequest.objects.get(pk=instance.pk)
-            instance._old_priority = old_instance.priority
-        except ServiceRequest.DoesNotExist:
-            instance._old_priority = None
-    else:
-        instance._old_priority = None
\ No newline at end of file
+    if created:
+        return
+
+    # Check if request became overdue
+    if instance.is_overdue:
+        notify_admins(instance.id, 'overdue_request')
+
+    # Check if priority was changed to urgent
+    old_priority = instance.get_dirty_fields().get('priority')
+    if old_priority and instance.priority == 'urgent':
+        notify_admins(instance.id, 'urgent_request')
+
+
+@receiver(requests_bulk_updated, sender=ServiceRequest)
+def send_bulk_notifications(sender, changes, job_id='', **kwargs):
+    """
+    Send the status and urgent-priority notifications for a bulk update.
+    
+    The status update emails are queued with one INSERT under ``job_id`` and
+    sent in batches by the outbox worker.
+    """
+    status_updates = []
+    for request_id, changed in changes.items():
+        if 'status' in changed:
+            old_status, new_status = changed['status']
+            status_updates.append(
+                (request_id, {'old_status': old_status, 'new_status': new_status, 'language': 'en'})
+            )
+        if 'priority' in changed and changed['priority'][1] == 'urgent':
+            notify_admins(request_id, 'urgent_request')
+    
+    try:
+        enqueue_emails('status_update', status_updates, job_id=job_id)
+    except Exception as e:
+        print(f"Failed to queue {len(status_updates)} status update emails: {e}")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=StaffNotificationPreference)
+@receiver(post_delete, sender=StaffNotificationPreference)
+def refresh_staff_recipients(sender, update_fields=None, **kwargs):
+    """Rebuild the cached staff recipient registry after staff changes."""
+    # Logging in only touches last_login, which the registry doesn't hold
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_staff_recipients()
@@ -2,8 +2,9 @@
 Celery tasks for service request email notifications.
 """
 from celery import shared_task
-from django.contrib.auth.models import User
 from .models import ServiceRequest
+from .digests import queue_digest_items
+from .email_fallback import build_admin_notification_emails, get_status_update_context
 from .email_service import email_service
 
 
@@ -36,7 +37,12 @@ def send_request_confirmation_email(self, request_id, language='en'):
             template_type='request_confirmation',
             language=language,
             context=context,
-            recipient_list=[service_request.client_email]
+            recipient_list=[service_request.client_email],
+            tracking={
+                'service_request': service_request,
+                'email_type': 'confirmation',
+                'celery_task_id': self.request.id,
+            }
         )
         
         return f"Confirmation email sent to {service_request.client_email}"
@@ -62,25 +68,17 @@ def send_status_update_email(self, request_id, old_status, new_status, language=
     try:
         service_request = ServiceRequest.objects.select_related('service').get(id=request_id)
         
-        # Get status display names
-        status_display = dict(ServiceRequest.STATUS_CHOICES)
-        
-        # Prepare context for email template
-        context = {
-            'client_name': service_request.client_name,
-            'service_name': service_request.service.title,
-            'project_title': service_request.project_title,
-            'request_id': service_request.id,
-            'old_status': status_display.get(old_status, old_status),
-            'new_status': status_display.get(new_status, new_status),
-        }
-        
         # Send email using the email service
         email_service.send_email(
             template_type='status_update',
             language=language,
-            context=context,
-            recipient_list=[service_request.client_email]
+            context=get_status_update_context(service_request, old_status, new_status),
+            recipient_list=[service_request.client_email],
+            tracking={
+                'service_request': service_request,
+                'email_type': 'status_update',
+                'celery_task_id': self.request.id,
+            }
         )
         
         return f"Status update email sent to {service_request.client_email}"
@@ -104,37 +102,23 @@ def send_admin_notification_email(self, request_id, notification_type='new_reque
     try:
         service_request = ServiceRequest.objects.select_related('service').get(id=request_id)
         
-        # Get admin users (staff users)
-        admin_emails = list(User.objects.filter(is_staff=True, is_active=True).values_list('email', flat=True))
-        admin_emails = [email for email in admin_emails if email]  # Filter out empty emails
+        # Recipients come from the cached staff registry; staff who chose
+        # digest delivery get this in their next digest
+        emails, digest = build_admin_notification_emails(
+            [(service_request, notification_type)], celery_task_id=self.request.id
+        )
+        if digest and not self.request.retries:
+            queue_digest_items(digest)
         
-        if not admin_emails:
-            return "No admin emails found"
+        if not emails:
+            return "Admin notification queued for digest" if digest else "No admin emails found"
         
-        # Prepare context for email template
-        context = {
-            'client_name': service_request.client_name,
-            'client_email': service_request.client_email,
-            'client_phone': service_request.client_phone or 'Not provided',
-            'service_name': service_request.service.title,
-            'project_title': service_request.project_title,
-            'project_description': service_request.project_description,
-            'priority': service_request.get_priority_display(),
-            'deadline': service_request.deadline.strftime('%Y-%m-%d'),
-            'budget': service_request.budget,
-            'request_id': service_request.id,
-            'created_at': service_request.created_at.strftime('%Y-%m-%d %H:%M'),
-        }
-        
-        # Send email using the email service (admin emails are always in English)
-        email_service.send_email(
-            template_type='admin_notification',
-            language='en',
-            context=context,
-            recipient_list=admin_emails,
-            notification_type=notification_type
-        )
+        # One email per recipient language
+        for email in emails:
+            email.pop('notification')
+            email_service.send_email(**email)
         
+        admin_emails = [address for email in emails for address in email['recipient_list']]
         return f"Admin notification sent to {len(admin_emails)} recipients"
         
     except ServiceRequest.DoesNotExist:
@@ -144,32 +128,44 @@ def send_admin_notification_email(self, request_id, notification_type='new_reque
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
+@shared_task
+def process_email_outbox(batch_size=50):
+    """
+    Send the emails waiting in the outbox.
+    Triggered after each commit that queues an email, and scheduled every
+    minute via Celery Beat to pick up retries and expired leases.
+    """
+    from .outbox import process_outbox
+    
+    sent, failed = process_outbox(batch_size=batch_size)
+    return f"Sent {sent} outbox emails, {failed} failed"
+
+
 @shared_task
 def send_daily_overdue_notifications():
     """
     Daily task to send notifications about overdue requests.
     This task should be scheduled to run daily via Celery Beat.
     """
-    from django.utils import timezone
+    from .digests import send_overdue_summaries
     
-    # Get overdue requests
-    overdue_requests = ServiceRequest.objects.filter(
-        deadline__lt=timezone.now().date(),
-        status__in=['pending', 'in_progress']
-    ).select_related('service')
+    # One summary per staff member, built from a single overdue query
+    summaries_sent = send_overdue_summaries()
     
-    notifications_sent = 0
-    
-    for request in overdue_requests:
-        try:
-            # Send admin notification for overdue request
-            send_admin_notification_email.delay(request.id, 'overdue_request')
-            notifications_sent += 1
-        except Exception as e:
-            # Log error but continue with other requests
-            print(f"Failed to send overdue notification for request {request.id}: {e}")
+    return f"Sent {summaries_sent} overdue summaries"
+
+
+@shared_task
+def send_admin_digests():
+    """
+    Send the pending admin notification digests.
+    Scheduled every ADMIN_DIGEST_WINDOW_MINUTES via Celery Beat; without
+    Beat, run ``python manage.py send_admin_digests`` from cron instead.
+    """
+    from .digests import send_admin_digests as send_digests
     
-    return f"Sent {notifications_sent} overdue notifications"
+    digests_sent = send_digests()
+    return f"Sent {digests_sent} admin digests"
 
 
 @shared_task
@@ -1,3 +1,1061 @@
-from django.test import TestCase
+import csv
+import json
+import socket
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
\ No newline at end of file
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.services.models import ServiceCategory, Service
+from .models import (
+    ServiceRequest, EmailOutbox, AdminDigestItem, StaffNotificationPreference, EmailNotification,
+    NotificationClaim,
+)
+
+
+class ServiceRequestTestMixin:
+    """Shared fixtures for service request tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.category = ServiceCategory.objects.create(name='Writing', description='Writing services')
+        cls.service = Service.objects.create(
+            category=cls.category, title='Essay', description='Essay writing',
+            short_description='Essays', price_range='$50', delivery_time='3 days'
+        )
+
+    @classmethod
+    def make_request(cls, status='pending', deadline=None, **kwargs):
+        fields = dict(
+            service=cls.service, client_name='Client', client_email='client@example.com',
+            project_title='Project', project_description='Description',
+            deadline=deadline or timezone.localdate() + timedelta(days=7),
+            budget='$100', status=status,
+        )
+        fields.update(kwargs)
+        return ServiceRequest.objects.create(**fields)
+
+    def setUp(self):
+        # The staff recipient registry outlives each test's rolled back users
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class ServiceRequestQuerySetTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the SQL-level request state filters."""
+
+    def setUp(self):
+        super().setUp()
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.overdue = self.make_request('in_progress', yesterday)
+        self.on_time = self.make_request('pending')
+        self.finished = self.make_request('completed', yesterday)
+
+    def test_overdue_matches_property(self):
+        for request in ServiceRequest.objects.annotate_overdue():
+            self.assertEqual(request.overdue, request.is_overdue)
+        self.assertQuerysetEqual(ServiceRequest.objects.overdue(), [self.overdue])
+        self.assertEqual(ServiceRequest.objects.active().count(), 2)
+
+    def test_overdue_endpoint_is_paginated(self):
+        response = self.client.get('/api/requests/admin/requests/overdue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.overdue.id)
+
+
+class IndexUsageTests(ServiceRequestTestMixin, TestCase):
+    """EXPLAIN-based checks that the hot admin/dashboard queries use the indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        from apps.contact.models import ContactInquiry
+        from .models import EmailNotification
+
+        cls.staff = staff = [
+            User.objects.create_user(f'staff{i}', f'staff{i}@example.com', 'pass', is_staff=True)
+            for i in range(10)
+        ]
+        past = timezone.localdate() - timedelta(days=30)
+        statuses = ['completed'] * 37 + ['cancelled', 'pending', 'in_progress']
+        priorities = ['normal'] * 7 + ['low', 'high', 'urgent']
+        ServiceRequest.objects.bulk_create([
+            ServiceRequest(
+                service=cls.service, client_name='Client', client_email='client@example.com',
+                project_title='Project', project_description='Description', budget='$100',
+                deadline=past + timedelta(days=i % 60), status=statuses[i % len(statuses)],
+                priority=priorities[i % len(priorities)], assigned_to=staff[i % len(staff)],
+            )
+            for i in range(400)
+        ])
+        ContactInquiry.objects.bulk_create([
+            ContactInquiry(
+                name='Sam', email='sam@example.com', subject='Hi', message='Hello',
+                is_read=i % 20 != 0, is_responded=i % 20 > 1,
+            )
+            for i in range(400)
+        ])
+        request = ServiceRequest.objects.first()
+        EmailNotification.objects.bulk_create([
+            EmailNotification(
+                service_request=request, email_type='confirmation', recipient_email='a@example.com',
+                subject='Subject', status='failed' if i % 25 == 0 else 'sent', celery_task_id=f'task-{i}',
+            )
+            for i in range(400)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor == 'postgresql':
+            # The fixture tables are tiny, so make the planner show its index choice
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f'{index_name} not used:\n{plan}')
+
+    def test_request_list_filters(self):
+        requests = ServiceRequest.objects.all()
+        self.assertUsesIndex(requests.order_by('-created_at')[:20], 'sr_created_idx')
+        self.assertUsesIndex(
+            requests.filter(status='pending').order_by('-created_at')[:20], 'sr_status_created_idx'
+        )
+        self.assertUsesIndex(
+            requests.filter(priority='urgent').order_by('-created_at')[:20], 'sr_priority_created_idx'
+        )
+        self.assertUsesIndex(
+            requests.filter(assigned_to=self.staff[0], status='pending').order_by(), 'sr_assignee_status_idx'
+        )
+        self.assertUsesIndex(
+            requests.filter(created_at__gte=timezone.now() - timedelta(days=7)), 'sr_created_idx'
+        )
+
+    def test_overdue_count(self):
+        # SQLite cannot match the partial index predicate against bound
+        # parameters, so in development the status prefix index is used.
+        if connection.vendor == 'postgresql':
+            expected = 'sr_active_deadline_idx'
+        else:
+            expected = 'sr_status_created_idx'
+        self.assertUsesIndex(ServiceRequest.objects.overdue().order_by(), expected)
+
+    def test_inquiry_and_email_filters(self):
+        from apps.contact.models import ContactInquiry
+        from .models import EmailNotification
+
+        self.assertUsesIndex(
+            ContactInquiry.objects.filter(is_read=False).order_by('-created_at')[:20], 'inquiry_unread_idx'
+        )
+        self.assertUsesIndex(
+            ContactInquiry.objects.filter(is_responded=False).order_by('-created_at')[:20], 'inquiry_pending_idx'
+        )
+        self.assertUsesIndex(
+            EmailNotification.objects.filter(status='failed').order_by('-created_at')[:20],
+            'email_status_created_idx'
+        )
+        self.assertUsesIndex(EmailNotification.objects.filter(celery_task_id='task-7'), 'email_task_idx')
+
+
+class AdminPaginationTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the cursor and count-free pagination modes."""
+
+    url = '/api/requests/admin/requests/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(45):
+            cls.make_request('completed' if i % 3 == 0 else 'pending')
+        # Give half the rows the same timestamp so the id tie-breaker matters
+        same_time = timezone.now() - timedelta(days=1)
+        ids = ServiceRequest.objects.order_by('id').values_list('id', flat=True)[:22]
+        ServiceRequest.objects.filter(id__in=list(ids)).update(created_at=same_time)
+
+    def walk(self, params):
+        ids, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, params if not pages else None)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url, pages = response.data['next'], pages + 1
+        return ids, pages
+
+    def test_cursor_walk_is_complete_and_stable(self):
+        ids, pages = self.walk({'pagination': 'cursor'})
+        expected = list(ServiceRequest.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+        ids, _ = self.walk({'pagination': 'cursor', 'status': 'pending', 'ordering': 'created_at'})
+        expected = ServiceRequest.objects.filter(status='pending').order_by('created_at', 'id')
+        self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+
+    def test_cursor_previous_link(self):
+        first = self.client.get(self.url, {'pagination': 'cursor'}).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], [row['id'] for row in first['results']])
+        self.assertIsNone(back['previous'])
+
+    def test_cursor_rejects_other_ordering_and_bad_cursor(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'ordering': 'deadline'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_count_can_be_skipped(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 45)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'count': 'false', 'page': 3})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+
+@mock.patch('apps.service_requests.signals.notify_admins')
+@mock.patch('apps.service_requests.signals.notify_status_change')
+class ChangeTrackingTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the from_db snapshot used by the notification signals."""
+
+    def test_save_reports_changes_without_reloading(self, notify_status_change, notify_admins):
+        request = ServiceRequest.objects.get(pk=self.make_request().pk)
+        self.assertEqual(request.get_dirty_fields(), {})
+
+        request.status = 'in_progress'
+        request.priority = 'urgent'
+        self.assertEqual(request.get_dirty_fields(), {'status': 'pending', 'priority': 'normal'})
+
+        with CaptureQueriesContext(connection) as queries:
+            request.save()
+        table = ServiceRequest._meta.db_table
+        reloads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(f'SELECT "{table}"."id"') and f'"{table}"."id" = ' in query['sql']
+        ]
+        self.assertEqual(reloads, [])
+        notify_status_change.assert_called_once_with(request.id, 'pending', 'in_progress')
+        notify_admins.assert_called_once_with(request.id, 'urgent_request')
+
+        # Saving again without changes sends nothing new
+        self.assertEqual(request.get_dirty_fields(), {})
+        request.save()
+        self.assertEqual(notify_status_change.call_count, 1)
+
+    def test_bulk_update_reports_per_row_changes(self, notify_status_change, notify_admins):
+        pending = [self.make_request() for _ in range(3)]
+        done = self.make_request('completed')
+        ids = [r.id for r in pending] + [done.id]
+
+        # Savepoint, SELECT of the original values, UPDATE, the outbox
+        # INSERT in its own savepoint and release: the same for any number
+        # of rows
+        with self.assertNumQueries(7):
+            updated = ServiceRequest.objects.filter(id__in=ids).update_tracked(status='completed')
+        self.assertEqual(updated, 4)
+        self.assertEqual(
+            sorted(
+                (entry.service_request_id, entry.payload['old_status'], entry.payload['new_status'])
+                for entry in EmailOutbox.objects.filter(kind='status_update')
+            ),
+            [(r.id, 'pending', 'completed') for r in pending]
+        )
+        notify_status_change.assert_not_called()
+
+        with override_settings(DASHBOARD_USE_DAILY_METRICS=True), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                '/api/requests/admin/requests/bulk_update_status/',
+                {'request_ids': ids, 'status': 'pending'}, format='json'
+            )
+        self.assertEqual(response.data['updated_count'], 4)
+        self.assertEqual(EmailOutbox.objects.filter(kind='status_update').count(), 7)
+
+        from apps.dashboard.models import DailyMetrics
+        rollup = DailyMetrics.objects.get(source='service_request', status='pending')
+        self.assertEqual(rollup.count, 4)
+
+
+class EmailOutboxTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the transactional email outbox."""
+
+    def submit(self):
+        return APIClient().post('/api/requests/public/requests/', {
+            'service': self.service.id, 'client_name': 'Client', 'client_email': 'client@example.com',
+            'project_title': 'A project', 'project_description': 'A long enough project description',
+            'deadline': (timezone.localdate() + timedelta(days=10)).isoformat(), 'budget': '$100',
+        }, format='json', HTTP_ACCEPT_LANGUAGE='ar')
+
+    def test_submission_queues_instead_of_sending(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        entries = EmailOutbox.objects.order_by('id')
+        self.assertEqual(
+            [(entry.kind, entry.payload) for entry in entries],
+            [('request_confirmation', {'language': 'ar'}),
+             ('admin_notification', {'notification_type': 'new_request'})]
+        )
+
+        call_command('process_email_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(set(EmailOutbox.objects.values_list('status', flat=True)), {'sent'})
+
+    def test_status_change_queues_one_email(self):
+        request = self.make_request()
+        response = self.client.patch(
+            f'/api/requests/admin/requests/{request.id}/update_status/', {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        entry = EmailOutbox.objects.get()
+        self.assertEqual(entry.kind, 'status_update')
+        self.assertEqual(entry.payload['new_status'], 'completed')
+
+    def test_failures_are_retried_and_leases_expire(self):
+        from .outbox import process_outbox
+
+        request = self.make_request()
+        failing = EmailOutbox.objects.create(kind='status_update', service_request=request, payload={
+            'old_status': 'pending', 'language': 'en',
+        })
+        self.assertEqual(process_outbox(), (0, 1))
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('pending', 1))
+        self.assertGreater(failing.available_at, timezone.now())
+        self.assertIn('new_status', failing.last_error)
+
+        # A worker died mid-send: the row is picked up again after its lease
+        stuck = EmailOutbox.objects.create(
+            kind='admin_notification', service_request=request, payload={'notification_type': 'new_request'},
+            status='sending', locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(process_outbox(), (1, 0))
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, 'sent')
+
+
+class PooledEmailDeliveryTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the pooled SMTP connection and batched sending."""
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+        close_pooled_connection()
+        self.addCleanup(close_pooled_connection)
+
+    def message(self, to='client@example.com'):
+        return mail.EmailMessage('Subject', 'Body', 'noreply@example.com', [to])
+
+    def test_batch_reuses_one_connection(self):
+        from . import email_delivery
+
+        with mock.patch.object(email_delivery, 'get_connection', wraps=email_delivery.get_connection) as opened:
+            results = email_delivery.send_many([self.message() for _ in range(3)])
+            email_delivery.send_many([self.message()])
+        self.assertEqual(results, [(True, None)] * 3)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(opened.call_count, 1)
+
+    def test_reconnects_when_the_server_drops_the_connection(self):
+        import smtplib
+        from . import email_delivery
+
+        dropped, fresh = mock.Mock(), mock.Mock()
+        dropped.send_messages.side_effect = smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        fresh.send_messages.side_effect = [
+            1, smtplib.SMTPRecipientsRefused({'bad@example.com': (550, b'No such user')}), 1,
+        ]
+        with mock.patch.object(email_delivery, 'get_connection', side_effect=[dropped, fresh]) as opened:
+            results = email_delivery.send_many([
+                self.message(), self.message('bad@example.com'), self.message(),
+            ])
+
+        # The dropped connection is replaced once; a refused recipient is not a
+        # connection problem and only fails its own message
+        self.assertEqual([sent for sent, error in results], [True, False, True])
+        self.assertIsInstance(results[1][1], smtplib.SMTPRecipientsRefused)
+        self.assertEqual(opened.call_count, 2)
+        dropped.close.assert_called_once()
+
+    def test_daily_command_batches_unassigned_notifications(self):
+        from . import email_delivery
+
+        self.make_request(priority='urgent')
+        self.make_request(priority='high')
+
+        with mock.patch.object(email_delivery, 'get_connection', wraps=email_delivery.get_connection) as opened:
+            call_command('send_daily_notifications', '--skip-overdue', '--skip-cleanup', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['admin@example.com'])
+        self.assertEqual(opened.call_count, 1)
+
+
+class EmailRenderingTests(TestCase):
+    """Tests for the compiled email templates."""
+
+    def setUp(self):
+        from .email_service import EmailTemplateService
+        self.service = EmailTemplateService()
+
+    def test_renders_shell_text_and_status_message(self):
+        subject, text, html = self.service.render_email('status_update', 'ar', {
+            'client_name': 'A & B', 'project_title': '<Thesis>', 'request_id': 7,
+            'old_status': 'Pending', 'new_status': 'Completed',
+        })
+        self.assertEqual(subject, 'تحديث طلب الخدمة - <Thesis>')
+        self.assertIn('<html dir="rtl" lang="ar">', html)
+        self.assertIn('.email-container {', html)
+        self.assertIn('A &amp; B', html)
+        self.assertIn('&lt;Thesis&gt;', html)
+        self.assertIn('<strong>ممتاز!</strong>', html)
+        self.assertIn('ممتاز! تم إنجاز مشروعك بنجاح.', text)
+        self.assertIn('فريق خدمات الطلاب\n\n', text)
+        self.assertNotIn('<', text.replace('<Thesis>', ''))
+
+    def test_templates_compile_once_and_renders_are_memoized(self):
+        context = {'project_title': 'Project', 'request_id': 1}
+        with mock.patch.object(self.service, 'get_email_templates', wraps=self.service.get_email_templates) as load:
+            first = self.service.render_email('admin_notification', 'en', context, 'urgent_request')
+            self.service.render_email('admin_notification', 'en', dict(context, request_id=2), 'urgent_request')
+            again = self.service.render_email('admin_notification', 'en', dict(context), 'urgent_request')
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(again, first)
+        self.assertIn('URGENT REQUEST', first[1])
+        info = self.service._render_cached.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+
+class AdminDigestTests(ServiceRequestTestMixin, TestCase):
+    """Tests for digest delivery of admin notifications."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.digest_staff = User.objects.create_user(
+            'digest', 'digest@example.com', 'pass', is_staff=True, first_name='Dana'
+        )
+        StaffNotificationPreference.objects.create(user=cls.digest_staff, delivery='digest')
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+        close_pooled_connection()
+
+    def test_preference_endpoint(self):
+        url = '/api/requests/admin/users/notification_preference/'
+        self.assertEqual(self.client.get(url).data['delivery'], 'immediate')
+        self.assertEqual(self.client.patch(url, {'delivery': 'bogus'}, format='json').status_code, 400)
+        response = self.client.patch(url, {'delivery': 'digest'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.admin.notification_preference.delivery, 'digest')
+
+    def test_digest_staff_get_one_grouped_email(self):
+        from .digests import send_admin_digests
+        from .email_fallback import send_admin_notification_email_sync
+
+        first, second = self.make_request(), self.make_request(priority='urgent')
+        self.assertTrue(send_admin_notification_email_sync(first.id, 'new_request'))
+        self.assertTrue(send_admin_notification_email_sync(second.id, 'urgent_request'))
+        self.assertEqual([email.to for email in mail.outbox], [['admin@example.com']] * 2)
+        self.assertEqual(AdminDigestItem.objects.filter(sent_at__isnull=True).count(), 2)
+
+        mail.outbox.clear()
+        self.assertEqual(send_admin_digests(), 1)
+        digest = mail.outbox[0]
+        self.assertEqual(digest.to, ['digest@example.com'])
+        self.assertEqual(digest.subject, 'Admin Digest: 2 new notifications')
+        self.assertIn('Hello Dana,', digest.body)
+        self.assertLess(digest.body.index('Urgent requests (1)'), digest.body.index('New requests (1)'))
+        self.assertFalse(AdminDigestItem.objects.filter(sent_at__isnull=True).exists())
+
+        # Digests follow the recipient's language
+        from .recipients import invalidate_staff_recipients
+        StaffNotificationPreference.objects.filter(user=self.digest_staff).update(language='ar')
+        invalidate_staff_recipients()
+        self.assertTrue(send_admin_notification_email_sync(first.id, 'new_request'))
+        mail.outbox.clear()
+        self.assertEqual(send_admin_digests(), 1)
+        self.assertEqual(mail.outbox[0].subject, 'ملخص الإشعارات: 1 إشعارات جديدة')
+        self.assertIn('طلبات جديدة (1)', mail.outbox[0].body)
+
+        out = StringIO()
+        call_command('send_admin_digests', stdout=out)
+        self.assertIn('Sent 0 admin digests', out.getvalue())
+
+    def test_failed_digest_is_retried_for_that_recipient_only(self):
+        from . import digests
+        from .email_fallback import send_admin_notification_email_sync
+
+        other = User.objects.create_user('other', 'other@example.com', 'pass', is_staff=True)
+        StaffNotificationPreference.objects.create(user=other, delivery='digest')
+        self.assertTrue(send_admin_notification_email_sync(self.make_request().id, 'new_request'))
+        mail.outbox.clear()
+
+        # Staff are in id order: Dana's digest goes out, the other one fails
+        with mock.patch.object(digests.email_service, 'send_many', return_value=[True, False]):
+            self.assertEqual(digests.send_admin_digests(), 1)
+        self.assertTrue(AdminDigestItem.objects.filter(sent_at__isnull=True).exists())
+
+        mail.outbox.clear()
+        self.assertEqual(digests.send_admin_digests(), 1)
+        self.assertEqual([email.to for email in mail.outbox], [['other@example.com']])
+        self.assertFalse(AdminDigestItem.objects.filter(sent_at__isnull=True).exists())
+
+    def test_overdue_run_sends_one_summary_per_staff_member(self):
+        from . import email_delivery
+        from .tasks import send_daily_overdue_notifications
+
+        past = timezone.localdate() - timedelta(days=1)
+        mine = self.make_request(deadline=past, assigned_to=self.digest_staff)
+        unassigned = self.make_request(deadline=past)
+        self.make_request(deadline=past, status='completed')
+
+        with mock.patch.object(email_delivery, 'get_connection', wraps=email_delivery.get_connection) as opened:
+            with self.assertNumQueries(4):  # staff + overdue requests + read and write the claims
+                result = send_daily_overdue_notifications()
+        self.assertEqual(result, 'Sent 2 overdue summaries')
+        self.assertEqual(opened.call_count, 1)
+
+        summaries = {email.to[0]: email for email in mail.outbox}
+        self.assertEqual(summaries['admin@example.com'].subject, 'Overdue Requests: 1 need attention')
+        self.assertNotIn(f'#{mine.id} ', summaries['admin@example.com'].body)
+        self.assertIn(f'#{unassigned.id} ', summaries['admin@example.com'].body)
+        self.assertIn(f'#{mine.id} ', summaries['digest@example.com'].body)
+        self.assertIn(f'#{unassigned.id} ', summaries['digest@example.com'].body)
+
+
+class EmailTrackingTests(ServiceRequestTestMixin, TestCase):
+    """Tests for batched EmailNotification tracking."""
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+        close_pooled_connection()
+
+    def test_fan_out_is_tracked_with_one_insert_and_one_update(self):
+        from .email_fallback import send_admin_notifications_sync
+
+        for name in ('staff1', 'staff2'):
+            User.objects.create_user(name, f'{name}@example.com', 'pass', is_staff=True)
+        urgent, new = self.make_request(priority='urgent'), self.make_request()
+
+        with self.assertNumQueries(3):  # staff, bulk insert, bulk update
+            sent = send_admin_notifications_sync([(urgent, 'urgent_request'), (new, 'new_request')])
+        self.assertEqual(sent, 2)
+
+        notifications = EmailNotification.objects.order_by('id')
+        self.assertEqual(len(notifications), 6)
+        self.assertEqual(
+            {(n.service_request_id, n.email_type) for n in notifications},
+            {(urgent.id, 'urgent_alert'), (new.id, 'admin_notification')}
+        )
+        self.assertTrue(all(n.status == 'sent' and n.sent_at for n in notifications))
+
+    def test_failed_send_is_recorded(self):
+        from .email_fallback import send_request_confirmation_email_sync
+
+        request = self.make_request()
+        with mock.patch('apps.service_requests.email_service.send_many', return_value=[(False, OSError('down'))]):
+            self.assertFalse(send_request_confirmation_email_sync(request.id))
+        notification = EmailNotification.objects.get()
+        self.assertEqual((notification.email_type, notification.status), ('confirmation', 'failed'))
+        self.assertEqual(notification.error_message, 'down')
+
+    def test_buffered_task_updates_flush_in_two_queries(self):
+        from .email_tracking import EmailStatusBuffer, track_email_notifications, update_email_status
+
+        request = self.make_request()
+        for task_id in ('task-1', 'task-2'):
+            track_email_notifications(request, 'admin_notification', ['a@example.com', 'b@example.com'],
+                                      celery_task_id=task_id)
+
+        with self.assertNumQueries(2):  # select by task id, bulk update
+            with EmailStatusBuffer() as buffer:
+                buffer.update_task('task-1', 'sent', sent_at=timezone.now())
+                buffer.update_task('task-2', 'failed', error_message='Mailbox full')
+        self.assertEqual(
+            sorted(EmailNotification.objects.values_list('celery_task_id', 'status')),
+            [('task-1', 'sent')] * 2 + [('task-2', 'failed')] * 2
+        )
+        self.assertEqual(update_email_status('task-2', 'bounced'), 2)
+
+
+class EmailStatsTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the email statistics endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        request = cls.make_request()
+        rows = [
+            ('confirmation', 'sent', 'en', 0), ('confirmation', 'failed', 'ar', 0),
+            ('status_update', 'sent', 'ar', 2), ('urgent_alert', 'queued', 'en', 2),
+            ('admin_notification', 'sent', 'en', 40),
+        ]
+        for email_type, status, language, age in rows:
+            notification = EmailNotification.objects.create(
+                service_request=request, email_type=email_type, recipient_email='a@example.com',
+                language=language, status=status, subject='Subject',
+            )
+            EmailNotification.objects.filter(pk=notification.pk).update(
+                created_at=timezone.now() - timedelta(days=age)
+            )
+
+
+    def test_stats_use_one_aggregate_and_one_grouped_query(self):
+        from .email_tracking import get_email_stats
+
+        with self.assertNumQueries(2):
+            stats = get_email_stats(days=7, daily=True)
+        self.assertEqual(
+            {key: stats[key] for key in ('total', 'sent', 'failed', 'queued', 'bounced')},
+            {'total': 4, 'sent': 2, 'failed': 1, 'queued': 1, 'bounced': 0}
+        )
+        self.assertEqual(stats['by_type']['confirmation'], 2)
+        self.assertEqual(stats['by_language'], {'en': 2, 'ar': 2})
+        self.assertEqual(len(stats['daily']), 8)
+        today, two_days_ago = stats['daily'][-1], stats['daily'][-3]
+        self.assertEqual(today['date'], timezone.localdate().isoformat())
+        self.assertEqual((today['total'], today['by_type']['confirmation']), (2, 2))
+        self.assertEqual(two_days_ago['by_type'], {
+            'confirmation': 0, 'status_update': 1, 'admin_notification': 0,
+            'overdue_alert': 0, 'urgent_alert': 1,
+        })
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_email_stats(days=None)['total'], 5)
+
+    def test_stats_endpoint_is_cached(self):
+        response = self.client.get('/api/requests/admin/email-notifications/stats/', {'days': 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(len(response.data['daily']), 8)
+
+        EmailNotification.objects.all().delete()
+        response = self.client.get('/api/requests/admin/email-notifications/stats/', {'days': 7})
+        self.assertEqual(response.data['total'], 4)
+
+    def test_recent_failures_loads_requests_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/requests/admin/email-notifications/recent_failures/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['project_title'], 'Project')
+
+
+class StaffRecipientRegistryTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the cached staff recipient registry."""
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+        close_pooled_connection()
+
+    def test_steady_state_fan_out_runs_no_user_queries(self):
+        from .email_fallback import send_admin_notifications_sync
+        from .recipients import get_staff_recipients
+
+        request = self.make_request()
+        get_staff_recipients()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(send_admin_notifications_sync([(request, 'new_request')]), 1)
+        self.assertFalse([q['sql'] for q in queries if 'auth_user' in q['sql']])
+        self.assertEqual(mail.outbox[0].to, ['admin@example.com'])
+
+    def test_registry_is_invalidated_by_user_changes(self):
+        from .recipients import CACHE_KEY, get_staff_recipients
+
+        self.assertEqual([r.email for r in get_staff_recipients()], ['admin@example.com'])
+        self.admin.last_login = timezone.now()
+        self.admin.save(update_fields=['last_login'])
+        self.assertIsNotNone(cache.get(CACHE_KEY))
+
+        new_staff = User.objects.create_user('new', 'new@example.com', 'pass', is_staff=True)
+        self.assertEqual(len(get_staff_recipients()), 2)
+        StaffNotificationPreference.objects.create(user=new_staff, delivery='digest', language='ar')
+        self.assertEqual(get_staff_recipients()[1][3:], ('digest', (), 'ar'))
+        new_staff.delete()
+        self.assertEqual(len(get_staff_recipients()), 1)
+
+    def test_preferences_filter_types_and_group_languages(self):
+        from .email_fallback import send_admin_notifications_sync
+
+        arabic = User.objects.create_user('arabic', 'ar@example.com', 'pass', is_staff=True)
+        StaffNotificationPreference.objects.create(user=arabic, language='ar')
+        urgent_only = User.objects.create_user('urgent', 'urgent@example.com', 'pass', is_staff=True)
+        StaffNotificationPreference.objects.create(user=urgent_only, notification_types=['urgent_request'])
+
+        send_admin_notifications_sync([(self.make_request(), 'new_request')])
+        self.assertEqual(sorted(email.to for email in mail.outbox), [['admin@example.com'], ['ar@example.com']])
+        arabic_email = next(email for email in mail.outbox if email.to == ['ar@example.com'])
+        self.assertTrue(arabic_email.subject.startswith('طلب خدمة جديد'))
+        self.assertIn('dir="rtl"', arabic_email.alternatives[0][0])
+
+        mail.outbox.clear()
+        send_admin_notifications_sync([(self.make_request(priority='urgent'), 'urgent_request')])
+        self.assertEqual(
+            sorted(email.to for email in mail.outbox),
+            [['admin@example.com', 'urgent@example.com'], ['ar@example.com']]
+        )
+
+    def test_preference_endpoint_validates_types(self):
+        url = '/api/requests/admin/users/notification_preference/'
+        response = self.client.patch(url, {'notification_types': ['bogus']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {
+            'notification_types': ['overdue_request', 'new_request', 'new_request'], 'language': 'ar',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['notification_types'], ['new_request', 'overdue_request'])
+        self.assertEqual(response.data['language'], 'ar')
+
+
+try:
+    import aiosmtpd.controller
+    import aiosmtplib
+except ImportError:
+    aiosmtpd = aiosmtplib = None
+
+
+@skipUnless(aiosmtpd and aiosmtplib, 'aiosmtpd and aiosmtplib are not installed')
+class AsyncEmailBackendTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the asyncio SMTP backend against a local aiosmtpd server."""
+
+    class Collector:
+        def __init__(self):
+            self.received = []
+
+        async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+            if address.startswith('bad@'):
+                return '550 No such user'
+            envelope.rcpt_tos.append(address)
+            return '250 OK'
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.append(envelope.rcpt_tos)
+            return '250 Message accepted for delivery'
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.handler = self.Collector()
+        controller = aiosmtpd.controller.Controller(self.handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        self.addCleanup(controller.stop)
+        settings = override_settings(
+            EMAIL_BACKEND='apps.service_requests.async_email.AsyncSMTPEmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=port,
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='', EMAIL_ASYNC_CONCURRENCY=3,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        close_pooled_connection()
+        self.addCleanup(close_pooled_connection)
+
+    def test_sends_batch_concurrently_with_per_message_outcomes(self):
+        from .async_email import AsyncSMTPEmailBackend
+
+        messages = [
+            mail.EmailMessage('Subject', 'Body', 'noreply@example.com', [f'user{i}@example.com'])
+            for i in range(7)
+        ] + [mail.EmailMessage('Subject', 'Body', 'noreply@example.com', ['bad@example.com'])]
+        results = AsyncSMTPEmailBackend().send_many(messages)
+
+        self.assertEqual([sent for sent, error in results], [True] * 7 + [False])
+        self.assertIsInstance(results[-1][1], aiosmtplib.SMTPRecipientsRefused)
+        self.assertEqual(len(self.handler.received), 7)
+        with self.assertRaises(aiosmtplib.SMTPRecipientsRefused):
+            AsyncSMTPEmailBackend().send_messages(messages[-1:])
+
+    def test_outcomes_are_recorded_on_email_notifications(self):
+        from .email_fallback import send_admin_notifications_sync
+
+        bad = User.objects.create_user('bad', 'bad@example.com', 'pass', is_staff=True)
+        StaffNotificationPreference.objects.create(user=bad, language='ar')
+        requests = [self.make_request() for _ in range(3)]
+        self.assertEqual(send_admin_notifications_sync([(request, 'new_request') for request in requests]), 3)
+
+        self.assertEqual(len(self.handler.received), 3)
+        self.assertEqual(
+            sorted(EmailNotification.objects.values_list('recipient_email', 'status')),
+            [('admin@example.com', 'sent')] * 3 + [('bad@example.com', 'failed')] * 3
+        )
+
+
+class NotificationDedupTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the admin notification idempotency ledger."""
+
+    def admin_alerts(self, notification_type):
+        return EmailOutbox.objects.filter(
+            kind='admin_notification', payload__notification_type=notification_type
+        ).count()
+
+    def test_repeated_saves_queue_one_overdue_alert(self):
+        request = self.make_request('in_progress', timezone.localdate() - timedelta(days=1))
+        for note in ('one', 'two', 'three'):
+            request.notes = note
+            request.save()
+        self.assertEqual(self.admin_alerts('overdue_request'), 1)
+
+        with override_settings(OVERDUE_NOTIFICATION_COOLDOWN_HOURS=0):
+            request.save()
+        self.assertEqual(self.admin_alerts('overdue_request'), 2)
+
+    def test_rolled_back_save_does_not_use_up_the_cooldown(self):
+        request = self.make_request('in_progress', timezone.localdate() - timedelta(days=1))
+        try:
+            with transaction.atomic():
+                request.save()
+                self.assertEqual(self.admin_alerts('overdue_request'), 1)
+                raise RuntimeError('rolled back')
+        except RuntimeError:
+            pass
+        self.assertEqual(self.admin_alerts('overdue_request'), 0)
+        self.assertFalse(NotificationClaim.objects.exists())
+
+        request.save()
+        self.assertEqual(self.admin_alerts('overdue_request'), 1)
+
+    def test_given_up_alert_releases_its_claim(self):
+        from .outbox import process_outbox
+
+        request = self.make_request('in_progress', timezone.localdate() - timedelta(days=1))
+        request.save()
+        with override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=1), \
+                mock.patch('apps.service_requests.email_fallback.send_admin_notifications_sync', side_effect=Exception('down')):
+            self.assertEqual(process_outbox(), (0, 1))
+        self.assertFalse(NotificationClaim.objects.exists())
+
+        request.save()
+        self.assertEqual(self.admin_alerts('overdue_request'), 2)
+
+    def test_alert_is_sent_again_after_the_cooldown(self):
+        from .dedup import claim_notification
+
+        request = self.make_request()
+        self.assertTrue(claim_notification(request.id, 'urgent_request'))
+        self.assertFalse(claim_notification(request.id, 'urgent_request'))
+        self.assertTrue(claim_notification(request.id, 'new_request'))
+
+        later = timezone.now() + timedelta(minutes=61)
+        with mock.patch('apps.service_requests.dedup.timezone.now', return_value=later):
+            self.assertTrue(claim_notification(request.id, 'urgent_request'))
+            self.assertFalse(claim_notification(request.id, 'urgent_request'))
+
+    def test_overdue_summary_skips_requests_already_reported(self):
+        from .digests import send_overdue_summaries
+
+        past = timezone.localdate() - timedelta(days=1)
+        first = self.make_request(deadline=past)
+        self.assertEqual(send_overdue_summaries(), 1)
+        self.assertEqual(send_overdue_summaries(), 0)
+
+        second = self.make_request(deadline=past)
+        mail.outbox.clear()
+        self.assertEqual(send_overdue_summaries(), 1)
+        self.assertIn(f'#{second.id} ', mail.outbox[0].body)
+        self.assertNotIn(f'#{first.id} ', mail.outbox[0].body)
+
+    def test_failed_summary_releases_its_claims(self):
+        from . import digests
+
+        self.make_request(deadline=timezone.localdate() - timedelta(days=1))
+        with mock.patch.object(digests.email_service, 'send_many', return_value=[False]):
+            self.assertEqual(digests.send_overdue_summaries(), 0)
+        self.assertEqual(digests.send_overdue_summaries(), 1)
+
+
+class BulkStatusPipelineTests(ServiceRequestTestMixin, TestCase):
+    """Tests for bulk status changes and their batched client emails."""
+
+    def setUp(self):
+        super().setUp()
+        from .email_delivery import close_pooled_connection
+        close_pooled_connection()
+
+    def bulk_update(self, count, new_status='completed'):
+        requests = [self.make_request() for _ in range(count)]
+        response = self.client.patch('/api/requests/admin/requests/bulk_update_status/', {
+            'request_ids': [request.id for request in requests], 'status': new_status,
+        }, format='json')
+        self.assertEqual(response.data['updated_count'], count)
+        return response.data['job_id']
+
+    def test_job_reports_progress_of_its_emails(self):
+        from .outbox import process_outbox
+
+        job_id = self.bulk_update(3)
+        url = f'/api/requests/admin/requests/bulk_jobs/{job_id}/'
+        response = self.client.get(url)
+        self.assertEqual((response.data['total'], response.data['pending'], response.data['done']), (3, 3, False))
+
+        self.assertEqual(process_outbox(), (3, 0))
+        response = self.client.get(url)
+        self.assertEqual((response.data['sent'], response.data['done']), (3, True))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('Completed', mail.outbox[0].body)
+        self.assertEqual(EmailNotification.objects.filter(email_type='status_update', status='sent').count(), 3)
+
+        self.assertEqual(self.client.get(f'/api/requests/admin/requests/bulk_jobs/{"0" * 32}/').status_code, 404)
+
+    def test_no_job_id_when_no_email_was_queued(self):
+        # Nothing changed status, so there is nothing to follow
+        self.assertIsNone(self.bulk_update(2, new_status='pending'))
+
+        # Without the outbox the emails go out directly
+        with override_settings(EMAIL_OUTBOX_ENABLED=False):
+            self.assertIsNone(self.bulk_update(2))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_batch_is_sent_with_constant_queries_over_one_connection(self):
+        from . import email_delivery
+        from .outbox import process_outbox
+
+        query_counts, connections = [], []
+        for count in (2, 6):
+            self.bulk_update(count)
+            with mock.patch.object(email_delivery, 'get_connection', wraps=email_delivery.get_connection) as opened:
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(process_outbox(), (count, 0))
+            query_counts.append(len(queries))
+            connections.append(opened.call_count)
+        self.assertEqual(query_counts[0], query_counts[1])
+        # One connection, reused by the second batch
+        self.assertEqual(connections, [1, 0])
+
+    def test_admin_action_queues_status_emails(self):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+
+        requests = [self.make_request() for _ in range(2)]
+        request = RequestFactory().post('/admin/')
+        request.user = self.admin
+        model_admin = site._registry[ServiceRequest]
+        with mock.patch.object(model_admin, 'message_user') as message_user:
+            model_admin.mark_as_cancelled(request, ServiceRequest.objects.filter(id__in=[r.id for r in requests]))
+        self.assertIn('2 request(s) marked as cancelled.', message_user.call_args.args[1])
+        entries = EmailOutbox.objects.filter(kind='status_update')
+        self.assertEqual(entries.count(), 2)
+        self.assertEqual(len({entry.job_id for entry in entries}), 1)
+
+
+class FullTextSearchTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the full-text admin request search."""
+
+    url = '/api/requests/admin/requests/'
+
+    def search(self, query, **params):
+        return self.client.get(self.url, {'search': query, **params}).data['results']
+
+    def test_results_are_ranked_with_highlighted_snippets(self):
+        in_description = self.make_request(project_description='Notes about <b>thesis</b> formatting')
+        in_title = self.make_request(project_title='Thesis proofreading')
+        self.make_request(project_title='Essay')
+
+        results = self.search('thes')
+        self.assertEqual([result['id'] for result in results], [in_title.id, in_description.id])
+        self.assertGreater(results[0]['search_rank'], results[1]['search_rank'])
+        self.assertIn('&lt;b&gt;<mark>thesis</mark>&lt;/b&gt;', results[1]['search_snippet'])
+
+        # Every term must match; an explicit ordering wins over the rank
+        self.assertEqual([r['id'] for r in self.search('thesis proof')], [in_title.id])
+        ordered = self.search('thesis', ordering='created_at')
+        self.assertEqual([result['id'] for result in ordered], [in_description.id, in_title.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        request = self.make_request(project_title='Lab report')
+        ServiceRequest.objects.filter(id=request.id).update(project_title='Dissertation chapter')
+        self.assertEqual(self.search('lab'), [])
+        self.assertEqual([result['id'] for result in self.search('dissert')], [request.id])
+
+        request.delete()
+        self.assertEqual(self.search('dissert'), [])
+
+    def test_falls_back_to_icontains_without_a_backend(self):
+        request = self.make_request(client_email='someone@example.org')
+        with override_settings(SEARCH_BACKEND='none'):
+            results = self.search('someone@example')
+        self.assertEqual([result['id'] for result in results], [request.id])
+        self.assertNotIn('search_snippet', results[0])
+
+    def test_rebuild_command_restores_missing_triggers(self):
+        table = ServiceRequest._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER "{table}_fts_ai"')
+        request = self.make_request(project_title='Capstone')
+        self.assertEqual(self.search('capstone'), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Rebuilt search index for service_requests.ServiceRequest', out.getvalue())
+        self.assertEqual([result['id'] for result in self.search('capstone')], [request.id])
+
+
+class ExportTests(ServiceRequestTestMixin, TestCase):
+    """Tests for the streaming CSV and JSON Lines export."""
+
+    url = '/api/requests/admin/requests/export/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.first = cls.make_request('pending', client_name='=HYPERLINK("http://x")', client_phone='+15550100')
+        cls.second = cls.make_request('completed', project_title='Thesis chapter')
+        cls.third = cls.make_request('pending', project_title='Thesis review', assigned_to=cls.admin)
+
+    def export(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            content = b''.join(response.streaming_content).decode('utf-8')
+        return response, content
+
+    def test_csv_honours_filters_and_ordering(self):
+        response, content = self.export({'status': 'pending', 'ordering': 'created_at'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="service-requests-', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(StringIO(content.lstrip('\ufeff'))))
+        self.assertEqual([int(row['id']) for row in rows], [self.first.id, self.third.id])
+        self.assertEqual(rows[1]['assigned_to'], 'admin')
+        self.assertEqual(rows[1]['service'], 'Essay')
+        # Cells that a spreadsheet would evaluate are escaped
+        self.assertEqual(rows[0]['client_name'], '\'=HYPERLINK("http://x")')
+        self.assertEqual(rows[0]['client_phone'], "'+15550100")
+
+    def test_jsonl_honours_search(self):
+        response, content = self.export({'output': 'jsonl', 'search': 'thesis', 'ordering': 'created_at'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.second.id, self.third.id])
+        self.assertEqual(rows[0]['deadline'], self.second.deadline.isoformat())
+        self.assertIsNone(rows[0]['assigned_to'])
+
+    def test_invalid_output_and_permissions(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xlsx'}).status_code, 400)
+        self.client.force_authenticate(User.objects.create_user('client', 'c@example.com', 'pass'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -6,7 +6,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import User
-from .models import ServiceRequest
+from django.db.models import Count, Q
+from .models import ServiceRequest, overdue_q
 from .serializers import ServiceRequestSerializer, ServiceRequestAdminSerializer, UserSerializer
 
 
@@ -71,15 +72,14 @@ class ServiceRequestViewSet(viewsets.ModelViewSet):
         if not request.user.is_staff:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        queryset = self.get_queryset()
-        stats = {
-            'total': queryset.count(),
-            'pending': queryset.filter(status='pending').count(),
-            'in_progress': queryset.filter(status='in_progress').count(),
-            'completed': queryset.filter(status='completed').count(),
-            'cancelled': queryset.filter(status='cancelled').count(),
-            'overdue': len([r for r in queryset if r.is_overdue]),
-        }
+        stats = self.get_queryset().order_by().aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            in_progress=Count('id', filter=Q(status='in_progress')),
+            completed=Count('id', filter=Q(status='completed')),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            overdue=Count('id', filter=overdue_q()),
+        )
         return Response(stats)
     
     @action(detail=True, methods=['patch'])
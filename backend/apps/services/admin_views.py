@@ -5,12 +5,16 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.common.ordering import ReorderMixin
 from django.db.models import Count, Q
 from .models import ServiceCategory, Service
 from .serializers import ServiceCategoryAdminSerializer, ServiceAdminSerializer
+from .tree import build_category_tree
+from .catalog_cache import bump_catalog_version
+from .catalog_import import SECTIONS, CatalogImport, parse_import_file
 
 
-class AdminServiceCategoryViewSet(viewsets.ModelViewSet):
+class AdminServiceCategoryViewSet(ReorderMixin, viewsets.ModelViewSet):
     """Admin ViewSet for ServiceCategory model with full CRUD operations."""
     queryset = ServiceCategory.objects.all()
     serializer_class = ServiceCategoryAdminSerializer
@@ -20,6 +24,10 @@ class AdminServiceCategoryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'order', 'created_at']
     ordering = ['order', 'name']
+    reorder_payload_key = 'categories'
+    reorder_scope = 'parent'
+    reorder_label = 'Category'
+    reorder_callback = staticmethod(bump_catalog_version)
     
     def get_queryset(self):
         """Get all categories with related data."""
@@ -28,7 +36,9 @@ class AdminServiceCategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def tree(self, request):
         """Get categories in tree structure with admin data."""
-        root_categories = self.get_queryset().filter(parent=None)
+        root_categories = build_category_tree(
+            ServiceCategory.objects.annotate(services_total=Count('services'))
+        )
         serializer = self.get_serializer(root_categories, many=True)
         return Response(serializer.data)
     
@@ -42,19 +52,6 @@ class AdminServiceCategoryViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(category)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['patch'])
-    def bulk_update_order(self, request):
-        """Bulk update category order."""
-        category_orders = request.data.get('categories', [])
-        
-        for item in category_orders:
-            category_id = item.get('id')
-            new_order = item.get('order')
-            if category_id and new_order is not None:
-                ServiceCategory.objects.filter(id=category_id).update(order=new_order)
-        
-        return Response({'message': 'Category orders updated successfully'})
-    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get category statistics."""
@@ -69,7 +66,7 @@ class AdminServiceCategoryViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class AdminServiceViewSet(viewsets.ModelViewSet):
+class AdminServiceViewSet(ReorderMixin, viewsets.ModelViewSet):
     """Admin ViewSet for Service model with full CRUD operations."""
     queryset = Service.objects.all()
     serializer_class = ServiceAdminSerializer
@@ -79,6 +76,10 @@ class AdminServiceViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description', 'short_description']
     ordering_fields = ['title', 'order', 'created_at']
     ordering = ['category', 'order', 'title']
+    reorder_payload_key = 'services'
+    reorder_scope = 'category'
+    reorder_label = 'Service'
+    reorder_callback = staticmethod(bump_catalog_version)
     
     def get_queryset(self):
         """Get all services with related data."""
@@ -94,19 +95,6 @@ class AdminServiceViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(service)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['patch'])
-    def bulk_update_order(self, request):
-        """Bulk update service order."""
-        service_orders = request.data.get('services', [])
-        
-        for item in service_orders:
-            service_id = item.get('id')
-            new_order = item.get('order')
-            if service_id and new_order is not None:
-                Service.objects.filter(id=service_id).update(order=new_order)
-        
-        return Response({'message': 'Service orders updated successfully'})
-    
     @action(detail=False, methods=['patch'])
     def bulk_toggle_active(self, request):
         """Bulk toggle active status of services."""
@@ -114,6 +102,7 @@ class AdminServiceViewSet(viewsets.ModelViewSet):
         active_status = request.data.get('active', True)
         
         updated_count = Service.objects.filter(id__in=service_ids).update(is_active=active_status)
+        bump_catalog_version()
         
         return Response({
             'message': f'{updated_count} services updated successfully',
@@ -143,4 +132,37 @@ class AdminServiceViewSet(viewsets.ModelViewSet):
                 'active': category.active_service_count
             }
         
-        return Response(stats)
\ No newline at end of file
+        return Response(stats)
+
+
+class AdminCatalogImportViewSet(viewsets.ViewSet):
+    """Admin endpoint for bulk catalog imports (see ``catalog_import``)."""
+    permission_classes = [permissions.IsAdminUser]
+    
+    def create(self, request):
+        """
+        Import categories, services and portfolio items.
+        
+        Accepts either a multipart upload (``file``, plus ``section`` for CSV
+        files and JSON lists) or a JSON body with ``categories``,
+        ``services`` and ``portfolio`` lists. ``dry_run=true`` rolls the
+        import back and only reports what it would do.
+        """
+        dry_run = str(request.data.get('dry_run', request.query_params.get('dry_run', ''))).lower() in ('1', 'true', 'yes')
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+                sections = parse_import_file(upload.read(), file_format, request.data.get('section') or None)
+            else:
+                sections = {name: request.data[name] for name in SECTIONS if name in request.data}
+                if not sections:
+                    return Response(
+                        {'error': f"Upload a file or send at least one of: {', '.join(SECTIONS)}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            report = CatalogImport(sections, dry_run=dry_run).run()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(report, status=status.HTTP_400_BAD_REQUEST if report['errors'] else status.HTTP_200_OK)
\ No newline at end of file
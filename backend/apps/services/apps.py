@@ -6,4 +6,5 @@ class ServicesConfig(AppConfig):
     name = 'apps.services'
     
     def ready(self):
-        import apps.services.translation  # noqa
\ No newline at end of file
+        import apps.services.translation  # noqa
+        import apps.services.signals  # noqa
\ No newline at end of file
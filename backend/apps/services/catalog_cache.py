@@ -0,0 +1,104 @@
+"""
+Versioned response cache for the public catalog endpoints.
+
+Cached responses are keyed by a catalog version counter, so invalidation is a
+single ``incr``: every save or delete of a Service, ServiceCategory or
+PortfolioItem bumps the version and all older entries simply stop being read
+(they expire on their own). The version also drives the ``ETag``, so
+browsers and CDNs can revalidate with ``If-None-Match`` and get a 304 without
+the view running at all. No ``Last-Modified`` is sent: its one-second
+resolution can't tell apart two edits made within the same second.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, urlencode
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+VERSION_KEY = 'catalog:version'
+
+
+def catalog_cache_enabled():
+    """Return True when catalog responses should be cached."""
+    return getattr(settings, 'CATALOG_CACHE_ENABLED', True)
+
+
+def get_catalog_version():
+    """
+    Get the current catalog version.
+
+    The counter starts from the current time in milliseconds rather than 1, so
+    a counter lost to eviction or a restart never reuses an old version.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def get_cache_key(request, version):
+    """Build the cache key for ``request`` at catalog ``version``."""
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.path}?{params}'.encode('utf-8')
+    ).hexdigest()
+    return f'catalog:{version}:{get_language()}:{digest}'
+
+
+def get_etag(cache_key):
+    """Derive a validator from the versioned cache key."""
+    return '"%s"' % hashlib.md5(cache_key.encode('utf-8')).hexdigest()
+
+
+def is_not_modified(request, etag):
+    """Evaluate If-None-Match against the current catalog."""
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag in etags
+
+
+def cache_catalog_response(view_func):
+    """
+    Cache the data of a successful GET response of a viewset action.
+
+    The serialized data is cached rather than the rendered bytes, so content
+    negotiation (JSON or the browsable API) still happens per request.
+    """
+    @wraps(view_func)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not catalog_cache_enabled():
+            return view_func(self, request, *args, **kwargs)
+
+        cache_key = get_cache_key(request, get_catalog_version())
+        etag = get_etag(cache_key)
+
+        if is_not_modified(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            data = cache.get(cache_key)
+            if data is None:
+                response = view_func(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(cache_key, response.data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600))
+            else:
+                response = Response(data)
+
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+    return wrapper
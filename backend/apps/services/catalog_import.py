@@ -0,0 +1,412 @@
+"""
+Bulk import of the service catalog.
+
+Loads service categories, services and portfolio items from CSV or JSON in
+one transaction instead of one admin API call per row. Each section is a
+list of rows whose columns are the model fields, with ``_en`` and ``_ar``
+columns for the translated ones (``title_en``, ``title_ar``, ...). Rows
+refer to categories by slug: ``parent`` for categories, ``category`` for
+services and portfolio items. The slug can belong to an existing category
+or to one created by the same import.
+
+Rows are matched to existing records, and updated instead of duplicated:
+
+* categories by ``slug`` (derived from ``name_en`` when omitted)
+* services and portfolio items by category and ``title_en``
+
+Columns missing from a row keep their current value on update and their
+default on create. In CSV, list fields (``features_*``, ``technologies_used_*``)
+are ``|``-separated.
+
+Every row is validated before anything is written. An import with any invalid
+row writes nothing and returns a report of every error. Valid imports are
+written with ``bulk_create`` and ``bulk_update``, using a few queries per
+section whatever the number of rows. A dry run does the full import and then
+rolls it back, so the report shows exactly what would change.
+"""
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone, translation
+from django.utils.text import slugify
+
+from apps.portfolio.models import PortfolioItem
+from .catalog_cache import bump_catalog_version
+from .models import ServiceCategory, Service
+
+LANGUAGES = ('en', 'ar')
+LIST_SEPARATOR = '|'
+
+ImportSpec = namedtuple('ImportSpec', 'model translated fields category_column category_field')
+
+SECTIONS = {
+    'categories': ImportSpec(
+        ServiceCategory, ('name', 'description'), ('slug', 'is_active', 'order'), 'parent', 'parent',
+    ),
+    'services': ImportSpec(
+        Service, ('title', 'description', 'short_description', 'features'),
+        ('price_range', 'delivery_time', 'is_active', 'order'), 'category', 'category',
+    ),
+    'portfolio': ImportSpec(
+        PortfolioItem, ('title', 'description', 'technologies_used'),
+        ('client_type', 'completion_date', 'project_duration', 'is_featured', 'is_active', 'order'),
+        'category', 'service_category',
+    ),
+}
+
+
+def get_columns(spec):
+    """Get the columns a section accepts."""
+    columns = [f'{field}_{code}' for field in spec.translated for code in LANGUAGES]
+    return [*columns, *spec.fields, spec.category_column]
+
+
+def get_required_columns(spec):
+    """Get the columns a row needs to create a record: fields that can't be blank and have no default."""
+    def required(field):
+        field = spec.model._meta.get_field(field)
+        return not field.blank and not field.has_default()
+
+    columns = [f'{field}_{settings.LANGUAGE_CODE}' for field in spec.translated if required(field)]
+    return [*columns, *(field for field in spec.fields if required(field))]
+
+
+def get_default_batch_size():
+    return getattr(settings, 'CATALOG_IMPORT_BATCH_SIZE', 500)
+
+
+def parse_import_file(content, file_format, section=None):
+    """
+    Parse an import file into sections.
+
+    Args:
+        content (str or bytes): File contents
+        file_format (str): ``'csv'`` or ``'json'``
+        section (str): Section of a CSV file or of a JSON list; a JSON object
+            holds its own sections
+
+    Returns:
+        Dict of section name to list of row dicts
+
+    Raises:
+        ValueError: If the file can't be parsed
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError('Import files must be UTF-8 encoded')
+
+    if file_format == 'json':
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+        if isinstance(data, list):
+            if section is None:
+                raise ValueError('A JSON list needs a section (categories, services or portfolio)')
+            data = {section: data}
+        if not isinstance(data, dict):
+            raise ValueError('JSON imports must be an object of sections or a list of rows')
+        return data
+
+    if file_format == 'csv':
+        if section is None:
+            raise ValueError('CSV imports need a section (categories, services or portfolio)')
+        return {section: list(csv.DictReader(io.StringIO(content.lstrip('\ufeff'))))}
+
+    raise ValueError(f'Unsupported format: {file_format}')
+
+
+class CatalogImport:
+    """
+    One catalog import.
+
+    Args:
+        sections (dict): Section name to list of row dicts, as returned by
+            ``parse_import_file``
+        dry_run (bool): Roll the import back after running it
+        batch_size (int): Rows per INSERT or UPDATE statement
+    """
+
+    def __init__(self, sections, dry_run=False, batch_size=None):
+        self.sections = sections
+        self.dry_run = dry_run
+        self.batch_size = batch_size or get_default_batch_size()
+        self.row_errors = {}
+        self.created = {name: 0 for name in SECTIONS}
+        self.updated = {name: 0 for name in SECTIONS}
+
+    def run(self):
+        """
+        Validate and write the import.
+
+        Returns:
+            dict: Report with ``created`` and ``updated`` counts per section,
+            ``errors`` (``section``, 1-based ``row`` and field messages) and
+            ``committed``
+        """
+        unknown = set(self.sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+
+        # Translated values are written as given; keep the untranslated
+        # columns on the default language whatever the caller's language is
+        with translation.override(settings.LANGUAGE_CODE):
+            validated = self.validate()
+            committed = False
+            if not self.row_errors:
+                with transaction.atomic():
+                    self.write(validated)
+                    if self.dry_run:
+                        transaction.set_rollback(True)
+                    else:
+                        transaction.on_commit(bump_catalog_version)
+                        committed = True
+
+        return {
+            'dry_run': self.dry_run,
+            'committed': committed,
+            'created': self.created,
+            'updated': self.updated,
+            'errors': self.errors,
+        }
+
+    def add_error(self, section, row, errors):
+        """Record the errors of a row, merged with any it already has."""
+        row_errors = self.row_errors.setdefault((section, row), {})
+        for field, messages in errors.items():
+            row_errors.setdefault(field, []).extend(messages)
+
+    @property
+    def errors(self):
+        """The errors of every invalid row, in file order."""
+        order = list(SECTIONS)
+        return [
+            {'section': section, 'row': row, 'errors': errors}
+            for (section, row), errors in sorted(
+                self.row_errors.items(), key=lambda item: (order.index(item[0][0]), item[0][1])
+            )
+        ]
+
+    # Validation
+
+    def validate(self):
+        """Clean every row, without writing; return the valid rows per section."""
+        parents = dict(ServiceCategory.objects.values_list('slug', 'parent__slug'))
+        validated = {}
+
+        rows = self.validate_section('categories')
+        imported = set()
+        for number, values, parent in rows:
+            if values['slug'] in imported:
+                self.add_error('categories', number, {'slug': ['Duplicate slug in this import.']})
+            elif values['slug'] not in parents:
+                self.check_required('categories', number, values)
+            imported.add(values['slug'])
+        validated['categories'] = rows
+        known_slugs = set(parents) | imported
+
+        # Parents as they will be after the import, to catch cycles
+        for _, values, parent in rows:
+            if parent in known_slugs:
+                parents[values['slug']] = parent
+        for number, values, parent in rows:
+            if parent in known_slugs and self.is_own_ancestor(values['slug'], parents):
+                self.add_error('categories', number, {'parent': ['A category cannot be its own ancestor.']})
+
+        for name in ('services', 'portfolio'):
+            spec = SECTIONS[name]
+            rows = validated[name] = self.validate_section(name)
+            existing = set(spec.model.objects.filter(
+                title_en__in=[values['title_en'] for _, values, _ in rows]
+            ).values_list(f'{spec.category_field}__slug', 'title_en'))
+            keys = set()
+            for number, values, category in rows:
+                key = (category, values['title_en'])
+                if key in keys:
+                    self.add_error(name, number, {'title_en': ['Duplicate title in this category.']})
+                elif key not in existing:
+                    self.check_required(name, number, values)
+                keys.add(key)
+
+        for name, rows in validated.items():
+            column = SECTIONS[name].category_column
+            for number, values, category in rows:
+                if category and category not in known_slugs:
+                    self.add_error(name, number, {column: [f'Unknown category slug "{category}".']})
+        return validated
+
+    @staticmethod
+    def is_own_ancestor(slug, parents):
+        seen = set()
+        current = parents.get(slug)
+        while current is not None and current not in seen:
+            if current == slug:
+                return True
+            seen.add(current)
+            current = parents.get(current)
+        return False
+
+    def check_required(self, name, number, values):
+        """Report the required columns missing from a row that creates a record."""
+        missing = [column for column in get_required_columns(SECTIONS[name]) if column not in values]
+        if missing:
+            self.add_error(name, number, {column: ['This field is required.'] for column in missing})
+
+    def validate_section(self, name):
+        """Clean the rows of one section; return ``(row number, values, category slug)`` triples."""
+        spec = SECTIONS[name]
+        rows = self.sections.get(name) or []
+        if not isinstance(rows, list):
+            raise ValueError(f'Section "{name}" must be a list of rows')
+        columns = set(get_columns(spec))
+
+        cleaned = []
+        for number, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                self.add_error(name, number, {'row': ['Expected an object of columns.']})
+                continue
+            errors = {}
+            unknown = set(row) - columns
+            if unknown:
+                errors['row'] = [f"Unknown columns: {', '.join(sorted(map(str, unknown)))}"]
+
+            values = {}
+            for column in columns - {spec.category_column} - unknown:
+                value = row.get(column)
+                if isinstance(value, str):
+                    value = value.strip()
+                if value in (None, ''):
+                    continue
+                try:
+                    values[column] = self.clean_value(spec.model, column, value)
+                except ValidationError as e:
+                    errors[column] = e.messages
+
+            if name == 'categories' and 'slug' not in values and 'slug' not in errors:
+                values['slug'] = slugify(values.get('name_en', ''))
+                if not values['slug']:
+                    errors['slug'] = ['Give a slug or an English name to derive it from.']
+            key_field = 'slug' if name == 'categories' else 'title_en'
+            if key_field not in values and key_field not in errors:
+                errors[key_field] = ['This field is required.']
+
+            category = row.get(spec.category_column)
+            category = category.strip() if isinstance(category, str) else category
+            if name != 'categories' and not category:
+                errors[spec.category_column] = ['This field is required.']
+
+            if errors:
+                self.add_error(name, number, errors)
+            else:
+                cleaned.append((number, values, category or None))
+        return cleaned
+
+    @staticmethod
+    def clean_value(model, column, value):
+        """Convert and validate one cell with the model field's own validation."""
+        field = model._meta.get_field(column)
+        if field.get_internal_type() == 'JSONField':
+            if isinstance(value, str):
+                value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValidationError('Expected a list of strings.')
+        elif isinstance(value, (list, dict)):
+            raise ValidationError('Expected a single value.')
+        return field.clean(value, None)
+
+    # Writing
+
+    def write(self, validated):
+        """Create and update every validated row, categories first."""
+        self.write_categories(validated['categories'])
+        category_ids = dict(ServiceCategory.objects.values_list('slug', 'id'))
+        for name in ('services', 'portfolio'):
+            self.write_items(name, validated[name], category_ids)
+
+    def write_categories(self, rows):
+        if not rows:
+            return
+        spec = SECTIONS['categories']
+        existing = ServiceCategory.objects.in_bulk([values['slug'] for _, values, _ in rows], field_name='slug')
+        self.save(spec, 'categories', [(values, existing.get(values['slug'])) for _, values, _ in rows])
+
+        # Parents may be categories created just now, so link them once
+        # every category has an id
+        linked = [(values['slug'], parent) for _, values, parent in rows if parent]
+        if linked:
+            categories = ServiceCategory.objects.in_bulk(
+                [slug for pair in linked for slug in pair], field_name='slug'
+            )
+            children = []
+            for slug, parent in linked:
+                child = categories[slug]
+                child.parent = categories[parent]
+                children.append(child)
+            ServiceCategory.objects.bulk_update(children, ['parent'], batch_size=self.batch_size)
+
+    def write_items(self, name, rows, category_ids):
+        if not rows:
+            return
+        spec = SECTIONS[name]
+        category_column = f'{spec.category_field}_id'
+        for _, values, category in rows:
+            values[category_column] = category_ids[category]
+
+        existing = {
+            (getattr(item, category_column), item.title_en): item
+            for item in spec.model.objects.filter(
+                **{f'{category_column}__in': {values[category_column] for _, values, _ in rows}},
+                title_en__in=[values['title_en'] for _, values, _ in rows],
+            )
+        }
+        self.save(spec, name, [
+            (values, existing.get((values[category_column], values['title_en'])))
+            for _, values, _ in rows
+        ])
+
+    def save(self, spec, name, pairs):
+        """
+        Bulk create the new rows and bulk update the existing ones.
+
+        Args:
+            pairs (list): ``(values, existing instance or None)`` per row
+        """
+        new, changed, update_fields = [], [], {'updated_at'}
+        for values, instance in pairs:
+            values = with_untranslated_columns(spec, values)
+            if instance is None:
+                new.append(spec.model(**values))
+            else:
+                for field, value in values.items():
+                    setattr(instance, field, value)
+                instance.updated_at = timezone.now()
+                update_fields.update(values)
+                changed.append(instance)
+
+        spec.model.objects.bulk_create(new, batch_size=self.batch_size)
+        if changed:
+            spec.model.objects.bulk_update(changed, sorted(update_fields), batch_size=self.batch_size)
+        self.created[name] += len(new)
+        self.updated[name] += len(changed)
+
+
+def with_untranslated_columns(spec, values):
+    """
+    Add the untranslated column of every translated field given in the default language.
+
+    ``bulk_update`` writes the columns it is given, so the original column
+    has to be listed alongside ``title_en`` to stay in sync with it.
+    """
+    values = dict(values)
+    for field in spec.translated:
+        default_column = f'{field}_{settings.LANGUAGE_CODE}'
+        if default_column in values:
+            values[field] = values[default_column]
+    return values
@@ -0,0 +1,236 @@
+"""
+In-memory bilingual search over the public catalog.
+
+modeltranslation maps ``title`` and friends to the active language, so a
+database search only looks at one translation and an Arabic query on an
+English page finds nothing. This module keeps an inverted index of both
+translations of every active service and portfolio item in each process
+instead.
+
+Text is normalized before indexing and searching: case is folded, Latin
+accents and Arabic diacritics are stripped, tatweel is removed and the alef
+variants (أ إ آ ٱ) fold to a bare alef, so ``احمد`` finds ``أحمد``. The
+definite article (ال, and وال بال كال فال لل) is dropped from Arabic words so
+``اطروحة`` finds ``الأطروحة``.
+
+The index is built on the first search in a process and rebuilt whenever the
+catalog version changes (see ``catalog_cache``; every catalog save bumps it),
+so a search costs one cache read and never touches the database.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+
+from django.utils.text import Truncator
+from rest_framework import filters
+
+from .catalog_cache import get_catalog_version
+
+LANGUAGES = ('en', 'ar')
+
+# Relative weight of a match in each field
+FIELD_WEIGHTS = {
+    'title': 4,
+    'short_description': 2,
+    'features': 2,
+    'technologies_used': 2,
+    'client_type': 1,
+    'description': 1,
+}
+
+# Alef variants without a Unicode decomposition; أ إ آ lose their hamza or
+# madda with the other combining marks
+ALEF_VARIANTS = str.maketrans({'ٱ': 'ا', 'ٲ': 'ا', 'ٳ': 'ا', 'ٵ': 'ا'})
+TATWEEL = '\u0640'
+TOKEN_RE = re.compile(r'\w+')
+ARTICLE_RE = re.compile(r'^(?:[وبكف]?ال|لل)(?=\w{3})')
+
+CatalogDocument = namedtuple('CatalogDocument', 'kind id category_id title summary')
+
+
+def normalize(text):
+    """Fold case, diacritics, tatweel and alef variants."""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.replace(TATWEEL, '').translate(ALEF_VARIANTS)
+
+
+def tokenize(text):
+    """Split text into normalized terms."""
+    return [ARTICLE_RE.sub('', term) for term in TOKEN_RE.findall(normalize(text))]
+
+
+def flatten(value):
+    """Join the strings of a text or JSON list/dict field."""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return ' '.join(flatten(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(flatten(item) for item in value)
+    return str(value)
+
+
+class CatalogIndex:
+    """
+    Inverted index from normalized terms to catalog documents.
+
+    Args:
+        entries (list): ``(CatalogDocument, fields)`` pairs, where fields is a
+            list of ``(field name, text)`` covering both languages
+    """
+
+    def __init__(self, entries):
+        self.documents = {}
+        self.postings = {}
+        for document, fields in entries:
+            key = (document.kind, document.id)
+            self.documents[key] = document
+            for field, text in fields:
+                weight = FIELD_WEIGHTS[field]
+                for term in tokenize(flatten(text)):
+                    postings = self.postings.setdefault(term, {})
+                    postings[key] = postings.get(key, 0) + weight
+        self.vocabulary = sorted(self.postings)
+
+    def expand(self, term):
+        """Get the indexed terms that start with ``term``."""
+        position = bisect.bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            yield self.vocabulary[position]
+            position += 1
+
+    def search(self, query, kind=None):
+        """
+        Find the documents matching every term of ``query``.
+
+        Terms match as prefixes, and whole-word matches score double.
+
+        Args:
+            query (str): Search text in either language
+            kind (str): Optional document kind, ``'service'`` or ``'portfolio'``
+
+        Returns:
+            List of (CatalogDocument, score), best first
+        """
+        scores = None
+        for term in tokenize(query):
+            matches = {}
+            for word in self.expand(term):
+                bonus = 2 if word == term else 1
+                for key, weight in self.postings[word].items():
+                    if kind is None or key[0] == kind:
+                        matches[key] = matches.get(key, 0) + weight * bonus
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.documents[key], score) for key, score in ranked]
+
+
+def localized(values, language):
+    """Pick the value for ``language``, falling back to the other translation."""
+    return values.get(language) or next((values[code] for code in LANGUAGES if values.get(code)), '')
+
+
+def serialize_result(document, score, language):
+    """Build the API representation of a search result."""
+    return {
+        'type': document.kind,
+        'id': document.id,
+        'category': document.category_id,
+        'title': localized(document.title, language),
+        'summary': localized(document.summary, language),
+        **{f'title_{code}': document.title.get(code) or '' for code in LANGUAGES},
+        'score': score,
+    }
+
+
+def load_catalog_entries():
+    """Read the active services and portfolio items with all their translations."""
+    from apps.portfolio.models import PortfolioItem
+    from .models import Service
+
+    def translated(row, field):
+        return {code: row[f'{field}_{code}'] or '' for code in LANGUAGES}
+
+    def translations(field):
+        return [f'{field}_{code}' for code in LANGUAGES]
+
+    entries = []
+    services = Service.objects.filter(is_active=True, category__is_active=True).values(
+        'id', 'category_id',
+        *translations('title'), *translations('short_description'),
+        *translations('description'), *translations('features'),
+    )
+    for row in services:
+        document = CatalogDocument(
+            'service', row['id'], row['category_id'],
+            translated(row, 'title'), translated(row, 'short_description'),
+        )
+        fields = [
+            (field, row[f'{field}_{code}'])
+            for field in ('title', 'short_description', 'description', 'features')
+            for code in LANGUAGES
+        ]
+        entries.append((document, fields))
+
+    items = PortfolioItem.objects.filter(is_active=True, service_category__is_active=True).values(
+        'id', 'service_category_id', 'client_type',
+        *translations('title'), *translations('description'), *translations('technologies_used'),
+    )
+    for row in items:
+        summary = {
+            code: Truncator(text).chars(200) for code, text in translated(row, 'description').items()
+        }
+        document = CatalogDocument(
+            'portfolio', row['id'], row['service_category_id'], translated(row, 'title'), summary,
+        )
+        fields = [
+            (field, row[f'{field}_{code}'])
+            for field in ('title', 'description', 'technologies_used')
+            for code in LANGUAGES
+        ]
+        fields.append(('client_type', row['client_type']))
+        entries.append((document, fields))
+    return entries
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def get_catalog_index():
+    """Get this process's index, rebuilding it if the catalog changed since it was built."""
+    global _index, _index_version
+    version = get_catalog_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = CatalogIndex(load_catalog_entries())
+                _index_version = version
+    return _index
+
+
+class CatalogSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` that matches both translations through the catalog index.
+
+    Views set ``catalog_search_kind`` to the kind of document they list.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        kind = getattr(view, 'catalog_search_kind', None)
+        if not terms or kind is None:
+            return super().filter_queryset(request, queryset, view)
+        matches = get_catalog_index().search(' '.join(terms), kind=kind)
+        return queryset.filter(id__in=[document.id for document, _ in matches])
@@ -0,0 +1,65 @@
+"""
+Management command to bulk import service categories, services and portfolio items.
+Usage: python manage.py import_catalog FILE [--section services] [--dry-run]
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.services.catalog_import import SECTIONS, CatalogImport, parse_import_file
+
+
+class Command(BaseCommand):
+    help = 'Import catalog categories, services and portfolio items from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or JSON file to import')
+        parser.add_argument(
+            '--section',
+            choices=list(SECTIONS),
+            help='What the rows are; required for CSV files and JSON lists',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and run the import, then roll it back',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows per INSERT or UPDATE statement',
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        try:
+            with open(path, 'rb') as f:
+                sections = parse_import_file(f.read(), file_format, options['section'])
+            report = CatalogImport(
+                sections, dry_run=options['dry_run'], batch_size=options['batch_size']
+            ).run()
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            messages = '; '.join(
+                f"{field}: {' '.join(field_errors)}" for field, field_errors in error['errors'].items()
+            )
+            self.stderr.write(f"{error['section']} row {error['row']}: {messages}")
+        if report['errors']:
+            raise CommandError(f"{len(report['errors'])} invalid rows, nothing was imported")
+
+        summary = ', '.join(
+            f"{section}: {report['created'][section]} created, {report['updated'][section]} updated"
+            for section in SECTIONS
+        )
+        if report['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run, rolled back ({summary})'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ Imported catalog ({summary})'))
@@ -1,12 +1,16 @@
 """
 Public API views for services app.
 """
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.utils.translation import get_language
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import ServiceCategory, Service
 from .serializers import ServiceCategorySerializer, ServiceSerializer
+from .tree import build_category_tree
+from .catalog_cache import cache_catalog_response
+from .catalog_search import CatalogSearchFilter, get_catalog_index, serialize_result
 
 
 class PublicServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -25,13 +29,15 @@ class PublicServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
         return ServiceCategory.objects.filter(is_active=True).select_related('parent')
     
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def tree(self, request):
         """Get categories in tree structure."""
-        root_categories = self.get_queryset().filter(parent=None)
+        root_categories = build_category_tree(ServiceCategory.objects.filter(is_active=True))
         serializer = self.get_serializer(root_categories, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_catalog_response
     def services(self, request, pk=None):
         """Get services for a specific category."""
         category = self.get_object()
@@ -50,9 +56,10 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Service.objects.filter(is_active=True, category__is_active=True)
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, CatalogSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category']
     search_fields = ['title', 'description', 'short_description']
+    catalog_search_kind = 'service'
     ordering_fields = ['title', 'order']
     ordering = ['category', 'order', 'title']
     
@@ -63,7 +70,12 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
             category__is_active=True
         ).select_related('category')
     
+    @cache_catalog_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def featured(self, request):
         """Get featured services (first 6 services)."""
         featured_services = self.get_queryset()[:6]
@@ -71,6 +83,7 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_catalog_response
     def by_category(self, request):
         """Get services grouped by category."""
         categories = ServiceCategory.objects.filter(is_active=True).prefetch_related(
@@ -87,4 +100,35 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
                 ).data
                 result.append(category_data)
         
-        return Response(result)
\ No newline at end of file
+        return Response(result)
+
+
+class PublicCatalogSearchViewSet(viewsets.ViewSet):
+    """
+    Public search over services and portfolio items in both languages.
+    
+    Served from the in-memory catalog index (see ``catalog_search``), so it
+    runs no database queries once the index is built.
+    """
+    permission_classes = [permissions.AllowAny]
+    kinds = ('service', 'portfolio')
+    max_limit = 50
+    
+    def list(self, request):
+        """Search the catalog: ``?q=<text>&type=service|portfolio&limit=<n>``."""
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type') or None
+        if kind is not None and kind not in self.kinds:
+            return Response({'error': 'Invalid type'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        matches = get_catalog_index().search(query, kind=kind) if query else []
+        language = get_language()
+        return Response({
+            'query': query,
+            'count': len(matches),
+            'results': [serialize_result(document, score, language) for document, score in matches[:limit]],
+        })
@@ -27,8 +27,10 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['slug', 'created_at', 'updated_at']
     
     def get_children(self, obj):
-        """Get child categories."""
-        children = obj.children.filter(is_active=True).order_by('order', 'name')
+        """Get child categories, from the in-memory tree when one was built."""
+        children = getattr(obj, 'tree_children', None)
+        if children is None:
+            children = obj.children.filter(is_active=True).order_by('order', 'name')
         return ServiceCategorySerializer(children, many=True, context=self.context).data
     
     def validate(self, data):
@@ -103,6 +105,8 @@ class ServiceCategoryAdminSerializer(ServiceCategorySerializer):
     
     def get_services_count(self, obj):
         """Get count of services in this category."""
+        if hasattr(obj, 'services_total'):
+            return obj.services_total
         return obj.services.count()
 
 
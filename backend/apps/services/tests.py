@@ -1,3 +1,440 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import ServiceCategory, Service
+
+
+class CategoryTreeTests(TestCase):
+    """Tests for the in-memory category tree endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+
+    def build_tree(self, depth, width=2):
+        """Create ``width`` roots, each with ``width`` children per level down to ``depth``."""
+        level = [None]
+        for d in range(depth):
+            next_level = []
+            for parent in level:
+                for i in range(width):
+                    prefix = f'{parent.name}.' if parent else ''
+                    next_level.append(ServiceCategory.objects.create(
+                        name=f'{prefix}{i}', description='Category', parent=parent, order=width - i
+                    ))
+            level = next_level
+        return level
+
+    def get_tree(self, url, num_queries):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertNumQueries(num_queries):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_query_count_does_not_depend_on_depth(self):
+        for depth in (2, 4):
+            with self.captureOnCommitCallbacks(execute=True):
+                ServiceCategory.objects.all().delete()
+                leaves = self.build_tree(depth)
+            tree = self.get_tree('/api/services/public/categories/tree/', 1)
+            self.get_tree('/api/services/admin/categories/tree/', 1)
+            node = tree[0]
+            for _ in range(depth - 1):
+                node = node['children'][0]
+            self.assertEqual(node['children'], [])
+            self.assertEqual(len(leaves), 2 ** depth)
+
+    def test_tree_contents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.build_tree(3)
+            hidden = ServiceCategory.objects.get(name='1.1')
+            hidden.is_active = False
+            hidden.save()
+            inactive_root = ServiceCategory.objects.get(name='0')
+            inactive_root.is_active = False
+            inactive_root.save()
+            Service.objects.create(
+                category=ServiceCategory.objects.get(name='1'), title='Essay', description='Essay',
+                short_description='Essay', price_range='$50', delivery_time='3 days'
+            )
+
+        tree = self.get_tree('/api/services/public/categories/tree/', 1)
+        self.assertEqual([node['name'] for node in tree], ['1'])
+        # Lower order first, hidden branch dropped
+        self.assertEqual([node['name'] for node in tree[0]['children']], ['1.0'])
+        grandchild = tree[0]['children'][0]['children'][0]
+        self.assertEqual(grandchild['name'], '1.0.1')
+        self.assertEqual(grandchild['full_path'], '1 > 1.0 > 1.0.1')
+
+        tree = self.get_tree('/api/services/admin/categories/tree/', 1)
+        self.assertEqual([node['name'] for node in tree], ['1', '0'])
+        self.assertEqual(tree[0]['services_count'], 1)
+
+
+class CatalogCacheTests(TestCase):
+    """Tests for the versioned public catalog cache."""
+
+    url = '/api/services/public/services/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ServiceCategory.objects.create(
+            name='Writing', name_ar='كتابة', description='Writing services'
+        )
+        cls.service = Service.objects.create(
+            category=cls.category, title='Essay', title_ar='مقال', description='Essay writing',
+            short_description='Essays', price_range='$50', delivery_time='3 days'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_hits_are_served_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        # Query params and language get their own entries
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'category': self.category.id})
+        arabic = self.client.get('/api/services/public/services/featured/', HTTP_ACCEPT_LANGUAGE='ar')
+        english = self.client.get('/api/services/public/services/featured/', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(arabic.data[0]['title'], 'مقال')
+        self.assertEqual(english.data[0]['title'], 'Essay')
+
+    def test_changes_invalidate(self):
+        first = self.client.get('/api/services/public/categories/tree/')
+        self.service.title = 'Thesis'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.service.save()
+        # Nothing is invalidated until the save commits
+        self.assertEqual(self.client.get('/api/services/public/categories/tree/')['ETag'], first['ETag'])
+        for callback in callbacks:
+            callback()
+        response = self.client.get('/api/services/public/services/featured/')
+        self.assertEqual(response.data[0]['title'], 'Thesis')
+        self.assertNotEqual(self.client.get('/api/services/public/categories/tree/')['ETag'], first['ETag'])
+
+        from apps.portfolio.models import PortfolioItem
+        self.client.get('/api/portfolio/public/items/recent/')
+        with self.captureOnCommitCallbacks(execute=True):
+            PortfolioItem.objects.create(
+                title='Report', description='A report', service_category=self.category,
+                client_type='Student', completion_date='2024-01-01'
+            )
+        response = self.client.get('/api/portfolio/public/items/recent/')
+        self.assertEqual(len(response.data), 1)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Dates can't tell apart two edits within a second, so only the ETag validates
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class CatalogSearchTests(TestCase):
+    """Tests for the in-memory bilingual catalog search."""
+
+    url = '/api/services/public/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ServiceCategory.objects.create(
+            name='Writing', name_ar='كتابة', description='Writing services'
+        )
+        cls.thesis = Service.objects.create(
+            category=cls.category, title='Thesis editing', title_ar='تدقيق الأطروحة',
+            description='Editing for graduate theses', short_description='Editing',
+            short_description_ar='تدقيق لغوي', features=['Proofreading'], features_ar=['مراجعة لغوية'],
+            price_range='$50', delivery_time='3 days'
+        )
+        cls.essay = Service.objects.create(
+            category=cls.category, title='Essay writing', title_ar='كتابة المقالات',
+            description='Essays on any topic', short_description='Essays',
+            price_range='$50', delivery_time='3 days'
+        )
+
+    def setUp(self):
+        from . import catalog_search
+        cache.clear()
+        catalog_search._index = None
+        self.client = APIClient()
+
+    def search(self, query, **kwargs):
+        return self.client.get(self.url, {'q': query}, **kwargs).data['results']
+
+    def test_normalization(self):
+        from .catalog_search import normalize
+        self.assertEqual(normalize('أَحْمَد'), normalize('احمد'))
+        self.assertEqual(normalize('إسلام آمن ٱلكتاب'), 'اسلام امن الكتاب')
+        self.assertEqual(normalize('كتـــاب'), 'كتاب')
+        self.assertEqual(normalize('Café'), 'cafe')
+
+    def test_queries_match_either_language(self):
+        # An Arabic query with alef and diacritic variants on an English page
+        results = self.search('اُطروحة', HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual([result['id'] for result in results], [self.thesis.id])
+        self.assertEqual(results[0]['title'], 'Thesis editing')
+
+        results = self.search('thesis', HTTP_ACCEPT_LANGUAGE='ar')
+        self.assertEqual(results[0]['title'], 'تدقيق الأطروحة')
+        self.assertEqual(results[0]['title_en'], 'Thesis editing')
+
+        # Prefixes, every term must match, and titles outrank descriptions
+        self.assertEqual([r['id'] for r in self.search('ess')], [self.essay.id])
+        self.assertEqual([r['id'] for r in self.search('edit proof')], [self.thesis.id])
+        self.assertEqual(self.search('مراجعة')[0]['id'], self.thesis.id)
+        self.assertEqual(self.client.get(self.url, {'q': 'x', 'type': 'bogus'}).status_code, 400)
+
+    def test_searches_skip_the_database_until_the_catalog_changes(self):
+        self.search('essay')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.search('essay')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(
+                category=self.category, title='Admissions essay', description='Essays',
+                short_description='Essays', price_range='$50', delivery_time='3 days'
+            )
+        self.assertEqual(len(self.search('essay')), 2)
+
+        self.category.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        self.assertEqual(self.search('essay'), [])
+
+    def test_list_search_matches_both_languages(self):
+        from apps.portfolio.models import PortfolioItem
+        item = PortfolioItem.objects.create(
+            title='Literature review', title_ar='مراجعة الأدبيات', description='A review',
+            service_category=self.category, client_type='Student', completion_date='2024-01-01',
+            technologies_used=['Zotero']
+        )
+        response = self.client.get('/api/services/public/services/', {'search': 'المقالات'})
+        self.assertEqual([result['id'] for result in response.data['results']], [self.essay.id])
+        response = self.client.get('/api/portfolio/public/items/', {'search': 'zotero'})
+        self.assertEqual([result['id'] for result in response.data['results']], [item.id])
+
+
+
+class CatalogImportTests(TestCase):
+    """Tests for the bulk catalog import."""
+
+    url = '/api/services/admin/import/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True))
+        self.writing = ServiceCategory.objects.create(name='Writing', name_ar='كتابة', description='Writing services')
+
+    def catalog(self, count=3):
+        return {
+            'categories': [
+                {'slug': 'theses', 'name_en': 'Theses', 'name_ar': 'الرسائل', 'description_en': 'Thesis help',
+                 'parent': 'editing'},
+                {'name_en': 'Editing', 'description_en': 'Editing help', 'order': 2},
+            ],
+            'services': [
+                {'category': 'theses' if i % 2 else 'writing', 'title_en': f'Service {i}', 'title_ar': f'خدمة {i}',
+                 'description_en': 'Description', 'short_description_en': 'Short', 'price_range': '$50',
+                 'delivery_time': '3 days', 'features_en': ['One', 'Two'], 'features_ar': ['واحد']}
+                for i in range(count)
+            ],
+            'portfolio': [
+                {'category': 'editing', 'title_en': 'Review', 'title_ar': 'مراجعة', 'description_en': 'A review',
+                 'client_type': 'Student', 'completion_date': '2024-03-01', 'technologies_used_en': ['Zotero']},
+            ],
+        }
+
+    def test_import_creates_then_updates(self):
+        from apps.portfolio.models import PortfolioItem
+        from .catalog_cache import get_catalog_version
+        version = get_catalog_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, self.catalog(), format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], {'categories': 2, 'services': 3, 'portfolio': 1})
+        self.assertTrue(response.data['committed'])
+        self.assertNotEqual(get_catalog_version(), version)
+
+        theses = ServiceCategory.objects.get(slug='theses')
+        self.assertEqual((theses.name_ar, theses.parent.slug), ('الرسائل', 'editing'))
+        service = Service.objects.get(title_en='Service 1')
+        self.assertEqual((service.category, service.title_ar, service.features_ar), (theses, 'خدمة 1', ['واحد']))
+        item = PortfolioItem.objects.get()
+        self.assertEqual((item.service_category.slug, str(item.completion_date)), ('editing', '2024-03-01'))
+
+        # Re-importing updates the same rows, and the query count doesn't grow with the rows
+        catalog = self.catalog(count=200)
+        catalog['services'][1]['price_range'] = '$75'
+        with self.assertNumQueries(18):
+            response = self.client.post(self.url, catalog, format='json')
+        self.assertEqual(response.data['created'], {'categories': 0, 'services': 197, 'portfolio': 0})
+        self.assertEqual(response.data['updated'], {'categories': 2, 'services': 3, 'portfolio': 1})
+        self.assertEqual(Service.objects.get(title_en='Service 1').price_range, '$75')
+        self.assertEqual(Service.objects.get(title_en='Service 1').title, 'Service 1')
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        catalog = self.catalog()
+        catalog['categories'][0]['parent'] = 'theses'
+        catalog['services'][0].update(category='missing', price_range='')
+        catalog['services'][2]['title_en'] = 'Service 1'
+        catalog['services'][1]['colour'] = 'red'
+        catalog['portfolio'][0]['completion_date'] = 'March'
+
+        response = self.client.post(self.url, catalog, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['committed'])
+        errors = {(error['section'], error['row']): error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors), {
+            ('categories', 1), ('services', 1), ('services', 2), ('portfolio', 1)
+        })
+        self.assertIn('parent', errors[('categories', 1)])
+        self.assertIn('price_range', errors[('services', 1)])
+        self.assertIn('row', errors[('services', 2)])
+        self.assertIn('completion_date', errors[('portfolio', 1)])
+        self.assertEqual(ServiceCategory.objects.count(), 1)
+        self.assertFalse(Service.objects.exists())
+
+        response = self.client.post(self.url, {'services': [{'category': 'missing', 'title_en': 'X'}]}, format='json')
+        self.assertIn('category', response.data['errors'][0]['errors'])
+        self.assertIn('description_en', response.data['errors'][0]['errors'])
+
+    def test_dry_run_rolls_back(self):
+        response = self.client.post(f'{self.url}?dry_run=true', self.catalog(), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created']['services'], 3)
+        self.assertFalse(response.data['committed'])
+        self.assertFalse(Service.objects.exists())
+
+    def test_csv_file_and_command(self):
+        content = (
+            '\ufefftitle_en,title_ar,category,description_en,short_description_en,price_range,delivery_time,features_en\n'
+            'Proofreading,تدقيق,writing,Checks,Short,$20,2 days,Grammar | Style\n'
+        ).encode('utf-8')
+        upload = SimpleUploadedFile('services.csv', content, content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload, 'section': 'services', 'dry_run': 'true'})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(Service.objects.exists())
+
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.unlink, f.name)
+        with self.assertRaises(CommandError):
+            call_command('import_catalog', f.name, stdout=StringIO())
+        out = StringIO()
+        call_command('import_catalog', f.name, section='services', stdout=out)
+        self.assertIn('services: 1 created', out.getvalue())
+        service = Service.objects.get()
+        self.assertEqual((service.title_ar, service.features_en), ('تدقيق', ['Grammar', 'Style']))
+
+
+class ReorderTests(TestCase):
+    """Tests for the set-based reorder actions."""
+
+    url = '/api/services/admin/services/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.category, cls.other = [
+            ServiceCategory.objects.create(name=name, description='Category') for name in ('Writing', 'Editing')
+        ]
+        cls.services = [
+            Service.objects.create(
+                category=cls.category, title=f'Service {i}', description='Description',
+                short_description='Short', price_range='$50', delivery_time='3 days', order=i
+            )
+            for i in range(5)
+        ]
+        cls.elsewhere = Service.objects.create(
+            category=cls.other, title='Elsewhere', description='Description',
+            short_description='Short', price_range='$50', delivery_time='3 days', order=0
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def orders(self):
+        return list(Service.objects.filter(category=self.category).order_by('order', 'title').values_list('id', flat=True))
+
+    def test_bulk_update_order_is_one_update(self):
+        items = [{'id': service.id, 'order': 10 - i} for i, service in enumerate(self.services)]
+        # Savepoint, id check and one UPDATE, whatever the number of items
+        with self.assertNumQueries(4):
+            response = self.client.patch(f'{self.url}bulk_update_order/', {'services': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 5)
+        self.assertEqual(self.orders(), [service.id for service in reversed(self.services)])
+
+    def test_invalid_or_unknown_ids_change_nothing(self):
+        before = self.orders()
+        for items in (
+            [{'id': self.services[0].id, 'order': 3}, {'id': 999999, 'order': 0}],
+            [{'id': self.services[0].id, 'order': -1}],
+            [{'id': self.services[0].id, 'order': 1}, {'id': self.services[0].id, 'order': 2}],
+            'not a list',
+        ):
+            response = self.client.patch(f'{self.url}bulk_update_order/', {'services': items}, format='json')
+            self.assertEqual(response.status_code, 400, items)
+        self.assertEqual(self.orders(), before)
+
+    def test_move_renumbers_siblings_only(self):
+        from .catalog_cache import get_catalog_version
+        version = get_catalog_version()
+        ids = [service.id for service in self.services]
+        response = self.client.patch(f'{self.url}{ids[4]}/move/', {'position': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(get_catalog_version(), version)
+        expected = [ids[0], ids[4], ids[1], ids[2], ids[3]]
+        self.assertEqual(response.data['order'], expected)
+        self.assertEqual(self.orders(), expected)
+        self.assertEqual(
+            list(Service.objects.filter(category=self.category).order_by('order').values_list('order', flat=True)),
+            [0, 1, 2, 3, 4]
+        )
+        self.elsewhere.refresh_from_db()
+        self.assertEqual(self.elsewhere.order, 0)
+
+        # Past the end moves to the end; a bad position is rejected
+        response = self.client.patch(f'{self.url}{ids[0]}/move/', {'position': 99}, format='json')
+        self.assertEqual(response.data['position'], 4)
+        response = self.client.patch(f'{self.url}{ids[0]}/move/', {'position': 'first'}, format='json')
+        self.assertEqual(response.status_code, 400)
 
-# Create your tests here.
\ No newline at end of file
+    def test_move_category_among_its_siblings(self):
+        child = ServiceCategory.objects.create(name='Child', description='Category', parent=self.category)
+        response = self.client.patch(f'/api/services/admin/categories/{self.other.id}/move/', {'position': 0}, format='json')
+        self.assertEqual(response.data['order'], [self.other.id, self.category.id])
+        self.assertNotIn(child.id, response.data['order'])
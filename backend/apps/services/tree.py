@@ -0,0 +1,42 @@
+"""
+In-memory category tree building.
+
+The whole tree is loaded with one flat query and linked in Python, so
+serializing it costs the same number of queries at any depth.
+"""
+
+
+def build_category_tree(queryset, active_children_only=True):
+    """
+    Link a flat category queryset into a tree.
+
+    Each category gets a ``tree_children`` list (in ``order, name`` order)
+    which ``ServiceCategorySerializer.get_children`` uses instead of querying,
+    and its ``parent`` relation is set to the in-memory parent so
+    ``get_full_path`` never goes back to the database.
+
+    Args:
+        queryset: Categories to include in the tree
+        active_children_only (bool): Skip inactive categories below the roots
+
+    Returns:
+        List of root categories
+    """
+    categories = list(queryset.order_by('order', 'name'))
+    by_id = {category.id: category for category in categories}
+    for category in categories:
+        category.tree_children = []
+
+    roots = []
+    for category in categories:
+        if category.parent_id is None:
+            roots.append(category)
+            continue
+        parent = by_id.get(category.parent_id)
+        if parent is None:
+            # Parent was filtered out, so this branch is not reachable
+            continue
+        category.parent = parent
+        if category.is_active or not active_children_only:
+            parent.tree_children.append(category)
+    return roots
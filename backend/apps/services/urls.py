@@ -4,13 +4,14 @@ URL configuration for services app.
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ServiceCategoryViewSet, ServiceViewSet
-from .public_views import PublicServiceCategoryViewSet, PublicServiceViewSet
-from .admin_views import AdminServiceCategoryViewSet, AdminServiceViewSet
+from .public_views import PublicServiceCategoryViewSet, PublicServiceViewSet, PublicCatalogSearchViewSet
+from .admin_views import AdminServiceCategoryViewSet, AdminServiceViewSet, AdminCatalogImportViewSet
 
 # Admin router (requires admin authentication)
 admin_router = DefaultRouter()
 admin_router.register(r'categories', AdminServiceCategoryViewSet)
 admin_router.register(r'services', AdminServiceViewSet)
+admin_router.register(r'import', AdminCatalogImportViewSet, basename='catalog-import')
 
 # Staff router (requires staff authentication)
 staff_router = DefaultRouter()
@@ -21,6 +22,7 @@ staff_router.register(r'services', ServiceViewSet)
 public_router = DefaultRouter()
 public_router.register(r'categories', PublicServiceCategoryViewSet)
 public_router.register(r'services', PublicServiceViewSet)
+public_router.register(r'search', PublicCatalogSearchViewSet, basename='catalog-search')
 
 urlpatterns = [
     # Public endpoints
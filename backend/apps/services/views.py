@@ -5,11 +5,13 @@ from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Count
 from .models import ServiceCategory, Service
 from .serializers import (
     ServiceCategorySerializer, ServiceSerializer,
     ServiceCategoryAdminSerializer, ServiceAdminSerializer
 )
+from .tree import build_category_tree
 
 
 class ServiceCategoryViewSet(viewsets.ModelViewSet):
@@ -39,7 +41,12 @@ class ServiceCategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def tree(self, request):
         """Get categories in tree structure."""
-        root_categories = self.get_queryset().filter(parent=None)
+        queryset = ServiceCategory.objects.all()
+        if not request.user.is_staff:
+            queryset = queryset.filter(is_active=True)
+        else:
+            queryset = queryset.annotate(services_total=Count('services'))
+        root_categories = build_category_tree(queryset)
         serializer = self.get_serializer(root_categories, many=True)
         return Response(serializer.data)
 
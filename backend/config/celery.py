@@ -31,8 +31,11 @@ app.conf.update(
         'apps.service_requests.tasks.send_request_confirmation_email': {'queue': 'emails'},
         'apps.service_requests.tasks.send_status_update_email': {'queue': 'emails'},
         'apps.service_requests.tasks.send_admin_notification_email': {'queue': 'emails'},
+        'apps.service_requests.tasks.process_email_outbox': {'queue': 'emails'},
+        'apps.service_requests.tasks.send_admin_digests': {'queue': 'emails'},
         'apps.service_requests.tasks.send_daily_overdue_notifications': {'queue': 'maintenance'},
         'apps.service_requests.tasks.cleanup_old_attachments': {'queue': 'maintenance'},
+        'apps.dashboard.tasks.update_daily_metrics': {'queue': 'maintenance'},
     },
     task_default_queue='default',
     task_queues={
@@ -51,6 +54,16 @@ app.conf.update(
     },
     # Periodic task schedule (Celery Beat)
     beat_schedule={
+        'process-email-outbox': {
+            'task': 'apps.service_requests.tasks.process_email_outbox',
+            'schedule': 60.0,  # Retries and expired leases, every minute
+            'options': {'queue': 'emails'}
+        },
+        'send-admin-digests': {
+            'task': 'apps.service_requests.tasks.send_admin_digests',
+            'schedule': 60.0 * settings.ADMIN_DIGEST_WINDOW_MINUTES,  # Once per digest window
+            'options': {'queue': 'emails'}
+        },
         'send-daily-overdue-notifications': {
             'task': 'apps.service_requests.tasks.send_daily_overdue_notifications',
             'schedule': 60.0 * 60.0 * 24.0,  # Run daily (24 hours)
@@ -61,6 +74,11 @@ app.conf.update(
             'schedule': 60.0 * 60.0 * 24.0 * 7.0,  # Run weekly (7 days)
             'options': {'queue': 'maintenance'}
         },
+        'update-daily-metrics': {
+            'task': 'apps.dashboard.tasks.update_daily_metrics',
+            'schedule': 60.0 * 15.0,  # Run every 15 minutes
+            'options': {'queue': 'maintenance'}
+        },
     },
 )
 
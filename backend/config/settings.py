@@ -50,6 +50,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'apps.health.middleware.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files in production
@@ -216,6 +217,57 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@studentservices.com')
 
+# Emails are sent over a persistent SMTP connection per worker thread. It is
+# reopened (and re-authenticated) after being idle this many seconds or after
+# this many messages, and whenever the server drops it.
+EMAIL_CONNECTION_MAX_IDLE = config('EMAIL_CONNECTION_MAX_IDLE', default=60, cast=int)
+EMAIL_CONNECTION_MAX_MESSAGES = config('EMAIL_CONNECTION_MAX_MESSAGES', default=100, cast=int)
+
+# Concurrent SMTP connections used by the asyncio backend
+# (EMAIL_BACKEND=apps.service_requests.async_email.AsyncSMTPEmailBackend,
+# requires `pip install aiosmtplib`).
+EMAIL_ASYNC_CONCURRENCY = config('EMAIL_ASYNC_CONCURRENCY', default=5, cast=int)
+
+# Notification emails are written to the EmailOutbox table and sent by
+# `python manage.py process_email_outbox` (or Celery when it is available)
+# instead of inside the web request.
+EMAIL_OUTBOX_ENABLED = config('EMAIL_OUTBOX_ENABLED', default=True, cast=bool)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+
+# Seconds the email stats endpoint may serve cached numbers (0 disables)
+EMAIL_STATS_CACHE_TIMEOUT = config('EMAIL_STATS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Staff who choose digest delivery get admin notifications grouped into one
+# email per window instead of one email per event. Digests are sent by Celery
+# Beat, or by `python manage.py send_admin_digests` run from cron once per
+# window (or `--loop`) when Beat isn't running.
+ADMIN_DIGEST_WINDOW_MINUTES = config('ADMIN_DIGEST_WINDOW_MINUTES', default=60, cast=int)
+
+# The same admin alert about the same request is sent at most once per
+# cooldown (0 disables). Overdue alerts, including the daily overdue summary,
+# use their own longer cooldown.
+NOTIFICATION_COOLDOWN_MINUTES = config('NOTIFICATION_COOLDOWN_MINUTES', default=60, cast=int)
+OVERDUE_NOTIFICATION_COOLDOWN_HOURS = config('OVERDUE_NOTIFICATION_COOLDOWN_HOURS', default=72, cast=int)
+
+# Dashboard analytics
+# Read historical charts from the DailyMetrics rollup table instead of the raw
+# tables. Run `python manage.py backfill_daily_metrics` before enabling.
+DASHBOARD_USE_DAILY_METRICS = config('DASHBOARD_USE_DAILY_METRICS', default=False, cast=bool)
+
+# Admin full-text search (see apps/common/search.py): 'auto' uses a GIN-indexed
+# tsvector column on PostgreSQL and FTS5 on SQLite, 'none' falls back to
+# icontains search, anything else is the dotted path of a backend class.
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+
+# Request profiling
+# Samples a fraction of requests and records query counts, SQL time,
+# serializer time and response size per route (see /metrics/requests/).
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=True, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float)
+REQUEST_PROFILING_SERVER_TIMING = config('REQUEST_PROFILING_SERVER_TIMING', default=DEBUG, cast=bool)
+REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD = config('REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+REQUEST_PROFILING_WINDOW = config('REQUEST_PROFILING_WINDOW', default=500, cast=int)
+
 # Frontend URL for email links
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 
@@ -235,6 +287,15 @@ else:
         }
     }
 
+# Public catalog response cache (services, categories, portfolio).
+# Entries are versioned and invalidated on every catalog change.
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=True, cast=bool)
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Bulk catalog import (manage.py import_catalog, /api/services/admin/import/).
+# Rows written per INSERT or UPDATE statement.
+CATALOG_IMPORT_BATCH_SIZE = config('CATALOG_IMPORT_BATCH_SIZE', default=500, cast=int)
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'PaperPath API',